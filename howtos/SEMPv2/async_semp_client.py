@@ -0,0 +1,107 @@
+"""module for asyncio semp client"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from howtos.SEMPv2.semp_client import SempClient
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncSempClient:
+    """class holds asyncio semp client related methods
+
+    Every SEMP call runs on the pooled keep-alive session of a SempClient inside one of max_concurrency worker
+    threads, so many calls can be awaited together while at most max_concurrency of them are in flight against
+    the broker.
+    """
+
+    def __init__(self, semp_base_url: str, user_name="admin", password="admin", verify_ssl=False,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, **client_kwargs):
+        """
+        Args:
+            semp_base_url: SEMP base url including scheme and port
+            user_name: SEMP admin user name
+            password: SEMP admin password
+            verify_ssl: verify the broker certificate on https connections
+            max_concurrency: maximum number of SEMP calls in flight at once
+            client_kwargs: extra SempClient arguments such as connect_timeout and read_timeout
+        """
+        if max_concurrency < 1:
+            raise ValueError(f'max_concurrency must be at least 1, got [{max_concurrency}]')
+        client_kwargs.setdefault('pool_maxsize', max_concurrency)
+        self.semp_client = SempClient(semp_base_url, user_name=user_name, password=password,
+                                      verify_ssl=verify_ssl, **client_kwargs)
+        self.max_concurrency = max_concurrency
+        # the worker count is the concurrency bound, calls beyond it wait in the executor queue
+        self.__executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='semp')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+    async def aclose(self):
+        """method to release the worker threads and pooled connections without blocking the event loop"""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def close(self):
+        """method to release the worker threads and pooled connections, blocks until the running calls are done.
+        Use aclose from a coroutine"""
+        self.__executor.shutdown(wait=True)
+        self.semp_client.close()
+
+    async def run(self, func, *args, **kwargs):
+        """method to run a blocking SEMP operation on a worker thread once one is free
+        Args:
+            func: callable issuing one or more SEMP calls through semp_client
+            args: positional arguments for func
+            kwargs: keyword arguments for func
+
+        Returns:
+            the return value of func
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, functools.partial(func, *args, **kwargs))
+
+    async def gather(self, coroutines):
+        """method to await many SEMP coroutines concurrently
+        Args:
+            coroutines: iterable of awaitables, typically calls to this client or AsyncSempUtility
+
+        Returns:
+            list of results in the order given, with exceptions returned in place instead of raised
+        """
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    async def http_get(self, endpoint: str):
+        """method to get the http endpoint
+        Args:
+            endpoint: endpoint string
+        """
+        return await self.run(self.semp_client.http_get, endpoint)
+
+    async def http_patch(self, endpoint: str, payload):
+        """method to update the http endpoint
+        Args:
+            endpoint: endpoint string
+            payload: request payload
+        """
+        return await self.run(self.semp_client.http_patch, endpoint, payload)
+
+    async def http_post(self, endpoint: str, payload, raise_exception=True):
+        """method for http post
+        Args:
+            endpoint: endpoint string
+            payload: request payload
+        """
+        return await self.run(self.semp_client.http_post, endpoint, payload, raise_exception)
+
+    async def http_delete(self, endpoint: str, raise_exception=True):
+        """method for http delete
+        Args:
+            endpoint: endpoint string
+            raise_exception: when False the response of a failed request is returned instead
+        """
+        return await self.run(self.semp_client.http_delete, endpoint, raise_exception)
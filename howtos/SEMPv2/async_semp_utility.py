@@ -0,0 +1,95 @@
+"""module for the asyncio semp utility"""
+from howtos.SEMPv2.async_semp_client import AsyncSempClient
+from howtos.SEMPv2.semp_utility import SempUtility
+
+
+class AsyncSempUtility:
+    """asyncio SEMP utility class
+
+    Each operation runs the matching SempUtility method in one concurrency slot of the AsyncSempClient, and the
+    fan-out methods spread an operation over many objects at once.
+    """
+
+    def __init__(self, async_semp_client: AsyncSempClient):
+        self.async_semp_client = async_semp_client
+        self.semp_utility = SempUtility(async_semp_client.semp_client)
+
+    async def create_queue(self, name, msg_vpn_name, **queue_kwargs):
+        """method to create a queue, see SempUtility.create_queue
+        Args:
+            name: queue name
+            msg_vpn_name: message vpn name
+            queue_kwargs: any further SempUtility.create_queue argument, e.g. delete_if_exists, access_type,
+                single_request or ensure
+
+        Returns:
+            the return value of SempUtility.create_queue, the outcome of ensure_queue when ensure is set
+        """
+        return await self.async_semp_client.run(self.semp_utility.create_queue, name, msg_vpn_name, **queue_kwargs)
+
+    async def add_topic_to_queue(self, topic_name, queue_name, msg_vpn_name):
+        """method to add a topic subscription to a queue, see SempUtility.add_topic_to_queue"""
+        return await self.async_semp_client.run(self.semp_utility.add_topic_to_queue, topic_name, queue_name,
+                                                msg_vpn_name)
+
+    async def delete_queue(self, name, msg_vpn_name):
+        """method to delete a queue, see SempUtility.delete_queue"""
+        return await self.async_semp_client.run(self.semp_utility.delete_queue, name, msg_vpn_name)
+
+    async def create_queues(self, names, msg_vpn_name, **queue_kwargs):
+        """method to create many queues concurrently
+        Args:
+            names: queue names
+            msg_vpn_name: message vpn name
+            queue_kwargs: extra create_queue arguments applied to every queue
+
+        Returns:
+            dict of queue name to the create_queue result on success, or the exception raised for that queue
+        """
+        names = list(names)
+        results = await self.async_semp_client.gather(
+            self.create_queue(name, msg_vpn_name, **queue_kwargs) for name in names)
+        return self.__outcomes(names, results)
+
+    async def add_topics_to_queue(self, topic_names, queue_name, msg_vpn_name):
+        """method to add many topic subscriptions to a queue concurrently
+        Args:
+            topic_names: topic subscriptions to add
+            queue_name: queue name
+            msg_vpn_name: message vpn name
+
+        Returns:
+            dict of topic to the add_topic_to_queue result on success, or the exception raised for that topic
+        """
+        topic_names = list(topic_names)
+        results = await self.async_semp_client.gather(
+            self.add_topic_to_queue(topic, queue_name, msg_vpn_name) for topic in topic_names)
+        return self.__outcomes(topic_names, results)
+
+    async def delete_queues(self, names, msg_vpn_name):
+        """method to delete many queues concurrently
+        Args:
+            names: queue names
+            msg_vpn_name: message vpn name
+
+        Returns:
+            dict of queue name to the delete_queue result on success, or the exception raised for that queue
+        """
+        names = list(names)
+        results = await self.async_semp_client.gather(self.delete_queue(name, msg_vpn_name) for name in names)
+        return self.__outcomes(names, results)
+
+    @staticmethod
+    def failures(outcomes):
+        """method to get the failed entries of a fan-out result
+        Args:
+            outcomes: dict returned by create_queues, add_topics_to_queue or delete_queues
+
+        Returns:
+            dict of key to the exception raised for it
+        """
+        return {key: outcome for key, outcome in outcomes.items() if isinstance(outcome, BaseException)}
+
+    @staticmethod
+    def __outcomes(keys, results):
+        return dict(zip(keys, results))
@@ -0,0 +1,159 @@
+"""module for benchmarking the SempUtility provisioning flows against the SEMP stand-in server
+
+Every scenario runs against a fresh SempStandInServer with the configured latency, so the numbers compare the
+flows by their number of round trips and their concurrency, independent of a broker. Run it with
+
+    PYTHONPATH=. python -m howtos.SEMPv2.semp_benchmark
+
+and tune it through SEMP_BENCH_QUEUES, SEMP_BENCH_TOPICS, SEMP_BENCH_LATENCY (seconds) and
+SEMP_BENCH_CONCURRENCY environment variables.
+"""
+import os
+import time
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_teardown import SempTeardown
+from howtos.SEMPv2.semp_utility import SempUtility
+
+BENCHMARK_MSG_VPN = 'benchmark'
+
+
+def _queue_names(queue_count):
+    return [f'bench/queue/{index}' for index in range(queue_count)]
+
+
+def _topic_names(queue_name, topic_count):
+    return [f'{queue_name}/topic/{index}' for index in range(topic_count)]
+
+
+def _create_queue_sequential(semp_utility, queue_count, topic_count, concurrency):
+    for name in _queue_names(queue_count):
+        semp_utility.create_queue(name, BENCHMARK_MSG_VPN)
+    return queue_count
+
+
+def _create_queue_single_request_sequential(semp_utility, queue_count, topic_count, concurrency):
+    for name in _queue_names(queue_count):
+        semp_utility.create_queue(name, BENCHMARK_MSG_VPN, single_request=True)
+    return queue_count
+
+
+def _create_queues_bulk(semp_utility, queue_count, topic_count, concurrency):
+    semp_utility.create_queues_bulk([{'name': name} for name in _queue_names(queue_count)], BENCHMARK_MSG_VPN,
+                                    concurrency=concurrency, single_request=True)
+    return queue_count
+
+
+def _add_topic_to_queue_sequential(semp_utility, queue_count, topic_count, concurrency):
+    semp_utility.create_queue('bench/topics', BENCHMARK_MSG_VPN, single_request=True)
+    topics = _topic_names('bench/topics', queue_count * topic_count)
+    for topic in topics:
+        semp_utility.add_topic_to_queue(topic, 'bench/topics', BENCHMARK_MSG_VPN)
+    return len(topics)
+
+
+def _add_topics_to_queue_bulk(semp_utility, queue_count, topic_count, concurrency):
+    semp_utility.create_queue('bench/topics', BENCHMARK_MSG_VPN, single_request=True)
+    topics = _topic_names('bench/topics', queue_count * topic_count)
+    semp_utility.add_topics_to_queue_bulk(topics, 'bench/topics', BENCHMARK_MSG_VPN, concurrency=concurrency)
+    return len(topics)
+
+
+def _ensure_rerun(semp_utility, queue_count, topic_count, concurrency):
+    specs = [{'name': name, 'topics': _topic_names(name, topic_count)} for name in _queue_names(queue_count)]
+    semp_utility.create_queues_bulk(specs, BENCHMARK_MSG_VPN, concurrency=concurrency, ensure=True)
+
+    def rerun():
+        # only the second, steady state run is timed
+        semp_utility.create_queues_bulk(specs, BENCHMARK_MSG_VPN, concurrency=concurrency, ensure=True)
+        return queue_count
+    return rerun
+
+
+def _list_queues_paged(semp_utility, queue_count, topic_count, concurrency):
+    _create_queues_bulk(semp_utility, queue_count, topic_count, concurrency)
+    return lambda: sum(1 for _ in semp_utility.iter_queue_configs(BENCHMARK_MSG_VPN))
+
+
+def _delete_queue_sequential(semp_utility, queue_count, topic_count, concurrency):
+    _create_queues_bulk(semp_utility, queue_count, topic_count, concurrency)
+
+    def delete_all():
+        for name in _queue_names(queue_count):
+            semp_utility.delete_queue(name, BENCHMARK_MSG_VPN)
+        return queue_count
+    return delete_all
+
+
+def _teardown_parallel(semp_utility, queue_count, topic_count, concurrency):
+    _create_queues_bulk(semp_utility, queue_count, topic_count, concurrency)
+    teardown = SempTeardown(semp_utility.semp_client, concurrency=concurrency)
+    for name in _queue_names(queue_count):
+        teardown.record_queue(name, BENCHMARK_MSG_VPN)
+    return lambda: teardown.teardown()['deleted']
+
+
+# a scenario either is the timed operation, returning its operation count, or prepares the broker and returns
+# the timed operation
+SCENARIOS = (('create_queue', _create_queue_sequential),
+             ('create_queue single_request', _create_queue_single_request_sequential),
+             ('create_queues_bulk', _create_queues_bulk),
+             ('create_queues_bulk ensure rerun', _ensure_rerun),
+             ('add_topic_to_queue', _add_topic_to_queue_sequential),
+             ('add_topics_to_queue_bulk', _add_topics_to_queue_bulk),
+             ('iter_queue_configs', _list_queues_paged),
+             ('delete_queue', _delete_queue_sequential),
+             ('SempTeardown', _teardown_parallel))
+
+
+def run_scenario(name, scenario, queue_count=50, topic_count=4, latency=0.005, concurrency=8):
+    """method to time one scenario against a fresh stand-in server
+    Returns:
+        dict with the scenario name, the operations done, the elapsed seconds, operations per second and the
+        SEMP requests sent per http method while timing
+    """
+    with SempStandInServer(latency=latency) as server, \
+            SempClient(server.base_url, pool_maxsize=max(concurrency, 1)) as semp_client:
+        semp_utility = SempUtility(semp_client)
+        semp_client.http_post('/SEMP/v2/config/msgVpns', {'msgVpnName': BENCHMARK_MSG_VPN, 'enabled': True})
+        server.reset_request_counts()
+        start = time.perf_counter()
+        operations = scenario(semp_utility, queue_count, topic_count, concurrency)
+        if callable(operations):
+            server.reset_request_counts()
+            start = time.perf_counter()
+            operations = operations()
+        elapsed = time.perf_counter() - start
+        return {'scenario': name, 'operations': operations, 'elapsed': elapsed,
+                'ops_per_sec': operations / elapsed if elapsed else 0.0, 'requests': server.request_counts()}
+
+
+def run_benchmarks(queue_count=50, topic_count=4, latency=0.005, concurrency=8, scenarios=SCENARIOS):
+    """method to run every scenario and print a summary table
+    Args:
+        queue_count: queues provisioned per scenario
+        topic_count: topic subscriptions per queue
+        latency: seconds the stand-in adds to every SEMP response
+        concurrency: SEMP calls in flight for the bulk and parallel flows
+        scenarios: (name, scenario) pairs to run
+
+    Returns:
+        list of the run_scenario results
+    """
+    results = [run_scenario(name, scenario, queue_count, topic_count, latency, concurrency)
+               for name, scenario in scenarios]
+    print(f"\nSempUtility benchmark: {queue_count} queues, {topic_count} topics per queue, "
+          f"{latency * 1000:.1f} ms latency, concurrency {concurrency}")
+    print(f"{'scenario':<34}{'ops':>8}{'seconds':>10}{'ops/s':>10}{'requests':>10}")
+    for result in results:
+        print(f"{result['scenario']:<34}{result['operations']:>8}{result['elapsed']:>10.3f}"
+              f"{result['ops_per_sec']:>10.1f}{sum(result['requests'].values()):>10}")
+    return results
+
+
+if __name__ == '__main__':
+    run_benchmarks(queue_count=int(os.environ.get('SEMP_BENCH_QUEUES', 50)),
+                   topic_count=int(os.environ.get('SEMP_BENCH_TOPICS', 4)),
+                   latency=float(os.environ.get('SEMP_BENCH_LATENCY', 0.005)),
+                   concurrency=int(os.environ.get('SEMP_BENCH_CONCURRENCY', 8)))
@@ -0,0 +1,138 @@
+"""module for the semp response cache"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+SEMP_API_PREFIXES = ('/SEMP/v2/config', '/SEMP/v2/monitor', '/SEMP/v2/__private_monitor__', '/SEMP/v2/action')
+
+
+def resource_path(endpoint: str):
+    """method to reduce an endpoint or url to the resource path shared by the config and monitor api
+    Args:
+        endpoint: endpoint string or absolute url
+
+    Returns:
+        the path without query string and without the SEMP api prefix, e.g. '/msgVpns/default'
+    """
+    path = urlsplit(endpoint).path.rstrip('/')
+    if not path.startswith('/'):
+        path = '/' + path
+    for prefix in SEMP_API_PREFIXES:
+        if path == prefix or path.startswith(prefix + '/'):
+            return path[len(prefix):]
+    return path
+
+
+class SempResponseCache:
+    """LRU cache of SEMP GET responses with per endpoint time to live
+
+    Entries are keyed by the endpoint string, so the same resource read with a different select or count is a
+    separate entry. A write to a resource path evicts every entry for that path, its children and its parent
+    collections, and moves the cache to a new generation: a response read before that is not cached anymore.
+    """
+
+    def __init__(self, default_ttl=5.0, endpoint_ttls=None, max_entries=256):
+        """
+        Args:
+            default_ttl: seconds a response is served from cache, None or 0 disables caching for unlisted endpoints
+            endpoint_ttls: dict of endpoint path prefix to ttl seconds, the longest matching prefix wins
+            max_entries: maximum number of cached responses, the least recently used is evicted first
+        """
+        self.default_ttl = default_ttl
+        self.endpoint_ttls = sorted((endpoint_ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.max_entries = max_entries
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+        self.__generation = 0
+
+    @property
+    def generation(self):
+        """number of invalidations so far, read it before sending a GET and pass it to put"""
+        return self.__generation
+
+    def ttl_for(self, endpoint: str):
+        """method to get the ttl that applies to an endpoint"""
+        path = urlsplit(endpoint).path
+        for prefix, ttl in self.endpoint_ttls:
+            if path.startswith(prefix):
+                return ttl
+        return self.default_ttl
+
+    def get(self, endpoint: str):
+        """method to get a cached response
+        Returns:
+            a copy of the cached response or None when absent or expired
+        """
+        with self.__lock:
+            entry = self.__entries.get(endpoint)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self.__entries[endpoint]
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(endpoint)
+            self.__hits += 1
+            response = entry[2]
+        return copy.deepcopy(response)
+
+    def put(self, endpoint: str, response, generation=None):
+        """method to cache a response for the ttl of its endpoint
+        Args:
+            endpoint: endpoint string the response was read from
+            response: SEMP response
+            generation: generation read before the request was sent, the response is dropped when a write
+                invalidated the cache since then
+        """
+        ttl = self.ttl_for(endpoint)
+        if not ttl or self.max_entries <= 0:
+            return
+        with self.__lock:
+            if generation is not None and generation != self.__generation:
+                return
+            self.__entries[endpoint] = (time.monotonic() + ttl, resource_path(endpoint), copy.deepcopy(response))
+            self.__entries.move_to_end(endpoint)
+            while len(self.__entries) > self.max_entries:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def invalidate(self, endpoint: str):
+        """method to evict the entries affected by a write to an endpoint
+        Returns:
+            number of evicted entries
+        """
+        written = resource_path(endpoint)
+        with self.__lock:
+            self.__generation += 1
+            stale = [key for key, (_, path, _) in self.__entries.items()
+                     if self.__is_related(path, written)]
+            for key in stale:
+                del self.__entries[key]
+            self.__invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """method to drop every cached response"""
+        with self.__lock:
+            self.__generation += 1
+            self.__entries.clear()
+
+    def stats(self):
+        """method to get the cache statistics"""
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {'hits': self.__hits, 'misses': self.__misses,
+                    'hit_rate': self.__hits / lookups if lookups else 0.0,
+                    'evictions': self.__evictions, 'invalidations': self.__invalidations,
+                    'size': len(self.__entries)}
+
+    @staticmethod
+    def __is_related(cached_path: str, written_path: str):
+        """a write changes the resource itself, everything below it and the collections listing it"""
+        return cached_path == written_path or cached_path.startswith(written_path + '/') \
+            or written_path.startswith(cached_path + '/') or not written_path or not cached_path
@@ -1,43 +1,267 @@
 """module for semp client"""
 import json
+import time
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-from requests.exceptions import HTTPError
+
+from howtos.SEMPv2.semp_cache import SempResponseCache
+from howtos.SEMPv2.semp_metrics import SempMetrics
+from howtos.SEMPv2.semp_resilience import RetryPolicy, TokenBucket, CircuitBreaker
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 16
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+
+class SempRequestError(Exception):
+    """raised when a SEMP request fails for good, after any retries"""
+
+    def __init__(self, method: str, url: str, status_code=None, body=None, reason=None):
+        """
+        Args:
+            method: http method of the request
+            url: request url
+            status_code: http status code, None when no response was received
+            body: SEMP response, or the response text when it is not json
+            reason: error description when no response was received
+        """
+        detail = reason if status_code is None else f'Response status code: {status_code}.\n{body}'
+        super().__init__(f'HTTP {method} [{url}] request failed. {detail}')
+        self.method = method
+        self.url = url
+        self.status_code = status_code
+        self.body = body
+
+    @property
+    def semp_status(self):
+        """SEMP error status of the response such as NOT_FOUND or ALREADY_EXISTS, None when there is none"""
+        if isinstance(self.body, dict):
+            return self.body.get('meta', {}).get('error', {}).get('status')
+        return None
 
 
 class SempClient:
     """class holds semp client related methods"""
 
-    def __init__(self, semp_base_url: str, user_name="admin", password="admin", verify_ssl=False):
+    def __init__(self, semp_base_url: str, user_name="admin", password="admin", verify_ssl=False,
+                 pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 response_cache: SempResponseCache = None, retry_policy: RetryPolicy = None,
+                 rate_limiter: TokenBucket = None, circuit_breaker: CircuitBreaker = None,
+                 metrics: SempMetrics = None):
+        """
+        Args:
+            semp_base_url: SEMP base url including scheme and port
+            user_name: SEMP admin user name
+            password: SEMP admin password
+            verify_ssl: verify the broker certificate on https connections
+            pool_connections: number of distinct hosts to keep connection pools for
+            pool_maxsize: maximum number of keep-alive connections kept per host
+            pool_block: block when all pooled connections are in use instead of opening extra ones
+            connect_timeout: seconds to wait for a connection to the broker
+            read_timeout: seconds to wait for a SEMP response once connected
+            response_cache: optional cache serving repeated GET calls, invalidated by PATCH, POST and DELETE
+            retry_policy: optional retries with jittered exponential backoff on 429, 5xx and connection errors
+            rate_limiter: optional token bucket limiting the requests per second sent to the broker
+            circuit_breaker: optional breaker failing calls fast while the SEMP endpoint keeps failing
+            metrics: optional collector of per endpoint template latency, status codes and bytes
+        """
         self.url_with_port = semp_base_url
         self.user_name = user_name
         self.password = password
         self.verify_ssl = verify_ssl
+        self.timeout = (connect_timeout, read_timeout)
+        self.response_cache = response_cache
+        self.retry_policy = retry_policy
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.metrics = metrics
 
         self.authHeader = HTTPBasicAuth(self.user_name, self.password)
         self.json_content_type_header = {'Content-Type': 'application/json'}
 
+        self.session = requests.Session()
+        self.session.auth = self.authHeader
+        self.session.verify = self.verify_ssl
+        self.__adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                     pool_block=pool_block)
+        self.session.mount('http://', self.__adapter)
+        self.session.mount('https://', self.__adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """method to close the pooled keep-alive connections held by this client"""
+        self.session.close()
+
+    def pool_stats(self):
+        """method to get the connection pool usage of this client
+
+        Returns:
+            dict with the number of requests served from a pooled connection (hits), the number of new
+            connections opened (misses) and the total request count
+        """
+        requests_count = 0
+        connections_count = 0
+        pools = self.__adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            requests_count += pool.num_requests
+            connections_count += pool.num_connections
+        return {'hits': requests_count - connections_count, 'misses': connections_count,
+                'requests': requests_count}
+
+    def cache_stats(self):
+        """method to get the response cache statistics
+
+        Returns:
+            dict with hits, misses, hit_rate, evictions, invalidations and size, or None when caching is off
+        """
+        return self.response_cache.stats() if self.response_cache is not None else None
+
+    def __endpoint_from_uri(self, uri: str):
+        """method to turn an absolute uri returned by SEMP, such as a paging cursorUri, into an endpoint string"""
+        if uri.startswith(self.url_with_port):
+            return uri[len(self.url_with_port):]
+        parts = urlsplit(uri)
+        return f'{parts.path}?{parts.query}' if parts.query else parts.path
+
+    def __send(self, method: str, url: str, payload=None, headers=None):
+        """method to send a request over the pooled session, invalidating the cached reads around a write"""
+        if method == 'GET' or self.response_cache is None:
+            return self.__send_with_retries(method, url, payload, headers)
+        # before, so the old state is not served while writing, and after, so a GET that read the old state
+        # while the write was in flight does not stay cached
+        self.response_cache.invalidate(url)
+        try:
+            return self.__send_with_retries(method, url, payload, headers)
+        finally:
+            self.response_cache.invalidate(url)
+
+    def __send_with_retries(self, method: str, url: str, payload=None, headers=None):
+        data = json.dumps(payload) if payload is not None else None
+        attempt = 0
+        while True:
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_call()
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            retry_after = None
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, data=data, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                self.__record_metrics(method, url, 'error', started, data)
+                self.__record_outcome(False)
+                # a POST is only sent again when it surely never reached the broker
+                if not self.__can_retry(attempt) or \
+                        (method == 'POST' and not isinstance(error, requests.ConnectTimeout)):
+                    raise
+            else:
+                self.__record_metrics(method, url, response.status_code, started, data, len(response.content))
+                retryable = self.retry_policy is not None and \
+                    self.retry_policy.is_retryable_status(method, response.status_code)
+                self.__record_outcome(response.status_code < 500 and response.status_code != 429)
+                if not retryable or not self.__can_retry(attempt):
+                    return response
+                retry_after = self.__retry_after_seconds(response)
+            delay = self.retry_policy.backoff(attempt, retry_after)
+            print(f'Retrying HTTP {method} - {url} in {delay:.2f}s (attempt {attempt + 2})')
+            time.sleep(delay)
+            attempt += 1
+
+    def __record_metrics(self, method, url, status, started, data, bytes_received=0):
+        if self.metrics is not None:
+            self.metrics.record(method, url, status, time.perf_counter() - started,
+                                len(data) if data is not None else 0, bytes_received)
+
+    def __can_retry(self, attempt: int):
+        return self.retry_policy is not None and attempt < self.retry_policy.max_retries
+
+    def __record_outcome(self, healthy: bool):
+        if self.circuit_breaker is None:
+            return
+        if healthy:
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+
+    @staticmethod
+    def __retry_after_seconds(response):
+        try:
+            return float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            return None
+
+    def __request(self, method: str, endpoint: str, payload=None, headers=None, raise_exception=True):
+        """method to send a request and return its SEMP response
+
+        Raises:
+            SempRequestError when the request failed for good, SempCircuitOpenError while the breaker is open
+        """
+        url = f"{self.url_with_port}{endpoint}"
+        try:
+            response = self.__send(method, url, payload, headers)
+        except requests.RequestException as error:
+            print(f'Error occurred while HTTP {method} - {url}. \n Exception: {error}')
+            raise SempRequestError(method, url, reason=str(error)) from error
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        if isinstance(body, dict) and (response.status_code == 200 or not raise_exception):
+            return body
+        error = SempRequestError(method, url, response.status_code, body)
+        print(f'Error occurred while HTTP {method} - {url}. \n Exception: {error}')
+        raise error
+
     def http_get(self, endpoint: str):
         """method to get the http endpoint
         Args:
             endpoint: endpoint string
 
+        Returns:
+            SEMP response dict
+
         Raises:
-            HTTP GET request failed. with response status code or
-            HTTP error occurred while HTTP GET exception
+            SempRequestError when the request failed, SempCircuitOpenError while the circuit breaker is open
         """
-        url = f"{self.url_with_port}{endpoint}"
-        try:
-            req = requests.get(url, auth=self.authHeader, verify=self.verify_ssl)
-            if req.status_code == 200:
-                return req.json()
-            else:
-                raise Exception(f"HTTP GET request failed. Response status code: {req.status_code}. \n {req.json()}")
-        except HTTPError as http_err:
-            print(f'HTTP error occurred while HTTP GET - {url}. \n Exception: {http_err}')
-        except Exception as err:
-            print(f'Error occurred while HTTP GET - {url}. \n Exception: {err}')
+        if self.response_cache is None:
+            return self.__request('GET', endpoint)
+        cached = self.response_cache.get(endpoint)
+        if cached is not None:
+            return cached
+        generation = self.response_cache.generation
+        response = self.__request('GET', endpoint)
+        self.response_cache.put(endpoint, response, generation)
+        return response
+
+    def http_get_paged(self, endpoint: str):
+        """method to stream every object of a paged SEMP collection
+        Args:
+            endpoint: collection endpoint string, its count query parameter sets the page size
+
+        Returns:
+            generator of the collection objects, fetching the next page from meta.paging.cursorUri only once
+            the current page has been consumed
+
+        Raises:
+            SempRequestError when a collection page cannot be read
+        """
+        next_endpoint = endpoint
+        while next_endpoint is not None:
+            response = self.http_get(next_endpoint)
+            yield from response.get('data') or []
+            cursor_uri = response.get('meta', {}).get('paging', {}).get('cursorUri')
+            next_endpoint = self.__endpoint_from_uri(cursor_uri) if cursor_uri else None
 
     def http_patch(self, endpoint: str, payload):
         """method to update the http endpoint
@@ -45,71 +269,42 @@ class SempClient:
             endpoint: endpoint string
             payload: request payload
 
+        Returns:
+            SEMP response dict
+
         Raises:
-            HTTP PATCH request failed. with response status code or
-            HTTP error occurred while HTTP PATCH exception
+            SempRequestError when the request failed, SempCircuitOpenError while the circuit breaker is open
         """
-        url = f"{self.url_with_port}{endpoint}"
-        try:
-            req = requests.patch(url, auth=self.authHeader, data=json.dumps(payload),
-                                 headers=self.json_content_type_header, verify=self.verify_ssl)
-
-            if req.status_code == 200:
-                return req.json()
-            else:
-                raise Exception(f"HTTP PATCH request failed. Response status code: {req.status_code}. \n {req.json()}")
-        except HTTPError as http_err:
-            print(f'HTTP error occurred while HTTP PATCH - {url}. \n Exception: {http_err}')
-        except Exception as err:
-            print(f'Error occurred while HTTP PATCH - {url}. \n Exception: {err}')
+        return self.__request('PATCH', endpoint, payload, self.json_content_type_header)
 
     def http_post(self, endpoint: str, payload, raise_exception=True):
         """method for http post
         Args:
             endpoint: endpoint string
             payload: request payload
+            raise_exception: when False the SEMP response of a failed request is returned instead, e.g. to check
+                for ALREADY_EXISTS
+
+        Returns:
+            SEMP response dict
 
         Raises:
-            HTTP POST request failed. with response status code or
-            HTTP error occurred while HTTP POST exception
+            SempRequestError when the request failed, SempCircuitOpenError while the circuit breaker is open
         """
+        return self.__request('POST', endpoint, payload, self.json_content_type_header, raise_exception)
 
-        url = f"{self.url_with_port}{endpoint}"
-        try:
-
-            req = requests.post(url, auth=self.authHeader, data=json.dumps(payload),
-                                headers=self.json_content_type_header, verify=self.verify_ssl)
-            if req.status_code == 200:
-                return req.json()
-            else:
-                if raise_exception:
-                    raise Exception(f"HTTP POST [%s] request failed. Response status code: %s.\n%s",
-                                    url, req.status_code, req.json())
-                else:
-                    return req.json()
-        except HTTPError as http_err:
-            print(f'HTTP error occurred while HTTP POST [%s].\nException: %s', url, http_err)
-        except Exception as err:
-            print(f'HTTP error occurred while HTTP POST [%s].\nException: %s', url, err)
-
-    def http_delete(self, endpoint: str):
+    def http_delete(self, endpoint: str, raise_exception=True):
         """method for http delete
         Args:
             endpoint: endpoint string
+            raise_exception: when False the SEMP response of a failed request is returned instead, e.g. to check
+                for NOT_FOUND
+
+        Returns:
+            SEMP response dict
 
         Raises:
-            HTTP DELETE request failed. with response status code or
-            HTTP error occurred while HTTP DELETE exception
+            SempRequestError when the request failed, SempCircuitOpenError while the circuit breaker is open
         """
-        url = f"{self.url_with_port}{endpoint}"
-        try:
-            req = requests.delete(url, auth=self.authHeader, headers=self.json_content_type_header,
-                                  verify=self.verify_ssl)
-            if req.status_code == 200:
-                return req.json()
-            else:
-                raise Exception(f'HTTP DELETE request failed. Response status code: {req.status_code}. \n {req.json()}')
-        except HTTPError as http_err:
-            print(f'HTTP error occurred while HTTP DELETE - {url}. \n Exception: {http_err}')
-        except Exception as err:
-            print(f'Error occurred while HTTP DELETE - {url}. \n Exception: {err}')
+        return self.__request('DELETE', endpoint, headers=self.json_content_type_header,
+                              raise_exception=raise_exception)
@@ -1,10 +1,20 @@
 """
 module for holding semp endpoint values
 """
+import urllib.parse
 from string import Template
 
+# page size used when streaming monitor collections, SEMP follows meta.paging.cursorUri for the next page
+DEFAULT_PAGE_COUNT = 100
+
+
+def quote_name(name: str):
+    """method to encode an object name as a single path segment for the endpoint templates"""
+    return urllib.parse.quote(name, safe='')
+
+
 GET_MSG_VPN_CLIENT_DETAILS_ENDPOINT = Template("/SEMP/v2/monitor/msgVpns/$msg_vpn_name/clients?select"
-                                               "=clientName,msgVpnName,clientUsername&count=20")
+                                               "=clientName,msgVpnName,clientUsername&count=$count")
 
 GET_MESSAGE_VPN_SERVICE_SETTINGS_ENDPOINT \
     = Template("/SEMP/v2/monitor/msgVpns/$msg_vpn_name?select=msgVpnName,serviceSmfPlainTextEnabled,"
@@ -26,15 +36,15 @@ GET_MESSAGE_VPN_SERVICE_SETTINGS_ENDPOINT \
 PATCH_MESSAGE_VPN_ENDPOINT = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name")
 
 GET_SEMP_ABOUT_ENDPOINT = "/SEMP/v2/monitor/about"
-GET_ALL_MSG_VPN_ENDPOINT = "/SEMP/v2/monitor/msgVpns?select=msgVpnName,state,replicationEnabled," \
-                           "replicationRole," \
-                           "dmrEnabled,msgSpoolCurrentQueuesAndTopicEndpoints,msgSpoolMsgCount,msgVpnConnections," \
-                           "maxConnectionCount,msgVpnConnectionsServiceRestOutgoing," \
-                           "serviceRestOutgoingMaxConnectionCount&count=20"
+GET_ALL_MSG_VPN_ENDPOINT = Template("/SEMP/v2/monitor/msgVpns?select=msgVpnName,state,replicationEnabled,"
+                                    "replicationRole,"
+                                    "dmrEnabled,msgSpoolCurrentQueuesAndTopicEndpoints,msgSpoolMsgCount,"
+                                    "msgVpnConnections,maxConnectionCount,msgVpnConnectionsServiceRestOutgoing,"
+                                    "serviceRestOutgoingMaxConnectionCount&count=$count")
 
 GET_ALL_USER_LIST = Template("/SEMP/v2/monitor/msgVpns/$msg_vpn_name/clientUsernames"
                              "?select=clientUsername,msgVpnName,clientProfileName,aclProfileName,enabled,"
-                             "subscriptionManagerEnabled,dynamic&count=20")
+                             "subscriptionManagerEnabled,dynamic&count=$count")
 
 create_msg_vpn_endpoint = "/SEMP/v2/config/msgVpns"
 update_msg_vpn_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/clientProfiles/$client_profile_name")
@@ -69,6 +79,8 @@ allow_shared_subscription_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_
 
 create_queue_post_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues?select=queueName,"
                                       "msgVpnName")
+# returns the whole created queue so its configuration can be verified from the POST response alone
+create_queue_full_post_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues")
 create_queue_patch_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues/$queue_name")
 delete_queue_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues/$queue_name")
 
@@ -110,4 +122,48 @@ remove_topics_from_exception_list = Template("/SEMP/v2/config/msgVpns/$msg_vpn_n
 # end point to get number of solace clients connected
 sol_clients_connected = Template("/SEMP/v2/__private_monitor__/msgVpns/$msg_vpn_name/clients?select=clientName"
                                  ",msgVpnName,clientUsername,subscriptionCount,rxDiscardedMsgCount,txDiscardedMsgCount,"
-                                 "noSubscriptionMatchRxDiscardedMsgCount,clientAddress,slowSubscriber&count=20")
+                                 "noSubscriptionMatchRxDiscardedMsgCount,clientAddress,slowSubscriber&count=$count")
+
+# config api collections used to read the current broker state, paged with count
+GET_QUEUE_CONFIG_LIST = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues?count=$count")
+GET_QUEUE_SUBSCRIPTION_CONFIG_LIST = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues/$queue_name"
+                                              "/subscriptions?select=subscriptionTopic&count=$count")
+GET_CLIENT_USERNAME_CONFIG_LIST = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/clientUsernames?count=$count")
+delete_topic_on_queue_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues/$queue_name"
+                                          "/subscriptions/$subscription_topic")
+
+# monitor api queue collection with the usage and rate counters used by the statistics tools
+GET_QUEUE_MONITOR_LIST = Template("/SEMP/v2/monitor/msgVpns/$msg_vpn_name/queues?select=queueName,msgVpnName,"
+                                  "accessType,ingressEnabled,egressEnabled,msgSpoolUsage,maxMsgSpoolUsage,"
+                                  "spooledMsgCount,bindCount,txUnackedMsgCount,rxMsgRate,txMsgRate,"
+                                  "averageRxMsgRate,averageTxMsgRate&count=$count")
+
+# profiles and acl collections exported and imported with a message vpn snapshot
+GET_CLIENT_PROFILE_CONFIG_LIST = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/clientProfiles?count=$count")
+GET_ACL_PROFILE_CONFIG_LIST = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/aclProfiles?count=$count")
+GET_ACL_PUBLISH_EXCEPTION_CONFIG_LIST = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/aclProfiles"
+                                                 "/$acl_profile_name/publishTopicExceptions?count=$count")
+GET_ACL_SUBSCRIBE_EXCEPTION_CONFIG_LIST = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/aclProfiles"
+                                                   "/$acl_profile_name/subscribeTopicExceptions?count=$count")
+client_profile_post_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/clientProfiles")
+acl_profile_post_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/aclProfiles")
+acl_profile_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/aclProfiles/$acl_profile_name")
+acl_publish_exception_post_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/aclProfiles"
+                                               "/$acl_profile_name/publishTopicExceptions")
+acl_subscribe_exception_post_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/aclProfiles"
+                                                 "/$acl_profile_name/subscribeTopicExceptions")
+
+get_queue_config_endpoint = Template("/SEMP/v2/config/msgVpns/$msg_vpn_name/queues/$queue_name")
+
+# end points for the client inventory, the client attributes come with the paged list and only the connections
+# are read per client
+GET_CLIENT_INVENTORY_LIST = Template("/SEMP/v2/monitor/msgVpns/$msg_vpn_name/clients?select=clientName,"
+                                     "clientUsername,clientId,clientAddress,platform,softwareVersion,uptime,"
+                                     "subscriptionCount,slowSubscriber,rxMsgRate,txMsgRate,tlsVersion&count=$count")
+GET_CLIENT_CONNECTION_INVENTORY_LIST = Template("/SEMP/v2/monitor/msgVpns/$msg_vpn_name/clients/$client_name"
+                                                "/connections?select=clientAddress,tcpState,rxQueueByteCount,"
+                                                "txQueueByteCount,smoothedRoundTripTime&count=$count")
+
+# monitor counters of one queue polled by the consumer autoscaler
+get_queue_monitor_endpoint = Template("/SEMP/v2/monitor/msgVpns/$msg_vpn_name/queues/$queue_name?select=queueName,"
+                                      "accessType,spooledMsgCount,msgSpoolUsage,bindCount,rxMsgRate,txMsgRate")
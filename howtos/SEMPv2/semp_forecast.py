@@ -0,0 +1,151 @@
+"""module for forecasting queue spool fill and backlog drain from queue monitor statistics"""
+import time
+from collections import deque
+
+from howtos.SEMPv2.semp_utility import SempUtility
+
+BYTES_PER_MB = 1024 * 1024
+# create_queue provisions every queue with maxMsgSpoolUsage 1500 MB
+DEFAULT_MAX_MSG_SPOOL_USAGE_MB = 1500
+# same set percent as the eventMsgSpoolUsageThreshold create_queue configures
+DEFAULT_USAGE_WARNING_RATIO = 0.8
+
+
+def _linear_slopes(series_list):
+    """method to fit a least squares line to each of many (ts, value) series
+
+    The fit is a plain loop on purpose: every series holds at most window samples, so the loop is
+    O(total samples) with a handful of float operations each, a few microseconds per queue, while numpy is not a
+    dependency of the samples and would cost more to import than it saves here.
+
+    Returns:
+        list with the slope per second of every series, 0.0 for series with fewer than two distinct timestamps
+    """
+    slopes = []
+    for series in series_list:
+        count = len(series)
+        if count < 2:
+            slopes.append(0.0)
+            continue
+        origin = series[0][0]
+        sum_t = sum_v = sum_tt = sum_tv = 0.0
+        for ts, value in series:
+            offset = ts - origin
+            sum_t += offset
+            sum_v += value
+            sum_tt += offset * offset
+            sum_tv += offset * value
+        denominator = count * sum_tt - sum_t * sum_t
+        slopes.append((count * sum_tv - sum_t * sum_v) / denominator if denominator else 0.0)
+    return slopes
+
+
+class SpoolForecaster:
+    """predicts, per queue, the time until maxMsgSpoolUsage is reached or until the backlog drains
+
+    Feed it with observe_vpn() on a schedule, or seed it from a SempStatsStore with load_history(). The spool
+    usage trend is a least squares fit over the last window samples of each queue and gives the time to full. The
+    ingress and egress rates are the means of rxMsgRate and txMsgRate over the same window, and the backlog drains
+    in spooledMsgCount / (egress - ingress) seconds. The usage trend is only used for the drain when the spooled
+    message count was not sampled.
+    """
+
+    def __init__(self, window=20, warning_horizon=3600.0, usage_warning_ratio=DEFAULT_USAGE_WARNING_RATIO):
+        """
+        Args:
+            window: number of most recent samples per queue used for the estimates
+            warning_horizon: seconds to full below which a queue is flagged
+            usage_warning_ratio: spool usage ratio above which a queue is flagged regardless of trend
+        """
+        self.window = window
+        self.warning_horizon = warning_horizon
+        self.usage_warning_ratio = usage_warning_ratio
+        self.__samples = {}
+
+    def observe(self, queue_name: str, ts: float, msg_spool_usage: float, max_msg_spool_usage_mb=None,
+                rx_msg_rate=0.0, tx_msg_rate=0.0, spooled_msg_count=None):
+        """method to add one sample of a queue
+        Args:
+            queue_name: queue name
+            ts: sample time in epoch seconds
+            msg_spool_usage: spooled bytes
+            max_msg_spool_usage_mb: spool limit in MB, defaults to the create_queue limit
+            rx_msg_rate: ingress messages per second
+            tx_msg_rate: egress messages per second
+            spooled_msg_count: spooled messages, None when not known
+        """
+        samples = self.__samples.get(queue_name)
+        if samples is None:
+            samples = self.__samples[queue_name] = deque(maxlen=self.window)
+        limit = max_msg_spool_usage_mb if max_msg_spool_usage_mb else DEFAULT_MAX_MSG_SPOOL_USAGE_MB
+        samples.append((ts, float(msg_spool_usage), limit * BYTES_PER_MB, float(rx_msg_rate or 0.0),
+                        float(tx_msg_rate or 0.0), spooled_msg_count))
+
+    def observe_vpn(self, semp_utility: SempUtility, vpn_name: str, now=None):
+        """method to sample every queue of a message vpn through SempUtility.iter_queue_stats
+        Returns:
+            number of queues sampled
+        """
+        now = time.time() if now is None else now
+        count = 0
+        for queue in semp_utility.iter_queue_stats(vpn_name):
+            self.observe(queue['queueName'], now, queue.get('msgSpoolUsage', 0), queue.get('maxMsgSpoolUsage'),
+                         queue.get('rxMsgRate', 0.0), queue.get('txMsgRate', 0.0), queue.get('spooledMsgCount'))
+            count += 1
+        return count
+
+    def load_history(self, stats_store, vpn_name: str, since: float, resolution='1m'):
+        """method to seed the samples from a SempStatsStore filled by SempStatsCollector
+        Args:
+            stats_store: SempStatsStore
+            vpn_name: message vpn name
+            since: epoch seconds of the oldest history to load
+            resolution: store resolution to read, the rollup average is used as the sample value
+        """
+        value_index = 1
+        for queue_name in stats_store.objects(vpn_name):
+            series = {metric: {row[0]: row[value_index] for row in
+                               stats_store.query(vpn_name, queue_name, metric, since, resolution=resolution)}
+                      for metric in ('msgSpoolUsage', 'maxMsgSpoolUsage', 'rxMsgRate', 'txMsgRate', 'spooledMsgCount')}
+            for ts in sorted(series['msgSpoolUsage'])[-self.window:]:
+                self.observe(queue_name, ts, series['msgSpoolUsage'][ts], series['maxMsgSpoolUsage'].get(ts),
+                             series['rxMsgRate'].get(ts, 0.0), series['txMsgRate'].get(ts, 0.0),
+                             series['spooledMsgCount'].get(ts))
+
+    def forecast(self):
+        """method to forecast every observed queue
+
+        Returns:
+            list of dicts with queue, usage_bytes, limit_bytes, usage_ratio, fill_rate_bytes_per_sec,
+            spooled_msg_count, ingress_rate, egress_rate, seconds_to_full, seconds_to_drain and warning, the
+            queues closest to full first. seconds_to_drain is None when the backlog does not shrink
+        """
+        names = list(self.__samples)
+        windows = [self.__samples[name] for name in names]
+        fill_rates = _linear_slopes([[(sample[0], sample[1]) for sample in samples] for samples in windows])
+        forecasts = []
+        for name, samples, fill_rate in zip(names, windows, fill_rates):
+            _, usage, limit, _, _, spooled = samples[-1]
+            ingress = sum(sample[3] for sample in samples) / len(samples)
+            egress = sum(sample[4] for sample in samples) / len(samples)
+            seconds_to_full = (limit - usage) / fill_rate if fill_rate > 0 else None
+            if spooled is not None:
+                drain_rate, backlog = egress - ingress, spooled
+            else:
+                drain_rate, backlog = -fill_rate, usage
+            seconds_to_drain = 0.0 if not backlog else (backlog / drain_rate if drain_rate > 0 else None)
+            usage_ratio = usage / limit if limit else 0.0
+            forecasts.append({'queue': name, 'usage_bytes': usage, 'limit_bytes': limit, 'usage_ratio': usage_ratio,
+                              'fill_rate_bytes_per_sec': fill_rate, 'spooled_msg_count': spooled,
+                              'ingress_rate': ingress, 'egress_rate': egress,
+                              'seconds_to_full': max(0.0, seconds_to_full) if seconds_to_full is not None else None,
+                              'seconds_to_drain': seconds_to_drain,
+                              'warning': usage_ratio >= self.usage_warning_ratio or
+                              (seconds_to_full is not None and seconds_to_full <= self.warning_horizon)})
+        forecasts.sort(key=lambda item: item['seconds_to_full'] if item['seconds_to_full'] is not None
+                       else float('inf'))
+        return forecasts
+
+    def warnings(self):
+        """method to get only the forecasts of queues about to reject publishers"""
+        return [forecast for forecast in self.forecast() if forecast['warning']]
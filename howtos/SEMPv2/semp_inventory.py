@@ -0,0 +1,123 @@
+"""module for a batched inventory of the clients connected to a message vpn
+
+The client attributes are read with one paged call using a wide select, so the per client calls made by
+SempUtility.get_client_connection_properties are not needed. Only the connections of each client are read per
+client, concurrently.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from howtos.SEMPv2.semp_endpoint import DEFAULT_PAGE_COUNT, GET_CLIENT_INVENTORY_LIST, \
+    GET_CLIENT_CONNECTION_INVENTORY_LIST, quote_name
+from howtos.SEMPv2.semp_client import SempRequestError
+
+CLIENT_COLUMNS = ('clientName', 'clientUsername', 'clientId', 'clientAddress', 'platform', 'softwareVersion',
+                  'uptime', 'subscriptionCount', 'slowSubscriber', 'rxMsgRate', 'txMsgRate', 'tlsVersion')
+# the connections of a client are summarised into these columns
+CONNECTION_COLUMNS = ('connectionCount', 'tcpState', 'rxQueueByteCount', 'txQueueByteCount',
+                      'smoothedRoundTripTime')
+
+
+class ClientInventory:
+    """column oriented table of clients, one list of values per column and one row per client"""
+
+    def __init__(self, columns: dict, msg_vpn_name=None, fetched_at=None, elapsed=0.0):
+        """
+        Args:
+            columns: dict of column name to its list of values, all lists of the same length
+            msg_vpn_name: message vpn the clients belong to
+            fetched_at: epoch seconds the inventory was read
+            elapsed: seconds spent reading the inventory
+        """
+        self.columns = columns
+        self.msg_vpn_name = msg_vpn_name
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+        self.elapsed = elapsed
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()), ()))
+
+    def column(self, name: str):
+        """method to get the values of one column"""
+        return self.columns[name]
+
+    def row(self, index: int):
+        """method to get one client as a dict"""
+        return {name: values[index] for name, values in self.columns.items()}
+
+    def rows(self):
+        """method to iterate the clients as dicts"""
+        return (self.row(index) for index in range(len(self)))
+
+    def select(self, indexes):
+        """method to get a new inventory holding only the given rows, in the given order"""
+        return ClientInventory({name: [values[index] for index in indexes] for name, values in self.columns.items()},
+                               self.msg_vpn_name, self.fetched_at, self.elapsed)
+
+    def filter(self, column: str, predicate):
+        """method to keep the clients whose column value satisfies the predicate
+        Args:
+            column: column name
+            predicate: callable taking the column value
+
+        Returns:
+            ClientInventory
+        """
+        return self.select([index for index, value in enumerate(self.columns[column]) if predicate(value)])
+
+    def sort_by(self, column: str, reverse=False):
+        """method to order the clients by a column, missing values last"""
+        values = self.columns[column]
+        present = sorted((index for index in range(len(values)) if values[index] is not None),
+                         key=values.__getitem__, reverse=reverse)
+        return self.select(present + [index for index in range(len(values)) if values[index] is None])
+
+
+def _summarise_connections(connections):
+    if connections is None:
+        return dict.fromkeys(CONNECTION_COLUMNS)
+    round_trip_times = [connection['smoothedRoundTripTime'] for connection in connections
+                        if connection.get('smoothedRoundTripTime') is not None]
+    return {'connectionCount': len(connections),
+            'tcpState': ','.join(sorted({connection.get('tcpState') or '' for connection in connections})) or None,
+            'rxQueueByteCount': sum(connection.get('rxQueueByteCount') or 0 for connection in connections),
+            'txQueueByteCount': sum(connection.get('txQueueByteCount') or 0 for connection in connections),
+            'smoothedRoundTripTime': max(round_trip_times) if round_trip_times else None}
+
+
+def fetch_client_inventory(semp_client, msg_vpn_name: str, concurrency=8, include_connections=True,
+                           page_size=DEFAULT_PAGE_COUNT):
+    """method to read the clients of a message vpn with their connections
+    Args:
+        semp_client: SempClient used to read the monitor api
+        msg_vpn_name: message vpn name
+        concurrency: number of connection reads in flight
+        include_connections: also read the connections of every client
+        page_size: number of objects fetched per SEMP call
+
+    Returns:
+        ClientInventory with the CLIENT_COLUMNS and, when include_connections, the CONNECTION_COLUMNS. The
+        connection columns are None for a client that disconnected while the inventory was read
+    """
+    start = time.perf_counter()
+    fetched_at = time.time()
+    vpn = quote_name(msg_vpn_name)
+    clients = list(semp_client.http_get_paged(GET_CLIENT_INVENTORY_LIST.substitute(msg_vpn_name=vpn,
+                                                                                   count=page_size)))
+    columns = {name: [client.get(name) for client in clients] for name in CLIENT_COLUMNS}
+    if include_connections:
+        def read_connections(client_name):
+            try:
+                return list(semp_client.http_get_paged(GET_CLIENT_CONNECTION_INVENTORY_LIST.substitute(
+                    msg_vpn_name=vpn, client_name=quote_name(client_name), count=page_size)))
+            except SempRequestError as err:
+                print(f'Unable to GET CLIENT CONNECTIONS: [{msg_vpn_name}], CLIENT Name: [{client_name}].'
+                      f' Exception: {err}')
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            summaries = [_summarise_connections(connections)
+                         for connections in executor.map(read_connections, columns['clientName'])]
+        for name in CONNECTION_COLUMNS:
+            columns[name] = [summary[name] for summary in summaries]
+    return ClientInventory(columns, msg_vpn_name, fetched_at, time.perf_counter() - start)
@@ -0,0 +1,202 @@
+"""module for semp call latency and error instrumentation"""
+import bisect
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from string import Template
+from urllib.parse import urlsplit, parse_qsl
+
+from howtos.SEMPv2 import semp_endpoint
+
+UNMATCHED_ENDPOINT = 'other'
+# query keys the broker adds to the next page uri of a paged collection
+PAGING_QUERY_KEYS = ('cursor',)
+
+# latency bucket upper bounds in seconds, growing by 25% from 0.5ms to about 2 minutes
+LATENCY_BUCKETS = tuple(0.0005 * 1.25 ** exponent for exponent in range(57))
+
+
+def _template_regex(template_text: str, prefix='/?'):
+    """method to turn an endpoint template, or one of its query values, into a regex matching any substitution"""
+    parts = re.split(r'\$\{?(\w+)\}?', template_text.lstrip('/'))
+    return re.compile(prefix + ''.join(re.escape(part) if index % 2 == 0 else '[^/?&]+'
+                                       for index, part in enumerate(parts)) + '$')
+
+
+def _endpoint_templates():
+    """method to collect the endpoint names, path patterns and query value patterns defined in semp_endpoint, in
+    definition order"""
+    templates = []
+    for name, value in vars(semp_endpoint).items():
+        text = value.template if isinstance(value, Template) else value
+        if name.startswith('_') or not isinstance(text, str) or 'SEMP/v2' not in text:
+            continue
+        path, _, query = text.partition('?')
+        query_regexes = {key: _template_regex(query_value, prefix='')
+                         for key, query_value in parse_qsl(query, keep_blank_values=True)}
+        templates.append((name, _template_regex(path), query_regexes))
+    return templates
+
+
+def _query_matches(query_regexes: dict, query: dict):
+    """method to check that a call has the query keys of a template and values matching them"""
+    return query.keys() == query_regexes.keys() and all(regex.match(query[key])
+                                                        for key, regex in query_regexes.items())
+
+
+class EndpointTemplateResolver:
+    """maps expanded endpoints back to the semp_endpoint names so metric keys have a bounded cardinality"""
+
+    def __init__(self, templates=None):
+        self.__templates = templates if templates is not None else _endpoint_templates()
+        self.__resolved = {}
+        self.__lock = threading.Lock()
+
+    def resolve(self, method: str, endpoint: str):
+        """method to get the semp_endpoint name for a call
+        Args:
+            method: http method
+            endpoint: endpoint string or absolute url
+
+        Returns:
+            the matching endpoint name, preferring names that mention the http method when several templates
+            share a url, or 'other' when nothing matches. The path and the query keys and values are matched, in
+            any order and without the paging keys, so the cursor pages of two lists sharing a path and differing in
+            their select resolve to their own template. A path alone only decides when no query matches
+        """
+        parts = urlsplit(endpoint)
+        full = f'{parts.path}?{parts.query}' if parts.query else parts.path
+        with self.__lock:
+            cached = self.__resolved.get((method, full))
+        if cached is not None:
+            return cached
+        query = {key: value for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                 if key not in PAGING_QUERY_KEYS}
+        paths = [(name, query_regexes) for name, path_regex, query_regexes in self.__templates
+                 if path_regex.match(parts.path)]
+        candidates = [name for name, query_regexes in paths if _query_matches(query_regexes, query)] or \
+                     [name for name, _ in paths]
+        preferred = [name for name in candidates if method.lower() in name.lower()]
+        if method == 'POST':
+            preferred = preferred or [name for name in candidates if 'create' in name.lower()]
+        name = (preferred or candidates or [UNMATCHED_ENDPOINT])[0]
+        if name == UNMATCHED_ENDPOINT or 'cursor=' in parts.query:
+            # every cursor page and unknown url is a new key, caching them would only fill the cache
+            return name
+        with self.__lock:
+            if len(self.__resolved) < 4096:
+                self.__resolved[(method, full)] = name
+        return name
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__resolved)
+
+
+class LatencyHistogram:
+    """fixed log scale latency histogram"""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction: float):
+        """method to get the latency upper bound of the bucket holding the given fraction of the calls"""
+        if self.total == 0:
+            return 0.0
+        rank = fraction * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(LATENCY_BUCKETS[index], self.max) if index < len(LATENCY_BUCKETS) else self.max
+        return self.max
+
+
+class SempMetrics:
+    """collects per endpoint template latency, status codes and bytes of SEMP calls
+
+    Pass an instance to SempClient as metrics. Read it with snapshot() or write it out with dump_jsonl().
+    """
+
+    def __init__(self, slow_call_threshold=1.0, slow_call_history=100, resolver: EndpointTemplateResolver = None):
+        """
+        Args:
+            slow_call_threshold: seconds above which a call is printed and kept in slow_calls, None disables it
+            slow_call_history: number of slow calls kept
+            resolver: maps endpoints to template names, defaults to the templates in semp_endpoint
+        """
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_calls = deque(maxlen=slow_call_history)
+        self.resolver = resolver if resolver is not None else EndpointTemplateResolver()
+        self.__stats = {}
+        self.__lock = threading.Lock()
+
+    def record(self, method: str, endpoint: str, status, seconds: float, bytes_sent=0, bytes_received=0):
+        """method to record one SEMP call
+        Args:
+            method: http method
+            endpoint: endpoint string or url that was called
+            status: http status code or 'error' when no response was received
+            seconds: call duration
+            bytes_sent: request body size
+            bytes_received: response body size
+        """
+        key = f'{method} {self.resolver.resolve(method, endpoint)}'
+        with self.__lock:
+            stats = self.__stats.get(key)
+            if stats is None:
+                stats = self.__stats[key] = {'histogram': LatencyHistogram(), 'status': Counter(),
+                                             'bytes_sent': 0, 'bytes_received': 0}
+            stats['histogram'].record(seconds)
+            stats['status'][str(status)] += 1
+            stats['bytes_sent'] += bytes_sent
+            stats['bytes_received'] += bytes_received
+        if self.slow_call_threshold is not None and seconds >= self.slow_call_threshold:
+            self.slow_calls.append({'time': time.time(), 'key': key, 'endpoint': endpoint, 'status': status,
+                                    'seconds': seconds})
+            print(f'Slow SEMP call {method} {endpoint} took {seconds:.3f}s, status: {status}')
+
+    def snapshot(self):
+        """method to get the current metrics
+
+        Returns:
+            dict of 'METHOD endpoint_name' to count, error count, status code counts, bytes and the p50, p95, p99,
+            mean and max latency in seconds
+        """
+        with self.__lock:
+            result = {}
+            for key, stats in self.__stats.items():
+                histogram = stats['histogram']
+                result[key] = {'count': histogram.total,
+                               'errors': sum(count for status, count in stats['status'].items()
+                                             if not status.startswith('2')),
+                               'status': dict(stats['status']),
+                               'bytes_sent': stats['bytes_sent'], 'bytes_received': stats['bytes_received'],
+                               'p50': histogram.percentile(0.50), 'p95': histogram.percentile(0.95),
+                               'p99': histogram.percentile(0.99),
+                               'mean': histogram.sum / histogram.total if histogram.total else 0.0,
+                               'max': histogram.max}
+            return result
+
+    def dump_jsonl(self, file_full_path: str, append=True):
+        """method to write the snapshot, one JSON line per endpoint, stamped with the dump time"""
+        dumped_at = time.time()
+        with open(file_full_path, 'a' if append else 'w') as writer:
+            for key, stats in self.snapshot().items():
+                writer.write(json.dumps({'time': dumped_at, 'key': key, **stats}) + '\n')
+
+    def reset(self):
+        with self.__lock:
+            self.__stats.clear()
+        self.slow_calls.clear()
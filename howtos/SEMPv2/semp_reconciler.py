@@ -0,0 +1,270 @@
+"""module for reconciling broker configuration against a declarative manifest
+
+A manifest lists message vpns with their queues, queue subscriptions and client usernames using SEMP attribute
+names, for example in JSON:
+
+    {"msgVpns": [{"msgVpnName": "load-test", "enabled": true, "maxMsgSpoolUsage": 1500, "prune": false,
+                  "queues": [{"queueName": "orders", "accessType": "non-exclusive",
+                              "subscriptions": ["orders/>"]}],
+                  "clientUsernames": [{"clientUsername": "app", "password": "app", "enabled": true}]}]}
+
+or the equivalent TOML using [[msgVpns]], [[msgVpns.queues]] and [[msgVpns.clientUsernames]] tables.
+Only the attributes listed are managed. A queue without a 'subscriptions' key keeps whatever subscriptions it has,
+and objects missing from the manifest are only deleted when the vpn sets 'prune' to true.
+"""
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from howtos.SEMPv2.semp_endpoint import quote_name, create_msg_vpn_endpoint, PATCH_MESSAGE_VPN_ENDPOINT, \
+    create_queue_full_post_endpoint, create_queue_patch_endpoint, delete_queue_endpoint, \
+    set_client_user_name_endpoint, activate_msg_vpn_user_patch_endpoint, delete_msg_vpn_user_endpoint, \
+    create_topic_on_queue_post_endpoint, delete_topic_on_queue_endpoint
+from howtos.SEMPv2.semp_client import SempRequestError
+from howtos.SEMPv2.semp_state import diff_fields
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPNS_KEY = 'msgVpns'
+QUEUES_KEY = 'queues'
+CLIENT_USERNAMES_KEY = 'clientUsernames'
+SUBSCRIPTIONS_KEY = 'subscriptions'
+PRUNE_KEY = 'prune'
+
+# changes are applied stage by stage so parents exist before children and children go before their parents,
+# a change whose parent object failed is skipped
+STAGE_MSG_VPN = 0
+STAGE_OBJECT = 1
+STAGE_SUBSCRIPTION_ADD = 2
+STAGE_SUBSCRIPTION_DELETE = 3
+STAGE_OBJECT_DELETE = 4
+
+
+def load_manifest(manifest_file_full_path: str):
+    """method to read a manifest from a .json or .toml file
+    Args:
+        manifest_file_full_path: path of the manifest file
+
+    Returns:
+        manifest dict
+
+    Raises:
+        unable to read the manifest
+    """
+    try:
+        with open(manifest_file_full_path, 'r') as content_file:
+            content = content_file.read()
+        if Path(manifest_file_full_path).suffix.lower() == '.toml':
+            import toml
+            return toml.loads(content)
+        return json.loads(content)
+    except Exception as exception:
+        raise Exception(f"Unable to read manifest file: {manifest_file_full_path}. Exception: {exception}")
+
+
+class SempReconciler:
+    """class to bring a broker to the state described by a manifest with the fewest SEMP calls
+
+    The current state is read through SempUtility, each object is compared field by field and only the POST,
+    PATCH and DELETE calls needed to remove the drift are issued, with only the drifted attributes in each PATCH.
+    """
+
+    def __init__(self, semp_utility: SempUtility, concurrency=8):
+        """
+        Args:
+            semp_utility: SempUtility used to read the broker state and to issue changes
+            concurrency: number of SEMP calls in flight while reading state and applying changes
+        """
+        self.semp_utility = semp_utility
+        self.semp_client = semp_utility.semp_client
+        self.concurrency = max(1, concurrency)
+
+    def reconcile(self, manifest: dict, dry_run=False):
+        """method to plan and apply the changes for a manifest
+        Args:
+            manifest: manifest dict, see load_manifest
+            dry_run: only plan the changes
+
+        Returns:
+            dict with the planned 'changes' and, unless dry_run, the apply summary under 'result'
+        """
+        changes = self.plan(manifest)
+        print(f"Reconcile planned {len(changes)} change(s)")
+        return {'changes': changes, 'result': None if dry_run else self.apply(changes)}
+
+    def plan(self, manifest: dict):
+        """method to compute the changes needed for a manifest
+        Args:
+            manifest: manifest dict, see load_manifest
+
+        Returns:
+            list of change dicts with 'stage', 'method', 'endpoint', 'payload', a readable 'object' and the
+            'object' of the parent change it 'depends_on', None for none
+        """
+        changes = []
+        for vpn in manifest.get(MSG_VPNS_KEY, []):
+            changes.extend(self.__plan_msg_vpn(vpn))
+        return changes
+
+    def apply(self, changes):
+        """method to issue planned changes, stage by stage with the changes of a stage in parallel
+        A change whose parent object failed or was skipped is skipped too, e.g. the queues of a vpn that could not be
+        created and the subscriptions of those queues.
+        Args:
+            changes: list of change dicts from plan
+
+        Returns:
+            dict with the 'applied', 'failed' and 'skipped' counts, the 'elapsed' seconds and the failed and skipped
+            changes in 'errors'
+        """
+        start = time.perf_counter()
+        errors = []
+        skipped = 0
+        not_applied = set()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for stage in sorted({change['stage'] for change in changes}):
+                stage_changes = []
+                for change in (change for change in changes if change['stage'] == stage):
+                    if change['depends_on'] in not_applied:
+                        skipped += 1
+                        not_applied.add(change['object'])
+                        errors.append({'object': change['object'], 'method': change['method'],
+                                       'error': f'skipped, {change["depends_on"]} was not applied'})
+                    else:
+                        stage_changes.append(change)
+                for change, error in zip(stage_changes, executor.map(self.__apply_change, stage_changes)):
+                    if error is not None:
+                        not_applied.add(change['object'])
+                        errors.append({'object': change['object'], 'method': change['method'], 'error': error})
+        return {'applied': len(changes) - len(errors), 'failed': len(errors) - skipped, 'skipped': skipped,
+                'elapsed': time.perf_counter() - start, 'errors': errors}
+
+    def __apply_change(self, change):
+        """method to issue one change, returns None on success or the error text"""
+        method, endpoint, payload = change['method'], change['endpoint'], change['payload']
+        try:
+            if method == 'POST':
+                response = self.semp_client.http_post(endpoint, payload, False)
+            elif method == 'PATCH':
+                response = self.semp_client.http_patch(endpoint, payload)
+            else:
+                response = self.semp_client.http_delete(endpoint)
+        except SempRequestError as error:
+            return f'{method} {change["object"]} failed: {error}'
+        if response['meta']['responseCode'] != 200:
+            return f'{method} {change["object"]} failed: {response["meta"].get("error")}'
+        return None
+
+    def __plan_msg_vpn(self, vpn: dict):
+        vpn_name = vpn['msgVpnName']
+        vpn_label = f'msgVpn {vpn_name}'
+        desired = self.__attributes(vpn, (QUEUES_KEY, CLIENT_USERNAMES_KEY, PRUNE_KEY))
+        prune = vpn.get(PRUNE_KEY, False)
+        current = self.semp_utility.get_message_vpn_config(vpn_name)
+        vpn_endpoint = PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=quote_name(vpn_name))
+        changes = []
+        if current is None:
+            changes.append(self.__change(STAGE_MSG_VPN, 'POST', create_msg_vpn_endpoint, desired, vpn_label))
+            current_queues, current_usernames = {}, {}
+        else:
+            drift = diff_fields(desired, current)
+            if drift:
+                changes.append(self.__change(STAGE_MSG_VPN, 'PATCH', vpn_endpoint, drift, vpn_label))
+            current_queues = {queue['queueName']: queue for queue in self.semp_utility.iter_queue_configs(vpn_name)}
+            current_usernames = {username['clientUsername']: username
+                                 for username in self.semp_utility.iter_client_username_configs(vpn_name)}
+
+        changes.extend(self.__plan_queues(vpn_name, vpn_label, vpn.get(QUEUES_KEY, []), current_queues, prune))
+        changes.extend(self.__plan_client_usernames(vpn_name, vpn_label, vpn.get(CLIENT_USERNAMES_KEY, []),
+                                                    current_usernames, prune))
+        return changes
+
+    def __plan_queues(self, vpn_name, vpn_label, queues, current_queues, prune):
+        changes = []
+        managed = [queue for queue in queues if queue.get(SUBSCRIPTIONS_KEY) is not None
+                   and queue['queueName'] in current_queues]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            current_subscriptions = dict(zip(
+                (queue['queueName'] for queue in managed),
+                executor.map(lambda queue: set(self.semp_utility.iter_queue_subscriptions(vpn_name,
+                                                                                          queue['queueName'])),
+                             managed)))
+
+        for queue in queues:
+            queue_name = queue['queueName']
+            label = f'queue {vpn_name}/{queue_name}'
+            desired = self.__attributes(queue, (SUBSCRIPTIONS_KEY,))
+            desired.setdefault('msgVpnName', vpn_name)
+            if queue_name not in current_queues:
+                changes.append(self.__change(STAGE_OBJECT, 'POST', create_queue_full_post_endpoint.substitute(
+                    msg_vpn_name=quote_name(vpn_name)), desired, label, vpn_label))
+            else:
+                drift = diff_fields(desired, current_queues[queue_name])
+                if drift:
+                    changes.append(self.__change(STAGE_OBJECT, 'PATCH', create_queue_patch_endpoint.substitute(
+                        msg_vpn_name=quote_name(vpn_name), queue_name=quote_name(queue_name)), drift, label,
+                        vpn_label))
+
+            wanted = queue.get(SUBSCRIPTIONS_KEY)
+            if wanted is None:
+                continue
+            existing = current_subscriptions.get(queue_name, set())
+            for topic in sorted(set(wanted) - existing):
+                changes.append(self.__change(STAGE_SUBSCRIPTION_ADD, 'POST',
+                                             create_topic_on_queue_post_endpoint.substitute(
+                                                 msg_vpn_name=quote_name(vpn_name), queue_name=quote_name(queue_name)),
+                                             {'subscriptionTopic': topic}, f'subscription {label} {topic}', label))
+            for topic in sorted(existing - set(wanted)):
+                changes.append(self.__change(STAGE_SUBSCRIPTION_DELETE, 'DELETE',
+                                             delete_topic_on_queue_endpoint.substitute(
+                                                 msg_vpn_name=quote_name(vpn_name), queue_name=quote_name(queue_name),
+                                                 subscription_topic=quote_name(topic)),
+                                             None, f'subscription {label} {topic}', label))
+
+        if prune:
+            wanted_names = {queue['queueName'] for queue in queues}
+            for queue_name in sorted(set(current_queues) - wanted_names):
+                if queue_name.startswith('#'):
+                    continue
+                changes.append(self.__change(STAGE_OBJECT_DELETE, 'DELETE', delete_queue_endpoint.substitute(
+                    msg_vpn_name=quote_name(vpn_name), queue_name=quote_name(queue_name)), None,
+                                             f'queue {vpn_name}/{queue_name}'))
+        return changes
+
+    def __plan_client_usernames(self, vpn_name, vpn_label, usernames, current_usernames, prune):
+        changes = []
+        for username in usernames:
+            client_username = username['clientUsername']
+            label = f'clientUsername {vpn_name}/{client_username}'
+            desired = dict(username)
+            desired.setdefault('msgVpnName', vpn_name)
+            if client_username not in current_usernames:
+                changes.append(self.__change(STAGE_OBJECT, 'POST', set_client_user_name_endpoint.substitute(
+                    msg_vpn_name=quote_name(vpn_name)), desired, label, vpn_label))
+            else:
+                drift = diff_fields(desired, current_usernames[client_username])
+                if drift:
+                    changes.append(self.__change(STAGE_OBJECT, 'PATCH',
+                                                 activate_msg_vpn_user_patch_endpoint.substitute(
+                                                     msg_vpn_name=quote_name(vpn_name),
+                                                     client_user_name=quote_name(client_username)), drift, label,
+                                                 vpn_label))
+        if prune:
+            wanted_names = {username['clientUsername'] for username in usernames}
+            for client_username in sorted(set(current_usernames) - wanted_names):
+                # the default and #-prefixed client usernames are owned by the broker
+                if client_username == 'default' or client_username.startswith('#'):
+                    continue
+                changes.append(self.__change(STAGE_OBJECT_DELETE, 'DELETE', delete_msg_vpn_user_endpoint.substitute(
+                    msg_vpn_name=quote_name(vpn_name), client_user_name=quote_name(client_username)), None,
+                                             f'clientUsername {vpn_name}/{client_username}'))
+        return changes
+
+    @staticmethod
+    def __attributes(manifest_object: dict, child_keys):
+        return {key: value for key, value in manifest_object.items() if key not in child_keys}
+
+    @staticmethod
+    def __change(stage, method, endpoint, payload, label, depends_on=None):
+        return {'stage': stage, 'method': method, 'endpoint': endpoint, 'payload': payload, 'object': label,
+                'depends_on': depends_on}
@@ -0,0 +1,144 @@
+"""module for semp retry, rate limiting and circuit breaking"""
+import random
+import threading
+import time
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# status codes telling that a POST was not processed, so it can be sent again without creating twice
+POST_RETRYABLE_STATUS_CODES = frozenset({429, 503})
+
+
+class SempCircuitOpenError(Exception):
+    """raised instead of calling SEMP while the circuit breaker is open"""
+
+
+class RetryPolicy:
+    """retry with jittered exponential backoff on throttling, server errors and connection errors"""
+
+    def __init__(self, max_retries=3, base_delay=0.2, max_delay=10.0, retry_statuses=RETRYABLE_STATUS_CODES):
+        """
+        Args:
+            max_retries: number of retries after the first attempt
+            base_delay: seconds of the first backoff, doubled for every further retry
+            max_delay: upper bound of a single backoff in seconds
+            retry_statuses: http status codes that are retried
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def is_retryable_status(self, method: str, status_code: int):
+        """method to check whether a response status code is retried for an http method"""
+        if method == 'POST':
+            return status_code in self.retry_statuses and status_code in POST_RETRYABLE_STATUS_CODES
+        return status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after=None):
+        """method to get the seconds to wait before the next attempt
+        Args:
+            attempt: zero based number of the attempt that failed
+            retry_after: seconds requested by the broker in a Retry-After header, if any
+
+        Returns:
+            a full jitter delay, never shorter than retry_after and never longer than max_delay
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return min(delay, self.max_delay)
+
+
+class TokenBucket:
+    """client side rate limiter allowing rate requests per second with bursts of up to burst requests"""
+
+    def __init__(self, rate: float, burst: int = None):
+        """
+        Args:
+            rate: sustained requests per second
+            burst: bucket size, defaults to one second worth of requests
+        """
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got [{rate}]')
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.__tokens = float(self.burst)
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """method to block until a request may be sent"""
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+                self.__updated = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                wait = (1 - self.__tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """circuit breaker failing fast once SEMP calls keep failing
+
+    After failure_threshold consecutive failures the circuit opens and calls are rejected for reset_timeout
+    seconds. Then a single trial call is let through, closing the circuit on success and opening it again on
+    failure.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        """
+        Args:
+            failure_threshold: consecutive failures that open the circuit
+            reset_timeout: seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.__state = CircuitBreaker.CLOSED
+        self.__failures = 0
+        self.__opened_at = 0.0
+        self.__trial_in_flight = False
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.__lock:
+            return self.__current_state()
+
+    def before_call(self):
+        """method to check that a call may go out
+
+        Raises:
+            SempCircuitOpenError while the circuit is open or a trial call is already in flight
+        """
+        with self.__lock:
+            state = self.__current_state()
+            if state == CircuitBreaker.OPEN or (state == CircuitBreaker.HALF_OPEN and self.__trial_in_flight):
+                raise SempCircuitOpenError(f'SEMP circuit is open after {self.__failures} consecutive failures')
+            if state == CircuitBreaker.HALF_OPEN:
+                self.__trial_in_flight = True
+
+    def record_success(self):
+        with self.__lock:
+            self.__state = CircuitBreaker.CLOSED
+            self.__failures = 0
+            self.__trial_in_flight = False
+
+    def record_failure(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__trial_in_flight or self.__failures >= self.failure_threshold:
+                self.__state = CircuitBreaker.OPEN
+                self.__opened_at = time.monotonic()
+            self.__trial_in_flight = False
+
+    def __current_state(self):
+        if self.__state == CircuitBreaker.OPEN and time.monotonic() - self.__opened_at >= self.reset_timeout:
+            self.__state = CircuitBreaker.HALF_OPEN
+        return self.__state
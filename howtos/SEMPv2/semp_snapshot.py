@@ -0,0 +1,193 @@
+"""module for exporting a message vpn configuration to a snapshot file and importing it back
+
+A snapshot is gzip compressed JSON holding the message vpn configuration with its client profiles, acl profiles
+and their publish and subscribe topic exceptions, client usernames, and queues with their topic subscriptions.
+Broker owned objects, whose names start with '#', are left out. SEMP never returns passwords, so a snapshot holds
+none: the client usernames are imported without a password unless import_message_vpn is given their passwords.
+"""
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from howtos.SEMPv2.semp_endpoint import quote_name, DEFAULT_PAGE_COUNT, GET_CLIENT_PROFILE_CONFIG_LIST, \
+    GET_ACL_PROFILE_CONFIG_LIST, GET_ACL_PUBLISH_EXCEPTION_CONFIG_LIST, GET_ACL_SUBSCRIBE_EXCEPTION_CONFIG_LIST, \
+    create_msg_vpn_endpoint, PATCH_MESSAGE_VPN_ENDPOINT, client_profile_post_endpoint, update_msg_vpn_endpoint, \
+    acl_profile_post_endpoint, acl_profile_endpoint, acl_publish_exception_post_endpoint, \
+    acl_subscribe_exception_post_endpoint, set_client_user_name_endpoint, activate_msg_vpn_user_patch_endpoint, \
+    create_queue_full_post_endpoint, create_queue_patch_endpoint, create_topic_on_queue_post_endpoint
+from howtos.SEMPv2.semp_client import SempRequestError
+
+SNAPSHOT_VERSION = 1
+PUBLISH_EXCEPTIONS_KEY = 'publishTopicExceptions'
+SUBSCRIBE_EXCEPTIONS_KEY = 'subscribeTopicExceptions'
+SUBSCRIPTIONS_KEY = 'subscriptions'
+
+
+def _user_objects(objects, name_key):
+    return [semp_object for semp_object in objects if not semp_object[name_key].startswith('#')]
+
+
+def export_message_vpn(semp_utility, msg_vpn_name: str, concurrency=8, page_size=DEFAULT_PAGE_COUNT):
+    """method to read a message vpn and all its child collections in parallel
+    Args:
+        semp_utility: SempUtility used to read the config api
+        msg_vpn_name: message vpn name
+        concurrency: number of SEMP reads in flight
+        page_size: number of objects fetched per SEMP call
+
+    Returns:
+        snapshot dict
+    """
+    semp_client = semp_utility.semp_client
+    vpn = quote_name(msg_vpn_name)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        vpn_config = executor.submit(semp_utility.get_message_vpn_config, msg_vpn_name)
+        client_profiles = executor.submit(lambda: list(semp_client.http_get_paged(
+            GET_CLIENT_PROFILE_CONFIG_LIST.substitute(msg_vpn_name=vpn, count=page_size))))
+        acl_profiles = executor.submit(lambda: list(semp_client.http_get_paged(
+            GET_ACL_PROFILE_CONFIG_LIST.substitute(msg_vpn_name=vpn, count=page_size))))
+        client_usernames = executor.submit(lambda: list(semp_utility.iter_client_username_configs(
+            msg_vpn_name, page_size)))
+        queues = executor.submit(lambda: list(semp_utility.iter_queue_configs(msg_vpn_name, page_size)))
+
+        if vpn_config.result() is None:
+            raise Exception(f'Unable to read MESSAGE VPN [{msg_vpn_name}]')
+        acl_profiles = _user_objects(acl_profiles.result(), 'aclProfileName')
+        queues = _user_objects(queues.result(), 'queueName')
+
+        def read_exceptions(template, acl_profile):
+            return list(semp_client.http_get_paged(template.substitute(
+                msg_vpn_name=vpn, acl_profile_name=quote_name(acl_profile['aclProfileName']), count=page_size)))
+
+        publish_exceptions = [executor.submit(read_exceptions, GET_ACL_PUBLISH_EXCEPTION_CONFIG_LIST, acl_profile)
+                              for acl_profile in acl_profiles]
+        subscribe_exceptions = [executor.submit(read_exceptions, GET_ACL_SUBSCRIBE_EXCEPTION_CONFIG_LIST,
+                                                acl_profile) for acl_profile in acl_profiles]
+        subscriptions = [executor.submit(lambda queue: list(semp_utility.iter_queue_subscriptions(
+            msg_vpn_name, queue['queueName'], page_size)), queue) for queue in queues]
+        for acl_profile, publish, subscribe in zip(acl_profiles, publish_exceptions, subscribe_exceptions):
+            acl_profile[PUBLISH_EXCEPTIONS_KEY] = publish.result()
+            acl_profile[SUBSCRIBE_EXCEPTIONS_KEY] = subscribe.result()
+        for queue, queue_subscriptions in zip(queues, subscriptions):
+            queue[SUBSCRIPTIONS_KEY] = queue_subscriptions.result()
+
+        return {'version': SNAPSHOT_VERSION, 'exportedAt': time.time(), 'msgVpnName': msg_vpn_name,
+                'msgVpn': vpn_config.result(),
+                'clientProfiles': _user_objects(client_profiles.result(), 'clientProfileName'),
+                'aclProfiles': acl_profiles,
+                'clientUsernames': _user_objects(client_usernames.result(), 'clientUsername'),
+                'queues': queues}
+
+
+def save_snapshot(snapshot: dict, file_full_path: str):
+    """method to write a snapshot as gzip compressed JSON"""
+    with gzip.open(file_full_path, 'wt', encoding='utf-8') as writer:
+        json.dump(snapshot, writer)
+
+
+def load_snapshot(file_full_path: str):
+    """method to read a snapshot written by save_snapshot"""
+    with gzip.open(file_full_path, 'rt', encoding='utf-8') as reader:
+        snapshot = json.load(reader)
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        raise Exception(f"Unsupported snapshot version [{snapshot.get('version')}] in {file_full_path}")
+    return snapshot
+
+
+def import_message_vpn(semp_client, snapshot: dict, target_msg_vpn_name=None, concurrency=8,
+                       client_username_passwords=None):
+    """method to replay a snapshot against a broker
+
+    Objects are created level by level, so a message vpn exists before its profiles, profiles exist before the
+    client usernames and acl exceptions using them, and queues exist before their subscriptions. Inside a level
+    the objects are created in parallel. An object that already exists is updated with a PATCH instead.
+    Args:
+        semp_client: SempClient of the target broker
+        snapshot: snapshot dict from export_message_vpn or load_snapshot
+        target_msg_vpn_name: message vpn name to import into, defaults to the exported name
+        concurrency: number of SEMP calls in flight
+        client_username_passwords: dict of client username to its password. The snapshot holds no passwords,
+            a client username missing here is imported without one and listed in 'without_password'
+
+    Returns:
+        dict with the 'created', 'updated' and 'failed' counts, the 'errors', the client usernames imported
+        'without_password' and the 'elapsed' seconds
+    """
+    start = time.perf_counter()
+    name = target_msg_vpn_name or snapshot['msgVpnName']
+    vpn = quote_name(name)
+    passwords = client_username_passwords or {}
+    without_password = sorted(username['clientUsername'] for username in snapshot['clientUsernames']
+                              if username['clientUsername'] not in passwords)
+    if without_password:
+        print(f'Warning: no password given for CLIENT USERNAMES {without_password}, they are imported without one')
+
+    def renamed(semp_object, *child_keys):
+        payload = {key: value for key, value in semp_object.items() if key not in child_keys}
+        payload['msgVpnName'] = name
+        return payload
+
+    def with_password(username):
+        payload = renamed(username)
+        if username['clientUsername'] in passwords:
+            payload['password'] = passwords[username['clientUsername']]
+        return payload
+
+    levels = [
+        [(create_msg_vpn_endpoint, PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=vpn),
+          renamed(snapshot['msgVpn']), f'msgVpn {name}')],
+        [(client_profile_post_endpoint.substitute(msg_vpn_name=vpn),
+          update_msg_vpn_endpoint.substitute(msg_vpn_name=vpn,
+                                             client_profile_name=quote_name(profile['clientProfileName'])),
+          renamed(profile), f"clientProfile {profile['clientProfileName']}")
+         for profile in snapshot['clientProfiles']] +
+        [(acl_profile_post_endpoint.substitute(msg_vpn_name=vpn),
+          acl_profile_endpoint.substitute(msg_vpn_name=vpn, acl_profile_name=quote_name(profile['aclProfileName'])),
+          renamed(profile, PUBLISH_EXCEPTIONS_KEY, SUBSCRIBE_EXCEPTIONS_KEY),
+          f"aclProfile {profile['aclProfileName']}")
+         for profile in snapshot['aclProfiles']],
+        [(set_client_user_name_endpoint.substitute(msg_vpn_name=vpn),
+          activate_msg_vpn_user_patch_endpoint.substitute(msg_vpn_name=vpn,
+                                                          client_user_name=quote_name(username['clientUsername'])),
+          with_password(username), f"clientUsername {username['clientUsername']}")
+         for username in snapshot['clientUsernames']] +
+        [(create_queue_full_post_endpoint.substitute(msg_vpn_name=vpn),
+          create_queue_patch_endpoint.substitute(msg_vpn_name=vpn, queue_name=quote_name(queue['queueName'])),
+          renamed(queue, SUBSCRIPTIONS_KEY), f"queue {queue['queueName']}")
+         for queue in snapshot['queues']] +
+        [(template.substitute(msg_vpn_name=vpn, acl_profile_name=quote_name(profile['aclProfileName'])), None,
+          renamed(exception), f"{key} {profile['aclProfileName']}")
+         for profile in snapshot['aclProfiles']
+         for key, template in ((PUBLISH_EXCEPTIONS_KEY, acl_publish_exception_post_endpoint),
+                               (SUBSCRIBE_EXCEPTIONS_KEY, acl_subscribe_exception_post_endpoint))
+         for exception in profile.get(key, [])],
+        [(create_topic_on_queue_post_endpoint.substitute(msg_vpn_name=vpn, queue_name=quote_name(queue['queueName'])),
+          None, {'subscriptionTopic': topic}, f"subscription {queue['queueName']} {topic}")
+         for queue in snapshot['queues'] for topic in queue.get(SUBSCRIPTIONS_KEY, [])],
+    ]
+
+    def create_or_update(item):
+        post_endpoint, patch_endpoint, payload, label = item
+        try:
+            response = semp_client.http_post(post_endpoint, payload, False)
+            if response['meta']['responseCode'] == 200:
+                return 'created', None
+            if response['meta'].get('error', {}).get('status') != 'ALREADY_EXISTS':
+                return 'failed', f"{label}: {response['meta'].get('error')}"
+            if patch_endpoint is not None:
+                semp_client.http_patch(patch_endpoint, payload)
+            return 'updated', None
+        except SempRequestError as error:
+            return 'failed', f'{label}: {error}'
+
+    counts = {'created': 0, 'updated': 0, 'failed': 0}
+    errors = []
+    print(f"Importing snapshot of MESSAGE VPN [{snapshot['msgVpnName']}] into [{name}]")
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for level in levels:
+            for outcome, error in executor.map(create_or_update, level):
+                counts[outcome] += 1
+                if error is not None:
+                    errors.append(error)
+    return dict(counts, errors=errors, without_password=without_password, elapsed=time.perf_counter() - start)
@@ -0,0 +1,311 @@
+"""module for an in-process stand-in of the SEMPv2 subset used by SempUtility
+
+SempStandInServer answers the config and monitor api for msgVpns, queues and their subscriptions, client
+usernames, client and acl profiles with their topic exceptions, and certAuthorities. Both apis read the same
+in-memory objects. Collections are paged with count and meta.paging.cursorUri, select is honoured, creating an
+existing object fails with ALREADY_EXISTS and touching a missing one with NOT_FOUND, like the broker does.
+A fixed and a random latency can be injected in every response to model a remote broker, and failures such as
+503 can be injected in the next responses to exercise retries and circuit breaking.
+
+    with SempStandInServer(latency=0.005) as server:
+        semp_utility = SempUtility(SempClient(server.base_url))
+"""
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, urlencode
+
+SEMP_PREFIX = '/SEMP/v2/'
+APIS = ('config', 'monitor', '__private_monitor__')
+# attribute naming the objects of each collection
+COLLECTION_KEYS = {'msgVpns': 'msgVpnName', 'queues': 'queueName', 'subscriptions': 'subscriptionTopic',
+                   'clientUsernames': 'clientUsername', 'clientProfiles': 'clientProfileName',
+                   'aclProfiles': 'aclProfileName', 'certAuthorities': 'certAuthorityName',
+                   'publishTopicExceptions': 'publishTopicException',
+                   'subscribeTopicExceptions': 'subscribeTopicException', 'clients': 'clientName',
+                   'connections': 'clientAddress'}
+# topic exceptions are addressed as '<syntax>,<topic>'
+EXCEPTION_SYNTAX_KEYS = {'publishTopicExceptions': 'publishTopicExceptionSyntax',
+                         'subscribeTopicExceptions': 'subscribeTopicExceptionSyntax'}
+# objects the broker creates together with a message vpn
+MSG_VPN_DEFAULT_OBJECTS = (('clientProfiles', 'clientProfileName'), ('aclProfiles', 'aclProfileName'),
+                           ('clientUsernames', 'clientUsername'))
+SEMP_DEFAULT_PAGE_COUNT = 10
+SEMP_ERROR_CODES = {'ALREADY_EXISTS': 10, 'NOT_FOUND': 6, 'INVALID_PATH': 4}
+
+
+class SempError(Exception):
+    def __init__(self, status: str, description: str, http_status=None):
+        super().__init__(description)
+        self.status = status
+        self.description = description
+        self.http_status = http_status
+
+
+class SempStandInStore:
+    """thread safe tree of SEMP objects keyed by their path, e.g. ('msgVpns', 'vpn', 'queues', 'q1')"""
+
+    def __init__(self):
+        self.__objects = {}
+        self.__lock = threading.Lock()
+
+    def get(self, path):
+        with self.__lock:
+            if path not in self.__objects:
+                raise SempError('NOT_FOUND', f'Could not find match for {"/".join(path)}')
+            return dict(self.__objects[path])
+
+    def collection(self, path):
+        with self.__lock:
+            if path[:-1] and path[:-1] not in self.__objects:
+                raise SempError('NOT_FOUND', f'Could not find match for {"/".join(path[:-1])}')
+            return [dict(semp_object) for key, semp_object in self.__objects.items()
+                    if len(key) == len(path) + 1 and key[:len(path)] == path]
+
+    def create(self, path, semp_object):
+        with self.__lock:
+            if path[:-2] and path[:-2] not in self.__objects:
+                raise SempError('NOT_FOUND', f'Could not find match for {"/".join(path[:-2])}')
+            if path in self.__objects:
+                raise SempError('ALREADY_EXISTS', f'{path[-2]} {path[-1]} already exists')
+            self.__objects[path] = dict(semp_object)
+            if path[-2] == 'msgVpns':
+                for collection, key in MSG_VPN_DEFAULT_OBJECTS:
+                    self.__objects[path + (collection, 'default')] = {'msgVpnName': path[-1], key: 'default'}
+            return dict(semp_object)
+
+    def update(self, path, attributes):
+        with self.__lock:
+            if path not in self.__objects:
+                raise SempError('NOT_FOUND', f'Could not find match for {"/".join(path)}')
+            self.__objects[path].update(attributes)
+            return dict(self.__objects[path])
+
+    def delete(self, path):
+        with self.__lock:
+            if path not in self.__objects:
+                raise SempError('NOT_FOUND', f'Could not find match for {"/".join(path)}')
+            for key in [key for key in self.__objects if key[:len(path)] == path]:
+                del self.__objects[key]
+
+    def put(self, path, semp_object):
+        """method to seed an object without the parent and existence checks, e.g. monitor only clients"""
+        with self.__lock:
+            self.__objects[path] = dict(semp_object)
+
+
+class _SempRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # headers and body go out in separate writes, without TCP_NODELAY every keep-alive response waits for the
+    # client's delayed ack
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.__handle('GET')
+
+    def do_POST(self):
+        self.__handle('POST')
+
+    def do_PATCH(self):
+        self.__handle('PATCH')
+
+    def do_PUT(self):
+        self.__handle('PATCH')
+
+    def do_DELETE(self):
+        self.__handle('DELETE')
+
+    def __handle(self, method):
+        server = self.server.stand_in
+        server.count_request(method)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        server.inject_latency()
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        try:
+            server.inject_failure()
+            status, content = 200, server.dispatch(method, parts.path, query, json.loads(body) if body else None)
+        except SempError as error:
+            status = error.http_status or (404 if error.status == 'INVALID_PATH' else 400)
+            content = {'meta': {'error': {'code': SEMP_ERROR_CODES.get(error.status, 1),
+                                          'description': error.description, 'status': error.status},
+                                'request': {'method': method, 'uri': self.path}, 'responseCode': status}}
+        payload = json.dumps(content).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class SempStandInServer:
+    """HTTP server answering SEMPv2 calls from an in-memory store, for offline tests and benchmarks"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, latency_jitter=0.0):
+        """
+        Args:
+            host: interface to listen on
+            port: port to listen on, 0 picks a free port
+            latency: seconds added to every response
+            latency_jitter: upper bound of random seconds added on top of latency
+        """
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.store = SempStandInStore()
+        self.__requests = {}
+        self.__requests_lock = threading.Lock()
+        self.__failures = []
+        self.__httpd = ThreadingHTTPServer((host, port), _SempRequestHandler)
+        self.__httpd.daemon_threads = True
+        self.__httpd.stand_in = self
+        self.__thread = None
+        self.base_url = f'http://{host}:{self.__httpd.server_address[1]}'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """method to serve requests on a background thread"""
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__httpd.serve_forever, name='semp-stand-in', daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self):
+        """method to stop serving and release the port"""
+        if self.__thread is not None:
+            self.__httpd.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__httpd.server_close()
+
+    def request_counts(self):
+        """method to get the number of requests served per http method"""
+        with self.__requests_lock:
+            return dict(self.__requests)
+
+    def reset_request_counts(self):
+        with self.__requests_lock:
+            self.__requests.clear()
+
+    def count_request(self, method):
+        with self.__requests_lock:
+            self.__requests[method] = self.__requests.get(method, 0) + 1
+
+    def inject_failures(self, count: int, status=503):
+        """method to fail the next requests without touching the store
+        Args:
+            count: number of requests to fail
+            status: http status code of the failed responses
+        """
+        with self.__requests_lock:
+            self.__failures.extend([status] * count)
+
+    def inject_failure(self):
+        """method to raise the next injected failure, if any
+        Raises:
+            SempError
+        """
+        with self.__requests_lock:
+            status = self.__failures.pop(0) if self.__failures else None
+        if status is not None:
+            raise SempError('SERVICE_UNAVAILABLE' if status >= 500 else 'INVALID_PARAMETER',
+                            f'Injected failure {status}', status)
+
+    def inject_latency(self):
+        delay = self.latency + (random.uniform(0.0, self.latency_jitter) if self.latency_jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def add_object(self, endpoint: str, semp_object: dict):
+        """method to seed an object at a SEMP object path, e.g. a monitor client of a message vpn"""
+        self.store.put(self.__object_path(urlsplit(endpoint).path), semp_object)
+
+    def dispatch(self, method, path, query, payload):
+        """method to answer one SEMP call
+        Returns:
+            SEMP response dict
+        Raises:
+            SempError
+        """
+        if path.rstrip('/').endswith('/about'):
+            return self.__response({'sempVersion': '2.x', 'platform': 'stand-in'}, method, path, query)
+        object_path = self.__object_path(path)
+        if method == 'GET':
+            if len(object_path) % 2:
+                return self.__collection_response(object_path, method, path, query)
+            return self.__response(self.store.get(object_path), method, path, query)
+        if method == 'POST':
+            if not len(object_path) % 2:
+                raise SempError('INVALID_PATH', f'POST is not allowed on {path}')
+            name = self.__object_name(object_path[-1], payload)
+            return self.__response(self.store.create(object_path + (name,), payload), method, path, query)
+        if not object_path:
+            # broker level attributes such as the server certificate
+            return self.__response(dict(payload or {}), method, path, query)
+        if method == 'PATCH':
+            return self.__response(self.store.update(object_path, payload or {}), method, path, query)
+        self.store.delete(object_path)
+        return self.__response(None, method, path, query)
+
+    @staticmethod
+    def __object_path(path):
+        if not path.startswith(SEMP_PREFIX):
+            raise SempError('INVALID_PATH', f'Unknown path {path}')
+        segments = path[len(SEMP_PREFIX):].strip('/').split('/')
+        if segments[0] not in APIS:
+            raise SempError('INVALID_PATH', f'Unknown api {segments[0]}')
+        return tuple(urllib.parse.unquote(segment) for segment in segments[1:] if segment)
+
+    @staticmethod
+    def __object_name(collection, payload):
+        if not payload:
+            raise SempError('INVALID_PATH', f'Missing body to create {collection}')
+        key = COLLECTION_KEYS.get(collection)
+        if key is None:
+            key = next((attribute for attribute in payload if attribute.endswith('Name') and
+                        attribute != 'msgVpnName'), None)
+        if key is None or key not in payload:
+            raise SempError('INVALID_PATH', f'Missing {key or "name"} to create {collection}')
+        syntax_key = EXCEPTION_SYNTAX_KEYS.get(collection)
+        if syntax_key is not None:
+            return f'{payload.get(syntax_key, "smf")},{payload[key]}'
+        return str(payload[key])
+
+    @staticmethod
+    def __select(semp_object, query):
+        select = query.get('select')
+        if not select or semp_object is None:
+            return semp_object
+        attributes = [attribute.strip() for attribute in select.split(',')]
+        return {key: value for key, value in semp_object.items() if key in attributes}
+
+    def __response(self, data, method, path, query):
+        response = {'links': {}, 'meta': {'request': {'method': method, 'uri': f'{self.base_url}{path}'},
+                                          'responseCode': 200}}
+        if data is not None:
+            response['data'] = self.__select(data, query)
+        return response
+
+    def __collection_response(self, object_path, method, path, query):
+        objects = self.store.collection(object_path)
+        count = int(query.get('count', SEMP_DEFAULT_PAGE_COUNT))
+        offset = int(query.get('cursor', 0))
+        page = objects[offset:offset + count]
+        response = self.__response(None, method, path, query)
+        response['data'] = [self.__select(semp_object, query) for semp_object in page]
+        if offset + count < len(objects):
+            next_query = dict(query, cursor=offset + count)
+            response['meta']['paging'] = {'cursorQuery': str(offset + count),
+                                          'cursorUri': f'{self.base_url}{path}?{urlencode(next_query)}'}
+        return response
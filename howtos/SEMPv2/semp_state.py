@@ -0,0 +1,73 @@
+"""module for the local state cache of provisioned SEMP objects"""
+import json
+import os
+import threading
+
+
+def diff_fields(desired: dict, current: dict):
+    """method to compute the attributes of an existing object that must change
+    Args:
+        desired: wanted attributes
+        current: attributes read from the broker
+
+    Returns:
+        dict of the desired attributes whose value differs, attributes the broker does not return such as
+        passwords are left out since they cannot be compared
+    """
+    return {key: value for key, value in desired.items() if key in current and _differs(value, current[key])}
+
+
+def _differs(desired, current):
+    if isinstance(desired, dict) and isinstance(current, dict):
+        return any(key not in current or _differs(value, current[key]) for key, value in desired.items())
+    return desired != current
+
+
+class SempStateCache:
+    """remembers the configuration last applied to each object so re-provisioning knows which objects exist
+
+    It is only a hint: objects can be changed or deleted on the broker behind its back, so callers still read the
+    broker before skipping an object, the cache only saves them from trying to create what already exists. Entries
+    are keyed by object kind, message vpn and object name. When a file is given the cache is loaded from it and
+    save() writes it back, so a later provisioning run starts from the known state.
+    """
+
+    def __init__(self, file_full_path: str = None):
+        """
+        Args:
+            file_full_path: optional JSON file the cache is loaded from and saved to
+        """
+        self.file_full_path = file_full_path
+        self.__objects = {}
+        self.__lock = threading.Lock()
+        if file_full_path is not None and os.path.exists(file_full_path):
+            with open(file_full_path, 'r') as reader:
+                self.__objects = {tuple(entry['key']): entry['state'] for entry in json.load(reader)}
+
+    def get(self, kind: str, msg_vpn_name: str, name: str):
+        """method to get the known state of an object, None when unknown"""
+        with self.__lock:
+            return self.__objects.get((kind, msg_vpn_name, name))
+
+    def put(self, kind: str, msg_vpn_name: str, name: str, state: dict):
+        """method to record the state of an object after it was applied"""
+        with self.__lock:
+            self.__objects[(kind, msg_vpn_name, name)] = state
+
+    def forget(self, kind: str, msg_vpn_name: str, name: str):
+        """method to drop an object, e.g. once it was deleted"""
+        with self.__lock:
+            self.__objects.pop((kind, msg_vpn_name, name), None)
+
+    def clear(self):
+        with self.__lock:
+            self.__objects.clear()
+
+    def save(self):
+        """method to write the cache to its file"""
+        if self.file_full_path is None:
+            return
+        with self.__lock:
+            entries = [{'key': list(key), 'state': state} for key, state in self.__objects.items()]
+        with open(self.file_full_path, 'w') as writer:
+            json.dump(entries, writer)
@@ -0,0 +1,187 @@
+"""module for collecting queue and message vpn statistics into a local time-series store"""
+import sqlite3
+import threading
+import time
+
+from howtos.SEMPv2.semp_utility import SempUtility
+
+QUEUE_METRICS = ('msgSpoolUsage', 'maxMsgSpoolUsage', 'spooledMsgCount', 'bindCount', 'txUnackedMsgCount',
+                 'rxMsgRate', 'txMsgRate', 'averageRxMsgRate', 'averageTxMsgRate')
+MSG_VPN_METRICS = ('msgSpoolMsgCount', 'msgVpnConnections', 'msgSpoolCurrentQueuesAndTopicEndpoints',
+                   'maxConnectionCount')
+
+KIND_QUEUE = 'queue'
+KIND_MSG_VPN = 'msgVpn'
+
+RESOLUTION_RAW = 'raw'
+# rollup resolution name to bucket width in seconds
+ROLLUPS = {'1m': 60, '1h': 3600}
+# resolution name to seconds of history kept
+DEFAULT_RETENTION = {RESOLUTION_RAW: 2 * 86400, '1m': 30 * 86400, '1h': 400 * 86400}
+
+
+class SempStatsStore:
+    """SQLite store keeping raw samples plus 1 minute and 1 hour rollups with avg, min, max and last"""
+
+    def __init__(self, db_file_full_path: str, retention=None):
+        """
+        Args:
+            db_file_full_path: sqlite database file, ':memory:' for a throw away store
+            retention: dict of resolution ('raw', '1m', '1h') to seconds of history kept
+        """
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(db_file_full_path, check_same_thread=False)
+        with self.__lock, self.__connection:
+            self.__connection.execute('CREATE TABLE IF NOT EXISTS samples (ts REAL NOT NULL, kind TEXT NOT NULL, '
+                                      'vpn TEXT NOT NULL, object TEXT NOT NULL, metric TEXT NOT NULL, '
+                                      'value REAL NOT NULL)')
+            self.__connection.execute('CREATE INDEX IF NOT EXISTS samples_series '
+                                      'ON samples (vpn, object, metric, ts)')
+            for resolution in ROLLUPS:
+                self.__connection.execute(f'CREATE TABLE IF NOT EXISTS rollup_{resolution} ('
+                                          'bucket INTEGER NOT NULL, kind TEXT NOT NULL, vpn TEXT NOT NULL, '
+                                          'object TEXT NOT NULL, metric TEXT NOT NULL, count INTEGER NOT NULL, '
+                                          'sum REAL NOT NULL, min REAL NOT NULL, max REAL NOT NULL, '
+                                          'last REAL NOT NULL, last_ts REAL NOT NULL, '
+                                          'PRIMARY KEY (vpn, object, metric, bucket))')
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+    def add_samples(self, samples):
+        """method to store samples and fold them into the rollups
+        Args:
+            samples: iterable of (ts, kind, vpn, object, metric, value) tuples
+        """
+        samples = list(samples)
+        if not samples:
+            return
+        with self.__lock, self.__connection:
+            self.__connection.executemany('INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)', samples)
+            for resolution, width in ROLLUPS.items():
+                self.__connection.executemany(
+                    f'INSERT INTO rollup_{resolution} VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT (vpn, object, metric, bucket) DO UPDATE SET count = count + 1, '
+                    'sum = sum + excluded.sum, min = MIN(min, excluded.min), max = MAX(max, excluded.max), '
+                    'last = CASE WHEN excluded.last_ts >= last_ts THEN excluded.last ELSE last END, '
+                    'last_ts = MAX(last_ts, excluded.last_ts)',
+                    [(int(ts // width) * width, kind, vpn, name, metric, value, value, value, value, ts)
+                     for ts, kind, vpn, name, metric, value in samples])
+
+    def prune(self, now=None):
+        """method to drop the samples and rollups older than their retention"""
+        now = time.time() if now is None else now
+        with self.__lock, self.__connection:
+            self.__connection.execute('DELETE FROM samples WHERE ts < ?', (now - self.retention[RESOLUTION_RAW],))
+            for resolution in ROLLUPS:
+                self.__connection.execute(f'DELETE FROM rollup_{resolution} WHERE bucket < ?',
+                                          (now - self.retention[resolution],))
+
+    def query(self, vpn: str, object_name: str, metric: str, since=0.0, until=None, resolution=RESOLUTION_RAW):
+        """method to read one series
+        Args:
+            vpn: message vpn name
+            object_name: queue name, or '' for message vpn metrics
+            metric: SEMP attribute name
+            since: start time in epoch seconds
+            until: end time in epoch seconds, defaults to now
+            resolution: 'raw', '1m' or '1h'
+
+        Returns:
+            list of (ts, value) for raw samples or (bucket, avg, min, max, last) for rollups, oldest first
+        """
+        until = time.time() if until is None else until
+        with self.__lock:
+            if resolution == RESOLUTION_RAW:
+                return self.__connection.execute(
+                    'SELECT ts, value FROM samples WHERE vpn = ? AND object = ? AND metric = ? AND ts >= ? '
+                    'AND ts <= ? ORDER BY ts', (vpn, object_name, metric, since, until)).fetchall()
+            if resolution not in ROLLUPS:
+                raise ValueError(f'Unknown resolution [{resolution}], expected one of raw, {", ".join(ROLLUPS)}')
+            return self.__connection.execute(
+                f'SELECT bucket, sum / count, min, max, last FROM rollup_{resolution} WHERE vpn = ? AND object = ? '
+                'AND metric = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket',
+                (vpn, object_name, metric, since - ROLLUPS[resolution], until)).fetchall()
+
+    def objects(self, vpn: str, kind=KIND_QUEUE):
+        """method to list the object names with samples in a message vpn"""
+        with self.__lock:
+            return [row[0] for row in self.__connection.execute(
+                'SELECT DISTINCT object FROM rollup_1h WHERE vpn = ? AND kind = ? ORDER BY object', (vpn, kind))]
+
+
+class SempStatsCollector:
+    """background sampler of queue and message vpn monitor statistics into a SempStatsStore"""
+
+    def __init__(self, semp_utility: SempUtility, store: SempStatsStore, vpn_names, interval=30.0,
+                 prune_every=100):
+        """
+        Args:
+            semp_utility: SempUtility used to read the monitor api
+            store: store receiving the samples
+            vpn_names: message vpn names to sample
+            interval: seconds between samples
+            prune_every: number of sampling rounds between retention clean ups
+        """
+        self.semp_utility = semp_utility
+        self.store = store
+        self.vpn_names = list(vpn_names)
+        self.interval = interval
+        self.prune_every = prune_every
+        self.rounds = 0
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        """method to start sampling on a daemon thread"""
+        if self.__thread is not None and self.__thread.is_alive():
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name='semp-stats-collector', daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout=None):
+        """method to stop sampling and wait for the current round to finish"""
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+
+    def collect_once(self, now=None):
+        """method to take one sample of every configured message vpn and its queues
+        Returns:
+            number of samples stored
+        """
+        now = time.time() if now is None else now
+        samples = []
+        wanted_vpns = set(self.vpn_names)
+        for vpn in self.semp_utility.iter_message_vpns():
+            if vpn['msgVpnName'] in wanted_vpns:
+                samples.extend(self.__samples(now, KIND_MSG_VPN, vpn['msgVpnName'], '', vpn, MSG_VPN_METRICS))
+        for vpn_name in self.vpn_names:
+            for queue in self.semp_utility.iter_queue_stats(vpn_name):
+                samples.extend(self.__samples(now, KIND_QUEUE, vpn_name, queue['queueName'], queue, QUEUE_METRICS))
+        self.store.add_samples(samples)
+        self.rounds += 1
+        if self.prune_every and self.rounds % self.prune_every == 0:
+            self.store.prune(now)
+        return len(samples)
+
+    def __run(self):
+        next_run = time.monotonic()
+        while not self.__stop_event.is_set():
+            try:
+                self.collect_once()
+            except Exception as exception:
+                print(f'Unable to collect SEMP statistics. Exception: {exception}')
+            next_run += self.interval
+            # skip the rounds missed while a slow collection was running instead of bursting to catch up
+            while next_run <= time.monotonic():
+                next_run += self.interval
+            self.__stop_event.wait(next_run - time.monotonic())
+
+    @staticmethod
+    def __samples(now, kind, vpn_name, object_name, semp_object, metrics):
+        return [(now, kind, vpn_name, object_name, metric, float(semp_object[metric]))
+                for metric in metrics if isinstance(semp_object.get(metric), (int, float))]
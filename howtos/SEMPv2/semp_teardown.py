@@ -0,0 +1,174 @@
+"""module for tearing down the broker objects created by a test run"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from howtos.SEMPv2.semp_endpoint import quote_name, PATCH_MESSAGE_VPN_ENDPOINT, delete_queue_endpoint, \
+    delete_msg_vpn_user_endpoint, update_msg_vpn_endpoint, acl_profile_endpoint, certificate_authority_endpoint
+from howtos.SEMPv2.semp_client import SempRequestError
+from howtos.SEMPv2.semp_resilience import RetryPolicy, SempCircuitOpenError
+
+QUEUE = 'queue'
+CLIENT_USERNAME = 'clientUsername'
+CLIENT_PROFILE = 'clientProfile'
+ACL_PROFILE = 'aclProfile'
+MSG_VPN = 'msgVpn'
+CERT_AUTHORITY = 'certAuthority'
+
+# objects are deleted level by level, an object only after everything referring to it
+DELETE_LEVELS = ((QUEUE, CLIENT_USERNAME, CERT_AUTHORITY), (CLIENT_PROFILE, ACL_PROFILE), (MSG_VPN,))
+# the broker owns these and they go away with their message vpn
+BROKER_OWNED_NAMES = frozenset({'default'})
+
+
+def _endpoint(kind, msg_vpn_name, name):
+    if kind == QUEUE:
+        return delete_queue_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name), queue_name=quote_name(name))
+    if kind == CLIENT_USERNAME:
+        return delete_msg_vpn_user_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                       client_user_name=quote_name(name))
+    if kind == CLIENT_PROFILE:
+        return update_msg_vpn_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                  client_profile_name=quote_name(name))
+    if kind == ACL_PROFILE:
+        return acl_profile_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name), acl_profile_name=quote_name(name))
+    if kind == MSG_VPN:
+        return PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=quote_name(name))
+    if kind == CERT_AUTHORITY:
+        return f'{certificate_authority_endpoint}/{quote_name(name)}'
+    raise Exception(f'Unknown object kind [{kind}]')
+
+
+class SempTeardown:
+    """records the objects a test run creates and deletes them all at the end
+
+    Deletion goes level by level, queues, client usernames and certificate authorities first, then client and acl
+    profiles, then message vpns, with the deletes of a level in parallel. A delete answered with NOT_FOUND counts
+    as done. Throttling, server errors and connection errors are retried with backoff, so a delete racing a
+    consumer unbind or a throttled broker still completes, while a permanent failure such as a 400 is reported
+    at once. Use it as a context manager to tear down when the block exits.
+    """
+
+    def __init__(self, semp_client, concurrency=8, retry_policy: RetryPolicy = None, cascade=False):
+        """
+        Args:
+            semp_client: SempClient used for the deletes
+            concurrency: number of deletes in flight within a level
+            retry_policy: backoff and number of retries of a failed delete, three retries by default
+            cascade: skip objects inside a recorded message vpn, deleting the message vpn removes them too. They
+                stay recorded until their message vpn is deleted
+        """
+        self.semp_client = semp_client
+        self.concurrency = max(1, concurrency)
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.cascade = cascade
+        # insertion ordered, the values are unused
+        self.__objects = {}
+        self.__lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.teardown()
+
+    def record(self, kind: str, name: str, msg_vpn_name=None):
+        """method to record a created object
+        Args:
+            kind: one of QUEUE, CLIENT_USERNAME, CLIENT_PROFILE, ACL_PROFILE, MSG_VPN, CERT_AUTHORITY
+            name: object name
+            msg_vpn_name: message vpn of the object, not used for MSG_VPN and CERT_AUTHORITY
+        """
+        if not any(kind in level for level in DELETE_LEVELS):
+            raise Exception(f'Unknown object kind [{kind}]')
+        with self.__lock:
+            self.__objects[(kind, msg_vpn_name, name)] = None
+
+    def record_queue(self, name: str, msg_vpn_name: str):
+        self.record(QUEUE, name, msg_vpn_name)
+
+    def record_client_username(self, name: str, msg_vpn_name: str):
+        self.record(CLIENT_USERNAME, name, msg_vpn_name)
+
+    def record_client_profile(self, name: str, msg_vpn_name: str):
+        self.record(CLIENT_PROFILE, name, msg_vpn_name)
+
+    def record_acl_profile(self, name: str, msg_vpn_name: str):
+        self.record(ACL_PROFILE, name, msg_vpn_name)
+
+    def record_message_vpn(self, name: str):
+        self.record(MSG_VPN, name)
+
+    def record_certificate_authority(self, name: str):
+        self.record(CERT_AUTHORITY, name)
+
+    def pending(self):
+        """method to get the recorded objects not deleted yet as (kind, msg_vpn_name, name) tuples"""
+        with self.__lock:
+            return list(self.__objects)
+
+    def teardown(self):
+        """method to delete every recorded object
+
+        Returns:
+            dict with the 'deleted', 'not_found' and 'failed' counts, the 'errors' and the 'elapsed' seconds.
+            Objects that failed stay recorded so teardown can be called again
+        """
+        start = time.perf_counter()
+        objects = self.pending()
+        vpns = {name for kind, _, name in objects if kind == MSG_VPN}
+        counts = {'deleted': 0, 'not_found': 0, 'failed': 0}
+        errors = []
+        cascaded = []
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for level in DELETE_LEVELS:
+                level_objects = [semp_object for semp_object in objects if semp_object[0] in level]
+                if self.cascade:
+                    cascaded.extend(semp_object for semp_object in level_objects if semp_object[1] in vpns)
+                    level_objects = [semp_object for semp_object in level_objects if semp_object[1] not in vpns]
+                if not level_objects:
+                    continue
+                for semp_object, (outcome, error) in zip(level_objects, executor.map(self.__delete, level_objects)):
+                    counts[outcome] += 1
+                    if error is None:
+                        self.__forget([semp_object])
+                    else:
+                        errors.append(error)
+        gone_vpns = vpns.difference(name for kind, _, name in self.pending() if kind == MSG_VPN)
+        self.__forget([semp_object for semp_object in cascaded if semp_object[1] in gone_vpns])
+        print(f"Teardown deleted {counts['deleted']} object(s), {counts['not_found']} already gone, "
+              f"{counts['failed']} failed")
+        return dict(counts, errors=errors, elapsed=time.perf_counter() - start)
+
+    def __forget(self, semp_objects):
+        with self.__lock:
+            for semp_object in semp_objects:
+                self.__objects.pop(semp_object, None)
+
+    def __delete(self, semp_object):
+        """method to delete one object with retries, returns the outcome and the error text or None"""
+        kind, msg_vpn_name, name = semp_object
+        if name in BROKER_OWNED_NAMES and kind != MSG_VPN:
+            return 'not_found', None
+        endpoint = _endpoint(kind, msg_vpn_name, name)
+        attempt = 0
+        while True:
+            try:
+                response = self.semp_client.http_delete(endpoint, False)
+                meta = response.get('meta', {})
+                if meta.get('responseCode') == 200:
+                    return 'deleted', None
+                if meta.get('error', {}).get('status') == 'NOT_FOUND':
+                    return 'not_found', None
+                status, error = meta.get('responseCode'), meta.get('error')
+            except SempCircuitOpenError as circuit_open:
+                return 'failed', f'{kind} {msg_vpn_name or ""}/{name}: {circuit_open}'
+            except SempRequestError as request_error:
+                print(f'Unable to delete {kind} [{name}]. Exception: {request_error}')
+                status, error = request_error.status_code, request_error
+            # None is a connection error, the delete may not have reached the broker
+            retryable = status is None or self.retry_policy.is_retryable_status('DELETE', status)
+            if not retryable or attempt >= self.retry_policy.max_retries:
+                return 'failed', f'{kind} {msg_vpn_name or ""}/{name}: {error}'
+            time.sleep(self.retry_policy.backoff(attempt))
+            attempt += 1
@@ -0,0 +1,165 @@
+"""module for a topic to queue routing index built from the queue subscriptions of a message vpn"""
+import gzip
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from howtos.SEMPv2.semp_utility import SempUtility
+
+LEVEL_SEPARATOR = '/'
+SINGLE_LEVEL_WILDCARD = '*'
+MULTI_LEVEL_WILDCARD = '>'
+SUBSCRIPTION_EXCEPTION_PREFIX = '!'
+
+
+class _TrieNode:
+    __slots__ = ('children', 'prefixes', 'star', 'exact', 'descendants')
+
+    def __init__(self):
+        self.children = {}
+        # 'abc*' levels keyed by their prefix 'abc'
+        self.prefixes = {}
+        self.star = None
+        # queues whose subscription ends at this node
+        self.exact = set()
+        # queues whose subscription ends with '>' at this node, matching one or more further levels
+        self.descendants = set()
+
+
+class _SubscriptionTrie:
+    """trie of topic subscriptions with Solace wildcard semantics
+
+    A level of '*' matches exactly one level, a level ending in '*' such as 'ord*' matches any level starting
+    with 'ord', and a last level of '>' matches one or more further levels. Any other '*' or '>' is literal.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, subscription: str, queue_name: str):
+        node = self.root
+        levels = subscription.split(LEVEL_SEPARATOR)
+        for index, level in enumerate(levels):
+            if level == MULTI_LEVEL_WILDCARD and index == len(levels) - 1:
+                node.descendants.add(queue_name)
+                return
+            if level == SINGLE_LEVEL_WILDCARD:
+                if node.star is None:
+                    node.star = _TrieNode()
+                node = node.star
+            elif level.endswith(SINGLE_LEVEL_WILDCARD):
+                node = node.prefixes.setdefault(level[:-1], _TrieNode())
+            else:
+                node = node.children.setdefault(level, _TrieNode())
+        node.exact.add(queue_name)
+
+    def match(self, topic: str):
+        matched = set()
+        levels = topic.split(LEVEL_SEPARATOR)
+        pending = [(self.root, 0)]
+        while pending:
+            node, index = pending.pop()
+            if index == len(levels):
+                matched |= node.exact
+                continue
+            matched |= node.descendants
+            level = levels[index]
+            child = node.children.get(level)
+            if child is not None:
+                pending.append((child, index + 1))
+            if node.star is not None:
+                pending.append((node.star, index + 1))
+            for prefix, prefix_node in node.prefixes.items():
+                if level.startswith(prefix):
+                    pending.append((prefix_node, index + 1))
+        return matched
+
+
+class TopicRoutingIndex:
+    """answers which queues of a message vpn attract a topic, built from the queue topic subscriptions
+
+    Subscriptions starting with '!' are treated as subscription exceptions and remove the queue from the match.
+    """
+
+    def __init__(self, msg_vpn_name: str, subscriptions_by_queue=None, crawled_at=None):
+        """
+        Args:
+            msg_vpn_name: message vpn the subscriptions belong to
+            subscriptions_by_queue: dict of queue name to its topic subscriptions
+            crawled_at: epoch seconds the subscriptions were read from the broker
+        """
+        self.msg_vpn_name = msg_vpn_name
+        self.crawled_at = crawled_at if crawled_at is not None else time.time()
+        self.subscriptions_by_queue = {}
+        self.__includes = _SubscriptionTrie()
+        self.__exceptions = _SubscriptionTrie()
+        for queue_name, subscriptions in (subscriptions_by_queue or {}).items():
+            self.add_queue(queue_name, subscriptions)
+
+    @classmethod
+    def crawl(cls, semp_utility: SempUtility, msg_vpn_name: str, concurrency=8):
+        """method to read every queue and its topic subscriptions over SEMP and build the index
+        Args:
+            semp_utility: SempUtility used to read the config api
+            msg_vpn_name: message vpn name
+            concurrency: number of queues whose subscriptions are read at once
+
+        Returns:
+            TopicRoutingIndex
+        """
+        crawled_at = time.time()
+        queue_names = [queue['queueName'] for queue in semp_utility.iter_queue_configs(msg_vpn_name)]
+        print(f"Crawling topic subscriptions of {len(queue_names)} QUEUES in MESSAGE VPN: [{msg_vpn_name}]")
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            subscriptions = executor.map(
+                lambda queue_name: list(semp_utility.iter_queue_subscriptions(msg_vpn_name, queue_name)),
+                queue_names)
+            return cls(msg_vpn_name, dict(zip(queue_names, subscriptions)), crawled_at)
+
+    def add_queue(self, queue_name: str, subscriptions):
+        """method to add the topic subscriptions of a queue"""
+        subscriptions = list(subscriptions)
+        self.subscriptions_by_queue.setdefault(queue_name, []).extend(subscriptions)
+        for subscription in subscriptions:
+            if subscription.startswith(SUBSCRIPTION_EXCEPTION_PREFIX):
+                self.__exceptions.add(subscription[1:], queue_name)
+            else:
+                self.__includes.add(subscription, queue_name)
+
+    def queues_for(self, topic: str):
+        """method to get the queues attracting a published topic
+        Returns:
+            set of queue names
+        """
+        matched = self.__includes.match(topic)
+        if matched:
+            matched -= self.__exceptions.match(topic)
+        return matched
+
+    def unmatched_topics(self, topics):
+        """method to get the topics that no queue attracts
+        Args:
+            topics: published topics to check
+
+        Returns:
+            list of the topics without any subscriber queue
+        """
+        return [topic for topic in topics if not self.queues_for(topic)]
+
+    def unsubscribed_queues(self):
+        """method to get the queues without any topic subscription"""
+        return sorted(queue_name for queue_name, subscriptions in self.subscriptions_by_queue.items()
+                      if not subscriptions)
+
+    def save(self, file_full_path: str):
+        """method to write the index as gzip compressed JSON"""
+        with gzip.open(file_full_path, 'wt', encoding='utf-8') as writer:
+            json.dump({'msgVpnName': self.msg_vpn_name, 'crawledAt': self.crawled_at,
+                       'subscriptions': self.subscriptions_by_queue}, writer)
+
+    @classmethod
+    def load(cls, file_full_path: str):
+        """method to read an index written by save"""
+        with gzip.open(file_full_path, 'rt', encoding='utf-8') as reader:
+            content = json.load(reader)
+        return cls(content['msgVpnName'], content['subscriptions'], content['crawledAt'])
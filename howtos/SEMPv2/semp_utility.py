@@ -1,7 +1,11 @@
 """module for the semp utility"""
-import urllib
+import collections
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from howtos.SEMPv2 import semp_snapshot, semp_inventory
+from howtos.SEMPv2.semp_client import SempRequestError
 from howtos.SEMPv2.semp_endpoint import certificate_authority_endpoint, \
     update_msg_vpn_endpoint, message_vpn_authentication_endpoint, \
     patch_client_user_name_endpoint, get_client_connection_objects, get_client_connection_properties, \
@@ -13,14 +17,38 @@ from howtos.SEMPv2.semp_endpoint import certificate_authority_endpoint, \
     delete_queue_endpoint, queue_permission_change_patch_engress_enable, queue_permission_change_patch, \
     queue_permission_change_get, shutdown_queue_patch_endpoint, sol_clients_connected, server_certificate_endpoint, \
     create_topic_on_queue_post_endpoint, create_topic_on_queue_get_endpoint, exception_topic_list_endpoint, \
-    remove_topics_from_exception_list
+    remove_topics_from_exception_list, DEFAULT_PAGE_COUNT, create_queue_full_post_endpoint, GET_QUEUE_CONFIG_LIST, \
+    GET_QUEUE_SUBSCRIPTION_CONFIG_LIST, GET_CLIENT_USERNAME_CONFIG_LIST, GET_QUEUE_MONITOR_LIST, \
+    get_queue_config_endpoint, get_queue_monitor_endpoint, GET_CLIENT_INVENTORY_LIST, quote_name
+from howtos.SEMPv2.semp_state import SempStateCache, diff_fields
+from howtos.SEMPv2.semp_teardown import SempTeardown
+from howtos.SEMPv2.semp_watch import SempWatcher
+
+QUEUE_STATE = 'queue'
+# monitor resources SempUtility.watch can follow, with the attribute identifying their objects
+WATCH_RESOURCES = {'msgVpns': 'msgVpnName', 'queues': 'queueName', 'clients': 'clientName',
+                   'clientUsernames': 'clientUsername'}
+# counters and rates that move on every poll of a busy resource, left out of the change detection by default
+WATCH_VOLATILE_FIELDS = {'msgVpns': ('msgSpoolMsgCount', 'msgVpnConnections', 'msgVpnConnectionsServiceRestOutgoing'),
+                         'queues': ('msgSpoolUsage', 'spooledMsgCount', 'txUnackedMsgCount', 'rxMsgRate', 'txMsgRate',
+                                    'averageRxMsgRate', 'averageTxMsgRate'),
+                         'clients': ('uptime', 'rxMsgRate', 'txMsgRate'),
+                         'clientUsernames': ()}
 
 
 class SempUtility:
     """SEMP utility class"""
 
-    def __init__(self, semp_client):
+    def __init__(self, semp_client, state_cache: SempStateCache = None, teardown: SempTeardown = None):
+        """
+        Args:
+            semp_client: SempClient used for every SEMP call
+            state_cache: known object state used by the ensure methods, an in memory cache when not given
+            teardown: optional SempTeardown recording the message vpns, queues and client usernames created
+        """
         self.semp_client = semp_client
+        self.state_cache = state_cache if state_cache is not None else SempStateCache()
+        self.teardown = teardown
 
     def create_message_vpn(self, msg_vpn_name, authentication_basic_enabled=True,
                            authentication_basic_profile_name="", authentication_basic_type="internal",
@@ -46,10 +74,12 @@ class SempUtility:
             default_client_profile = "default"
 
             print(f"Creating new MESSAGE VPN: '{msg_vpn_name}'")
-
             self.__message_vpn_authentication_basic(msg_vpn_name, authentication_basic_enabled,
                                                     authentication_basic_profile_name,
                                                     authentication_basic_type, enabled, max_msg_spool_usage)
+            # recorded only once the broker created it, an existing message vpn is never torn down
+            if self.teardown is not None:
+                self.teardown.record_message_vpn(msg_vpn_name)
 
             self.__message_vpn_client_profile(msg_vpn_name, client_profile)
 
@@ -79,7 +109,7 @@ class SempUtility:
             if msg_vpn_name is not None:
                 print(f"DELETE VPN: {msg_vpn_name}")
                 return self.semp_client.http_delete(
-                    PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=msg_vpn_name))
+                    PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=quote_name(msg_vpn_name)))
         except Exception as err:
             print(f'Unable to delete MESSAGE VPN [{msg_vpn_name}]. Exception: {err}')
 
@@ -90,7 +120,8 @@ class SempUtility:
             payload = {"clientProfileName": client_profile_name, "msgVpnName": msg_vpn_name,
                        "allowSharedSubscriptionsEnabled": True}
             self.semp_client.http_patch(allow_shared_subscription_endpoint
-                                        .substitute(msg_vpn_name=msg_vpn_name, client_profile_name=client_profile_name),
+                                        .substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                    client_profile_name=quote_name(client_profile_name)),
                                         payload)
         except Exception as exception:
             print(f'Unable to allow shared subscription MESSAGE VPN [{msg_vpn_name}]. Exception: {exception}')
@@ -115,7 +146,8 @@ class SempUtility:
             self.__create_user(username, message_vpn)
 
             self.semp_client.http_patch(
-                activate_msg_vpn_user_patch_endpoint.substitute(msg_vpn_name=message_vpn, client_user_name=username),
+                activate_msg_vpn_user_patch_endpoint.substitute(msg_vpn_name=quote_name(message_vpn),
+                                                                client_user_name=quote_name(username)),
                 patch_client_user_payload)
         except Exception as exception:
             print(f'Unable to map user to MESSAGE VPN [{message_vpn}] CLIENT USER: [{username}]. '
@@ -134,7 +166,8 @@ class SempUtility:
             if msg_vpn_name is not None:
                 print(f"DELETE CLIENT USER: [{username}] in MESSAGE VPN: [{msg_vpn_name}]")
                 delete_msg_vpn_user_response = self.semp_client.http_delete(
-                    delete_msg_vpn_user_endpoint.substitute(msg_vpn_name=msg_vpn_name, client_user_name=username))
+                    delete_msg_vpn_user_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                            client_user_name=quote_name(username)))
 
                 return delete_msg_vpn_user_response
         except Exception as exception:
@@ -184,10 +217,23 @@ class SempUtility:
     def add_new_server_cert(self, cert_payload):
         self.semp_client.http_patch(server_certificate_endpoint, cert_payload)
 
-    def get_client_name_list(self, vpn_name: str):
+    def iter_clients(self, vpn_name: str, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream the clients of a message vpn page by page
+        Args:
+            vpn_name (str): message vpn name
+            page_size: number of clients fetched per SEMP call
+
+        Returns:
+            generator of client objects with clientName, msgVpnName and clientUsername
+        """
+        return self.semp_client.http_get_paged(
+            GET_MSG_VPN_CLIENT_DETAILS_ENDPOINT.substitute(msg_vpn_name=quote_name(vpn_name), count=page_size))
+
+    def get_client_name_list(self, vpn_name: str, page_size=DEFAULT_PAGE_COUNT):
         """method to get client name list
         Args:
             vpn_name (str): message vpn name
+            page_size: number of clients fetched per SEMP call
 
         Returns:
             client list
@@ -196,10 +242,7 @@ class SempUtility:
         """
         try:
             print(f"Get CLIENT name list from MESSAGE VPN: [{vpn_name}]")
-            json_response = self.semp_client \
-                .http_get(GET_MSG_VPN_CLIENT_DETAILS_ENDPOINT.substitute(msg_vpn_name=vpn_name))
-            data_property = json_response['data']
-            return [client_info['clientName'] for client_info in data_property]
+            return [client_info['clientName'] for client_info in self.iter_clients(vpn_name, page_size)]
         except Exception as err:
             print(f'Unable to GET CLIENT NAME list: [{vpn_name}]. Exception: {err}')
 
@@ -218,7 +261,8 @@ class SempUtility:
             print(f"Get CLIENT CONNECTIONS OBJECTS list from MESSAGE VPN: [{vpn_name}],"
                   f" CLIENT Name: [{client_name}]")
             json_response = self.semp_client \
-                .http_get(get_client_connection_objects.substitute(msg_vpn_name=vpn_name, client_name=client_name))
+                .http_get(get_client_connection_objects.substitute(msg_vpn_name=quote_name(vpn_name),
+                                                                   client_name=quote_name(client_name)))
             return json_response['data']
         except Exception as err:
             print(f'Unable to GET CLIENT CONNECTIONS OBJECTS list: [{vpn_name}], CLIENT Name: [{client_name}].'
@@ -239,12 +283,74 @@ class SempUtility:
             print(
                 f"Get CLIENT CONNECTIONS properties from MESSAGE VPN: [{vpn_name}], CLIENT Name: [{client_name}]")
             json_response = self.semp_client \
-                .http_get(get_client_connection_properties.substitute(msg_vpn_name=vpn_name, client_name=client_name))
+                .http_get(get_client_connection_properties.substitute(msg_vpn_name=quote_name(vpn_name),
+                                                                      client_name=quote_name(client_name)))
             return json_response['data']
         except Exception as err:
             print(f'Unable to GET CLIENT CONNECTIONS properties: [{vpn_name}], CLIENT Name: [{client_name}].'
                   f'Exception: {err}')
 
+    def get_client_inventory(self, vpn_name: str, concurrency=8, include_connections=True,
+                             page_size=DEFAULT_PAGE_COUNT):
+        """method to get every client of a message vpn with its connection details in one batched read
+
+        Replaces calling get_client_connection_objects and get_client_connection_properties once per client of
+        get_client_name_list: the client attributes come from the paged client list and only the connections are
+        read per client, concurrently.
+        Args:
+            vpn_name (str): message vpn name
+            concurrency: number of connection reads in flight
+            include_connections: also read the connections of every client
+            page_size: number of objects fetched per SEMP call
+
+        Returns:
+            semp_inventory.ClientInventory, sortable and filterable by column
+        Raises:
+            unable to get the client list
+        """
+        print(f"Get CLIENT inventory from MESSAGE VPN: [{vpn_name}]")
+        inventory = semp_inventory.fetch_client_inventory(self.semp_client, vpn_name, concurrency,
+                                                          include_connections, page_size)
+        print(f"Read {len(inventory)} CLIENTS of MESSAGE VPN: [{vpn_name}] in {inventory.elapsed:.2f}s")
+        return inventory
+
+    def watch(self, resource: str, interval=5.0, vpn_name=None, on_added=None, on_removed=None, on_changed=None,
+              ignore_fields=None, min_interval=None, max_interval=None, start=True):
+        """method to follow a monitor resource and get called back only for what changed between polls
+        Args:
+            resource: one of WATCH_RESOURCES, 'msgVpns', 'queues', 'clients' or 'clientUsernames'
+            interval: seconds between the first polls, adapted to how often the resource changes
+            vpn_name (str): message vpn name, needed for every resource but 'msgVpns'
+            on_added: callback(key, new_object)
+            on_removed: callback(key, old_object)
+            on_changed: callback(key, old_object, new_object)
+            ignore_fields: attributes that do not count as a change, WATCH_VOLATILE_FIELDS of the resource by
+                default, () to report every change including counters and rates
+            min_interval: shortest interval, a quarter of interval by default
+            max_interval: longest interval, four times interval by default
+            start: start polling on a background thread right away
+
+        Returns:
+            SempWatcher, call stop() on it to end the watch
+        Raises:
+            unknown resource or missing message vpn name
+        """
+        if resource not in WATCH_RESOURCES:
+            raise Exception(f'Unable to watch [{resource}], supported resources are {sorted(WATCH_RESOURCES)}')
+        if resource != 'msgVpns' and vpn_name is None:
+            raise Exception(f'Watching [{resource}] needs a MESSAGE VPN name')
+        fetch = {'msgVpns': self.iter_message_vpns,
+                 'queues': lambda: self.iter_queue_stats(vpn_name),
+                 'clients': lambda: self.semp_client.http_get_paged(GET_CLIENT_INVENTORY_LIST.substitute(
+                     msg_vpn_name=quote_name(vpn_name), count=DEFAULT_PAGE_COUNT)),
+                 'clientUsernames': lambda: self.iter_users(vpn_name)}[resource]
+        if ignore_fields is None:
+            ignore_fields = WATCH_VOLATILE_FIELDS[resource]
+        print(f"Watching [{resource}]" + (f" of MESSAGE VPN: [{vpn_name}]" if vpn_name else ""))
+        watcher = SempWatcher(fetch, WATCH_RESOURCES[resource], interval, min_interval, max_interval, on_added,
+                              on_removed, on_changed, ignore_fields, name=f'semp-watch-{resource}')
+        return watcher.start() if start else watcher
+
     def get_message_vpn_service_settings(self, vpn_name: str):
         """method to get message vpn service settings
         Args:
@@ -259,7 +365,7 @@ class SempUtility:
         try:
             print(f"Get MESSAGE VPN: {vpn_name} service settings")
             json_response = self.semp_client \
-                .http_get(GET_MESSAGE_VPN_SERVICE_SETTINGS_ENDPOINT.substitute(msg_vpn_name=vpn_name))
+                .http_get(GET_MESSAGE_VPN_SERVICE_SETTINGS_ENDPOINT.substitute(msg_vpn_name=quote_name(vpn_name)))
             return json_response['data']
         except Exception as err:
             print(f'Unable to GET MESSAGE-VPN service settings: [{vpn_name}] details. Exception: {err}')
@@ -355,8 +461,19 @@ class SempUtility:
         except Exception as err:
             print(f'Unable to update KEY: [{authentication_client_cert_enabled}]. Exception: {err}')
 
-    def get_all_message_vpn(self):
+    def iter_message_vpns(self, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream all message vpn page by page
+            Args:
+                page_size: number of message vpn fetched per SEMP call
+            Returns:
+                generator of message vpn objects
+        """
+        return self.semp_client.http_get_paged(GET_ALL_MSG_VPN_ENDPOINT.substitute(count=page_size))
+
+    def get_all_message_vpn(self, page_size=DEFAULT_PAGE_COUNT):
         """method to get all message vpn
+            Args:
+                page_size: number of message vpn fetched per SEMP call
             Returns:
                 message vpn list
             Raises:
@@ -364,16 +481,112 @@ class SempUtility:
         """
         try:
             print('Get MESSAGE VPN list.')
-            json_response = self.semp_client \
-                .http_get(GET_ALL_MSG_VPN_ENDPOINT)
-            return json_response['data']
+            return list(self.iter_message_vpns(page_size))
         except Exception as err:
             print(f'Unable to get MESSAGE VPN list. Exception: {err}')
 
-    def get_all_user(self, vpn_name: str):
+    def get_message_vpn_config(self, vpn_name: str):
+        """method to get the configuration of a message vpn
+            Args:
+                vpn_name (str): message vpn name
+            Returns:
+                message vpn configuration or None when the message vpn does not exist
+            Raises:
+                SempRequestError when the message vpn cannot be read
+        """
+        try:
+            json_response = self.semp_client.http_get(PATCH_MESSAGE_VPN_ENDPOINT.substitute(
+                msg_vpn_name=quote_name(vpn_name)))
+        except SempRequestError as error:
+            if error.semp_status == 'NOT_FOUND':
+                return None
+            raise
+        return json_response['data']
+
+    def iter_queue_configs(self, vpn_name: str, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream the configuration of every queue in a message vpn
+            Args:
+                vpn_name (str): message vpn name
+                page_size: number of queues fetched per SEMP call
+            Returns:
+                generator of queue configuration objects
+        """
+        return self.semp_client.http_get_paged(GET_QUEUE_CONFIG_LIST.substitute(
+            msg_vpn_name=quote_name(vpn_name), count=page_size))
+
+    def iter_queue_stats(self, vpn_name: str, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream the monitor statistics of every queue in a message vpn
+            Args:
+                vpn_name (str): message vpn name
+                page_size: number of queues fetched per SEMP call
+            Returns:
+                generator of queue objects with spool usage, message counts, bind count and message rates
+        """
+        return self.semp_client.http_get_paged(GET_QUEUE_MONITOR_LIST.substitute(
+            msg_vpn_name=quote_name(vpn_name), count=page_size))
+
+    def get_queue_stats(self, vpn_name: str, queue_name: str):
+        """method to get the monitor counters of one queue
+            Args:
+                vpn_name (str): message vpn name
+                queue_name: queue name
+            Returns:
+                queue object with access type, spooled message count, spool usage, bind count and message rates,
+                None when the queue does not exist
+            Raises:
+                SempRequestError when the queue cannot be read
+        """
+        try:
+            json_response = self.semp_client.http_get(get_queue_monitor_endpoint.substitute(
+                msg_vpn_name=quote_name(vpn_name),
+                queue_name=quote_name(queue_name)))
+        except SempRequestError as error:
+            if error.semp_status == 'NOT_FOUND':
+                return None
+            raise
+        return json_response['data']
+
+    def iter_queue_subscriptions(self, vpn_name: str, queue_name: str, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream the topic subscriptions configured on a queue
+            Args:
+                vpn_name (str): message vpn name
+                queue_name (str): queue name
+                page_size: number of subscriptions fetched per SEMP call
+            Returns:
+                generator of subscription topic strings
+        """
+        for subscription in self.semp_client.http_get_paged(GET_QUEUE_SUBSCRIPTION_CONFIG_LIST.substitute(
+                msg_vpn_name=quote_name(vpn_name),
+                queue_name=quote_name(queue_name), count=page_size)):
+            yield subscription['subscriptionTopic']
+
+    def iter_client_username_configs(self, vpn_name: str, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream the configuration of every client username in a message vpn
+            Args:
+                vpn_name (str): message vpn name
+                page_size: number of client usernames fetched per SEMP call
+            Returns:
+                generator of client username configuration objects
+        """
+        return self.semp_client.http_get_paged(GET_CLIENT_USERNAME_CONFIG_LIST.substitute(
+            msg_vpn_name=quote_name(vpn_name), count=page_size))
+
+    def iter_users(self, vpn_name: str, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream all user page by page
+            Args:
+                vpn_name (str): message vpn name
+                page_size: number of users fetched per SEMP call
+            Returns:
+                generator of client username objects
+        """
+        return self.semp_client.http_get_paged(GET_ALL_USER_LIST.substitute(msg_vpn_name=quote_name(vpn_name),
+                                                                            count=page_size))
+
+    def get_all_user(self, vpn_name: str, page_size=DEFAULT_PAGE_COUNT):
         """method to get all user
             Args:
                 vpn_name (str): message vpn name
+                page_size: number of users fetched per SEMP call
             Returns:
                 user list
             Raises:
@@ -381,14 +594,20 @@ class SempUtility:
         """
         try:
             print(f'Get all USER list for Message VPN: "{vpn_name}"')
-            json_response = self.semp_client \
-                .http_get(GET_ALL_USER_LIST.substitute(msg_vpn_name=vpn_name))
-            return json_response['data']
+            return list(self.iter_users(vpn_name, page_size))
         except Exception as err:
             print(f'Unable to get USER list for Message VPN: "{vpn_name}". Exception: {err}')
 
     def create_queue(self, name, msg_vpn_name, delete_if_exists=True, access_type="exclusive", egress_enabled=True,
-                     reject_msg_to_sender_on_discard_behavior="when-queue-enabled"):
+                     reject_msg_to_sender_on_discard_behavior="when-queue-enabled", single_request=False,
+                     ensure=False):
+        if ensure:
+            return self.ensure_queue(
+                name, msg_vpn_name, access_type=access_type, egress_enabled=egress_enabled,
+                reject_msg_to_sender_on_discard_behavior=reject_msg_to_sender_on_discard_behavior)
+        if single_request:
+            return self.__create_queue_single_request(name, msg_vpn_name, delete_if_exists, access_type,
+                                                      egress_enabled, reject_msg_to_sender_on_discard_behavior)
         print("Creating QUEUE: [%s]", name)
         payload = {"egressEnabled": True, "ingressEnabled": True, "permission": "consume", "queueName": name}
         patch_payload = {"accessType": "exclusive", "consumerAckPropagationEnabled": True,
@@ -404,11 +623,13 @@ class SempUtility:
                          "respectMsgPriorityEnabled": False, "respectTtlEnabled": False}
 
         create_queue_response = self.semp_client.http_post(
-            create_queue_post_endpoint.substitute(msg_vpn_name=msg_vpn_name), payload, False)
+            create_queue_post_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name)), payload, False)
         if create_queue_response is not None and create_queue_response["meta"]["responseCode"] == 200:
-            name_encoded = urllib.parse.quote(name, safe='')
+            if self.teardown is not None:
+                self.teardown.record_queue(name, msg_vpn_name)
+            name_encoded = quote_name(name)
             patch_queue_response = self.semp_client.http_patch(create_queue_patch_endpoint
-                                                               .substitute(msg_vpn_name=msg_vpn_name,
+                                                               .substitute(msg_vpn_name=quote_name(msg_vpn_name),
                                                                            queue_name=name_encoded), patch_payload)
             if patch_queue_response is not None and patch_queue_response["meta"]["responseCode"] != 200:
                 print("Failed to update the config for the queue [%s]", name)
@@ -424,6 +645,138 @@ class SempUtility:
             print("Failed to create the queue [%s]", name)
             raise Exception(f"Failed to create the queue [{name}]")
 
+    def ensure_queue(self, name, msg_vpn_name, access_type="exclusive", egress_enabled=True,
+                     reject_msg_to_sender_on_discard_behavior="when-queue-enabled", topics=None):
+        """method to make sure a queue exists with the given configuration and topics, without deleting it
+
+        The broker decides, the state cache only tells which request to try first. A queue the cache knows is
+        read with one GET and PATCHed with only the drifted attributes, or created again when it was deleted on
+        the broker. An unknown queue is created with one POST and read only when it already exists. Spooled
+        messages are kept either way.
+        Args:
+            name: queue name
+            msg_vpn_name: message vpn name
+            access_type: queue access type
+            egress_enabled: boolean value for egress
+            reject_msg_to_sender_on_discard_behavior: discard behavior
+            topics: optional topic subscriptions the queue must have, existing extra ones are kept
+
+        Returns:
+            'created', 'updated' or 'unchanged'
+        """
+        current = None
+        if self.state_cache.get(QUEUE_STATE, msg_vpn_name, name) is not None:
+            current = self.__get_queue_config(name, msg_vpn_name)
+        return self.__ensure_queue(name, msg_vpn_name, self.__queue_config_payload(
+            name, msg_vpn_name, access_type=access_type, egress_enabled=egress_enabled,
+            reject_msg_to_sender_on_discard_behavior=reject_msg_to_sender_on_discard_behavior), topics, current)
+
+    def __ensure_queue(self, name, msg_vpn_name, desired, topics, current):
+        """method to converge one queue of ensure_queue, current is its broker configuration or None if unknown"""
+        try:
+            outcome = self.__ensure_queue_config(name, msg_vpn_name, desired, current)
+            if outcome == 'created' and self.teardown is not None:
+                self.teardown.record_queue(name, msg_vpn_name)
+            self.state_cache.put(QUEUE_STATE, msg_vpn_name, name, desired)
+            if topics and self.__ensure_queue_topics(name, msg_vpn_name, topics, outcome == 'created') and \
+                    outcome == 'unchanged':
+                outcome = 'updated'
+            return outcome
+        except Exception:
+            self.state_cache.forget(QUEUE_STATE, msg_vpn_name, name)
+            raise
+
+    def __get_queue_config(self, name, msg_vpn_name):
+        """method to read the configuration of a queue, None when it does not exist"""
+        try:
+            return self.semp_client.http_get(get_queue_config_endpoint.substitute(
+                msg_vpn_name=quote_name(msg_vpn_name), queue_name=quote_name(name)))["data"]
+        except SempRequestError as error:
+            if error.semp_status == 'NOT_FOUND':
+                return None
+            raise
+
+    def __ensure_queue_config(self, name, msg_vpn_name, desired, current):
+        """method to create a queue or patch its drift, returns 'created', 'updated' or 'unchanged'"""
+        if current is None:
+            create_queue_response = self.semp_client.http_post(
+                create_queue_full_post_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name)), desired, False)
+            if create_queue_response["meta"]["responseCode"] == 200:
+                print(f"Created QUEUE: [{name}]")
+                return 'created'
+            if create_queue_response["meta"].get("error", {}).get("status") != "ALREADY_EXISTS":
+                raise Exception(f"Failed to create the queue [{name}]. {create_queue_response['meta'].get('error')}")
+            current = self.__get_queue_config(name, msg_vpn_name)
+            if current is None:
+                raise Exception(f"The queue [{name}] was deleted while it was being provisioned")
+
+        drift = diff_fields(desired, current)
+        if not drift:
+            return 'unchanged'
+        print(f"Updating QUEUE: [{name}] attributes {sorted(drift)}")
+        self.semp_client.http_patch(create_queue_patch_endpoint.substitute(
+            msg_vpn_name=quote_name(msg_vpn_name), queue_name=quote_name(name)), drift)
+        return 'updated'
+
+    def __ensure_queue_topics(self, name, msg_vpn_name, topics, created):
+        """method to attach the topics missing on the broker, returns True when any was added"""
+        existing = set() if created else set(self.iter_queue_subscriptions(msg_vpn_name, name))
+        missing = [topic_name for topic_name in dict.fromkeys(topics) if topic_name not in existing]
+        if not missing:
+            return False
+        result = self.add_topics_to_queue_bulk(missing, name, msg_vpn_name)
+        if result['failed'] or result['missing']:
+            raise Exception(f"Failed to add topics {sorted(set(result['failed']) | set(result['missing']))}"
+                            f" to the queue [{name}]")
+        return result['added'] > 0
+
+    def __create_queue_single_request(self, name, msg_vpn_name, delete_if_exists, access_type, egress_enabled,
+                                      reject_msg_to_sender_on_discard_behavior):
+        """method to create a queue with its complete configuration in one POST
+
+        The queue ends up as create_queue plus change_queue_permission leave it, with permission 'modify-topic',
+        but without the follow up PATCH and GET calls. The configuration is verified against the POST response.
+        """
+        print(f"Creating QUEUE in a single request: [{name}]")
+        payload = self.__queue_config_payload(
+            name, msg_vpn_name, access_type=access_type, egress_enabled=egress_enabled,
+            reject_msg_to_sender_on_discard_behavior=reject_msg_to_sender_on_discard_behavior)
+        create_queue_response = self.semp_client.http_post(
+            create_queue_full_post_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name)), payload, False)
+        if create_queue_response is not None and create_queue_response["meta"]["responseCode"] == 200:
+            if self.teardown is not None:
+                self.teardown.record_queue(name, msg_vpn_name)
+            created = create_queue_response.get("data", {})
+            mismatched = [key for key, value in payload.items() if key in created and created[key] != value]
+            if mismatched:
+                raise Exception(f"Queue [{name}] was created with unexpected values for {mismatched}")
+        elif create_queue_response is not None and create_queue_response["meta"]["responseCode"] == 400 and \
+                create_queue_response["meta"]["error"]["status"] == "ALREADY_EXISTS":
+            print(f"Queue [{name}] is already exist")
+            if delete_if_exists:
+                self.delete_queue(name, msg_vpn_name)
+                self.__create_queue_single_request(name, msg_vpn_name, False, access_type, egress_enabled,
+                                                   reject_msg_to_sender_on_discard_behavior)
+        else:
+            raise Exception(f"Failed to create the queue [{name}]")
+
+    @staticmethod
+    def __queue_config_payload(queue_name, msg_vpn_name, access_type="exclusive", egress_enabled=True,
+                               ingress_enabled=True, permission="modify-topic",
+                               reject_msg_to_sender_on_discard_behavior="when-queue-enabled"):
+        """method to build the complete queue configuration used by the samples"""
+        return {"accessType": access_type, "consumerAckPropagationEnabled": True,
+                "deadMsgQueue": "#DEAD_MSG_QUEUE", "egressEnabled": egress_enabled,
+                "eventBindCountThreshold": {"clearPercent": 60, "setPercent": 80},
+                "eventMsgSpoolUsageThreshold": {"clearPercent": 60, "setPercent": 80},
+                "eventRejectLowPriorityMsgLimitThreshold": {"clearPercent": 60, "setPercent": 80},
+                "ingressEnabled": ingress_enabled, "maxBindCount": 1000, "maxDeliveredUnackedMsgsPerFlow": 10000,
+                "maxMsgSize": 10000000, "maxMsgSpoolUsage": 1500, "maxRedeliveryCount": 0, "maxTtl": 0,
+                "msgVpnName": msg_vpn_name, "owner": "", "permission": permission, "queueName": queue_name,
+                "rejectLowPriorityMsgEnabled": False, "rejectLowPriorityMsgLimit": 0,
+                "rejectMsgToSenderOnDiscardBehavior": reject_msg_to_sender_on_discard_behavior,
+                "respectMsgPriorityEnabled": False, "respectTtlEnabled": False}
+
     def change_queue_permission(self, queue_name, msg_vpn_name, access_type="exclusive"):
         changed_patch_payload = {"accessType": access_type, "consumerAckPropagationEnabled": True,
                                  "deadMsgQueue": "#DEAD_MSG_QUEUE", "egressEnabled": False,
@@ -438,9 +791,9 @@ class SempUtility:
                                  "rejectMsgToSenderOnDiscardBehavior": "when-queue-enabled",
                                  "respectMsgPriorityEnabled": False, "respectTtlEnabled": False}
         enable_engress_patch = {"egressEnabled": True}
-        name_encoded = urllib.parse.quote(queue_name, safe='')
+        name_encoded = quote_name(queue_name)
         queue_available = self.semp_client.http_get(queue_permission_change_get
-                                                    .substitute(msg_vpn_name=msg_vpn_name,
+                                                    .substitute(msg_vpn_name=quote_name(msg_vpn_name),
                                                                 queue_name=name_encoded))
 
         if queue_available is not None and queue_available["meta"]["responseCode"] != 200:
@@ -448,7 +801,7 @@ class SempUtility:
             raise Exception("The queue [%s] is not available", queue_name)
 
         queue_changed_permission_response = self.semp_client.http_patch(
-            queue_permission_change_patch.substitute(msg_vpn_name=msg_vpn_name,
+            queue_permission_change_patch.substitute(msg_vpn_name=quote_name(msg_vpn_name),
                                                      queue_name=name_encoded), changed_patch_payload)
 
         if queue_changed_permission_response is not None and \
@@ -457,7 +810,8 @@ class SempUtility:
             raise Exception("Unable to change the queue: [%s] permission to modify the topics", queue_name)
 
         queue_engress_enabled_response = self.semp_client.http_patch(
-            queue_permission_change_patch_engress_enable.substitute(msg_vpn_name=msg_vpn_name, queue_name=name_encoded),
+            queue_permission_change_patch_engress_enable.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                                    queue_name=name_encoded),
             enable_engress_patch)
         if queue_engress_enabled_response is not None and \
                 queue_engress_enabled_response["meta"]["responseCode"] != 200:
@@ -466,9 +820,10 @@ class SempUtility:
 
     def delete_queue(self, name, msg_vpn_name):
         print("Deleting QUEUE: [%s]", name)
-        name_encoded = urllib.parse.quote(name, safe='')
-        delete_queue_response = self.semp_client.http_delete(delete_queue_endpoint.substitute(msg_vpn_name=msg_vpn_name,
-                                                                                              queue_name=name_encoded))
+        name_encoded = quote_name(name)
+        self.state_cache.forget(QUEUE_STATE, msg_vpn_name, name)
+        delete_queue_response = self.semp_client.http_delete(
+            delete_queue_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name), queue_name=name_encoded))
         if delete_queue_response is not None and delete_queue_response["meta"]["responseCode"] != 200:
             print("Failed to delete QUEUE: [%s]", name)
             raise Exception("Failed to delete QUEUE: [%s]", name)
@@ -486,9 +841,9 @@ class SempUtility:
                                  "rejectLowPriorityMsgLimit": 0,
                                  "rejectMsgToSenderOnDiscardBehavior": "when-queue-enabled",
                                  "respectMsgPriorityEnabled": False, "respectTtlEnabled": False}
-        name_encoded = urllib.parse.quote(queue_name, safe='')
+        name_encoded = quote_name(queue_name)
         shutdown_queue = self.semp_client.http_patch(
-            shutdown_queue_patch_endpoint.substitute(msg_vpn_name=msg_vpn_name,
+            shutdown_queue_patch_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
                                                      queue_name=name_encoded), changed_patch_payload)
         if shutdown_queue is not None and \
                 shutdown_queue["meta"]["responseCode"] != 200:
@@ -508,9 +863,9 @@ class SempUtility:
                                  "rejectLowPriorityMsgLimit": 0,
                                  "rejectMsgToSenderOnDiscardBehavior": "when-queue-enabled",
                                  "respectMsgPriorityEnabled": False, "respectTtlEnabled": False}
-        name_encoded = urllib.parse.quote(queue_name, safe='')
+        name_encoded = quote_name(queue_name)
         re_enable_queue = self.semp_client.http_patch(
-            shutdown_queue_patch_endpoint.substitute(msg_vpn_name=msg_vpn_name,
+            shutdown_queue_patch_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
                                                      queue_name=name_encoded), changed_patch_payload)
         if re_enable_queue is not None and \
                 re_enable_queue["meta"]["responseCode"] != 200:
@@ -519,12 +874,13 @@ class SempUtility:
 
     def add_topic_to_queue(self, topic_name, queue_name, msg_vpn_name):
         payload = {'subscriptionTopic': topic_name}
-        name_encoded = urllib.parse.quote(queue_name, safe='')
+        name_encoded = quote_name(queue_name)
         create_topic_on_queue_response = self.semp_client.http_post(
-            create_topic_on_queue_post_endpoint.substitute(msg_vpn_name=msg_vpn_name, queue_name=name_encoded), payload)
+            create_topic_on_queue_post_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                           queue_name=name_encoded), payload, False)
         if create_topic_on_queue_response is not None and create_topic_on_queue_response["meta"]["responseCode"] == 200:
             topic_added_to_queue_response = self.semp_client.http_get \
-                (create_topic_on_queue_get_endpoint.substitute(msg_vpn_name=msg_vpn_name,
+                (create_topic_on_queue_get_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
                                                                queue_name=name_encoded, count=20))
             if topic_added_to_queue_response["meta"]["responseCode"] != 200:
                 print("Failed to add topic [%s] to the queue [%s]", topic_name, queue_name)
@@ -537,6 +893,158 @@ class SempUtility:
             print("Failed to create the topic [%s]", topic_name)
             raise Exception("Failed to create the topic [%s]", topic_name)
 
+    def add_topics_to_queue_bulk(self, topic_names, queue_name, msg_vpn_name, concurrency=8):
+        """method to attach many topic subscriptions to a queue in parallel
+
+        The subscriptions already on the queue are read once up front and skipped, the missing ones are POSTed
+        concurrently without a GET per topic, and a single paged read at the end verifies the result.
+        Args:
+            topic_names: topic subscriptions to attach
+            queue_name: queue name
+            msg_vpn_name: message vpn name
+            concurrency: number of subscriptions POSTed at once
+
+        Returns:
+            dict with the 'requested', 'already_present' and 'added' counts, the 'failed' topics with their error,
+            the topics still 'missing' after verification and the 'elapsed' seconds. A topic another client attached
+            between the read and its POST counts as already present
+        """
+        start = time.perf_counter()
+        wanted = list(dict.fromkeys(topic_names))
+        print(f"Attaching {len(wanted)} TOPICS to QUEUE: [{queue_name}] in MESSAGE VPN: [{msg_vpn_name}]")
+        existing = set(self.iter_queue_subscriptions(msg_vpn_name, queue_name))
+        to_add = [topic_name for topic_name in wanted if topic_name not in existing]
+        endpoint = create_topic_on_queue_post_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                                  queue_name=quote_name(queue_name))
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            outcomes = list(executor.map(lambda topic_name: self.__post_topic_subscription(endpoint, topic_name),
+                                         to_add))
+        failed = {topic_name: error for topic_name, (_, error) in zip(to_add, outcomes) if error is not None}
+        existing_count = sum(1 for outcome, _ in outcomes if outcome == 'existing')
+        attached = set(self.iter_queue_subscriptions(msg_vpn_name, queue_name))
+        return {'requested': len(wanted), 'already_present': len(wanted) - len(to_add) + existing_count,
+                'added': len(to_add) - len(failed) - existing_count, 'failed': failed,
+                'missing': [topic_name for topic_name in wanted if topic_name not in attached],
+                'elapsed': time.perf_counter() - start}
+
+    def __post_topic_subscription(self, endpoint, topic_name):
+        """method to POST one subscription of add_topics_to_queue_bulk, returns the outcome 'added', 'existing' or
+        'failed' and the error text or None"""
+        try:
+            response = self.semp_client.http_post(endpoint, {'subscriptionTopic': topic_name}, False)
+        except SempRequestError as error:
+            return 'failed', str(error)
+        if response["meta"]["responseCode"] == 200:
+            return 'added', None
+        if response["meta"].get("error", {}).get("status") == "ALREADY_EXISTS":
+            return 'existing', None
+        return 'failed', str(response["meta"].get("error"))
+
+    def create_queues_bulk(self, specs, msg_vpn_name, concurrency=8, delete_if_exists=True, single_request=False,
+                           ensure=False):
+        """method to provision many queues with their topic subscriptions in parallel
+        Args:
+            specs: iterable of queue definitions, each a dict with 'name', an optional 'topics' list and optional
+                create_queue arguments 'access_type', 'egress_enabled' and 'reject_msg_to_sender_on_discard_behavior'
+            msg_vpn_name: message vpn name
+            concurrency: number of queues provisioned at once, keep it at or below the SempClient pool_maxsize so
+                every worker gets a keep-alive connection
+            delete_if_exists: passed on to create_queue
+            single_request: passed on to create_queue, creates each queue with one POST
+            ensure: provision like ensure_queue, existing queues are patched instead of recreated. The current
+                configurations are read with one paged list of the queues of the message vpn up front, instead of
+                one GET or POST per queue
+
+        Returns:
+            dict with the overall 'elapsed' seconds, the 'succeeded' and 'failed' counts and per queue 'results'
+            holding 'created', 'topics_added', 'elapsed' and 'error' for each queue name
+
+        Raises:
+            a queue name is given more than once, its provisioning calls would race and only one result be kept
+        """
+        specs = list(specs)
+        names = collections.Counter(spec['name'] for spec in specs)
+        duplicates = sorted(name for name, count in names.items() if count > 1)
+        if duplicates:
+            raise Exception(f'Unable to provision QUEUES {duplicates} more than once in one bulk call')
+        print(f"Provisioning {len(specs)} QUEUES in MESSAGE VPN: [{msg_vpn_name}] with concurrency {concurrency}")
+        start = time.perf_counter()
+        current_configs = {queue['queueName']: queue for queue in self.iter_queue_configs(msg_vpn_name)} \
+            if ensure else None
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            outcomes = list(executor.map(lambda spec: self.__provision_queue(spec, msg_vpn_name, delete_if_exists,
+                                                                             single_request, current_configs),
+                                         specs))
+        results = {spec['name']: outcome for spec, outcome in zip(specs, outcomes)}
+        failed = sum(1 for outcome in outcomes if outcome['error'] is not None)
+        return {'elapsed': time.perf_counter() - start, 'succeeded': len(outcomes) - failed, 'failed': failed,
+                'results': results}
+
+    def __provision_queue(self, spec, msg_vpn_name, delete_if_exists, single_request, current_configs):
+        """method to create one queue of create_queues_bulk and attach its topics, capturing any failure
+
+        current_configs holds the broker configuration of the queues by name when provisioning in ensure mode
+        """
+        outcome = {'created': False, 'topics_added': 0, 'elapsed': 0.0, 'error': None}
+        start = time.perf_counter()
+        try:
+            if current_configs is not None:
+                desired = self.__queue_config_payload(
+                    spec['name'], msg_vpn_name, access_type=spec.get('access_type', 'exclusive'),
+                    egress_enabled=spec.get('egress_enabled', True),
+                    reject_msg_to_sender_on_discard_behavior=spec.get('reject_msg_to_sender_on_discard_behavior',
+                                                                      'when-queue-enabled'))
+                outcome['state'] = self.__ensure_queue(spec['name'], msg_vpn_name, desired, spec.get('topics'),
+                                                       current_configs.get(spec['name']))
+                outcome['created'] = outcome['state'] == 'created'
+                outcome['elapsed'] = time.perf_counter() - start
+                return outcome
+            self.create_queue(spec['name'], msg_vpn_name, delete_if_exists=delete_if_exists,
+                              access_type=spec.get('access_type', 'exclusive'),
+                              egress_enabled=spec.get('egress_enabled', True),
+                              reject_msg_to_sender_on_discard_behavior=spec.get(
+                                  'reject_msg_to_sender_on_discard_behavior', 'when-queue-enabled'),
+                              single_request=single_request)
+            outcome['created'] = True
+            for topic_name in spec.get('topics', ()):
+                self.add_topic_to_queue(topic_name, spec['name'], msg_vpn_name)
+                outcome['topics_added'] += 1
+        except Exception as exception:
+            outcome['error'] = str(exception)
+        outcome['elapsed'] = time.perf_counter() - start
+        return outcome
+
+    def export_message_vpn_snapshot(self, msg_vpn_name, file_full_path: str, concurrency=8):
+        """method to export a message vpn with its profiles, acls, client usernames, queues and subscriptions
+        Args:
+            msg_vpn_name: message vpn name
+            file_full_path: gzip compressed JSON snapshot file to write
+            concurrency: number of SEMP reads in flight
+
+        Returns:
+            the snapshot dict
+        """
+        print(f"Exporting MESSAGE VPN [{msg_vpn_name}] to {file_full_path}")
+        snapshot = semp_snapshot.export_message_vpn(self, msg_vpn_name, concurrency)
+        semp_snapshot.save_snapshot(snapshot, file_full_path)
+        return snapshot
+
+    def import_message_vpn_snapshot(self, file_full_path: str, target_msg_vpn_name=None, concurrency=8,
+                                    client_username_passwords=None):
+        """method to replay a snapshot written by export_message_vpn_snapshot
+        Args:
+            file_full_path: snapshot file
+            target_msg_vpn_name: message vpn name to import into, defaults to the exported name
+            concurrency: number of SEMP calls in flight
+            client_username_passwords: dict of client username to password, a snapshot holds no passwords
+
+        Returns:
+            dict with the created, updated and failed counts, the errors, the client usernames imported without
+            password and the elapsed seconds
+        """
+        return semp_snapshot.import_message_vpn(self.semp_client, semp_snapshot.load_snapshot(file_full_path),
+                                                target_msg_vpn_name, concurrency, client_username_passwords)
+
     def patch_reject_msg_to_sender_on_no_subscription_match_enabled(self, vpn_name: str, is_enable: bool,
                                                                     client_profile_name="default"):
         """method to patch allow downgradable tls to plain text
@@ -554,10 +1062,11 @@ class SempUtility:
             print('Update allow shared subscription MESSAGE VPN [%s], client profile name: [%s]',
                   vpn_name, client_profile_name)
             payload = {reject_msg_to_sender_on_no_subscription_match_enabled: is_enable}
-            url = allow_shared_subscription_endpoint.substitute(msg_vpn_name=vpn_name,
-                                                                client_profile_name=client_profile_name)
+            url = allow_shared_subscription_endpoint.substitute(msg_vpn_name=quote_name(vpn_name),
+                                                                client_profile_name=quote_name(client_profile_name))
             self.semp_client.http_patch(allow_shared_subscription_endpoint
-                                        .substitute(msg_vpn_name=vpn_name, client_profile_name=client_profile_name),
+                                        .substitute(msg_vpn_name=quote_name(vpn_name),
+                                                    client_profile_name=quote_name(client_profile_name)),
                                         payload)
         except Exception as exception:
             raise Exception('Unable reject_msg_to_sender_on_no_subscription_match_enabled in '
@@ -568,7 +1077,7 @@ class SempUtility:
         # for topic in topic_name:
         payload = {"publishTopicException": topic_name, "publishTopicExceptionSyntax": publish_topic_exception_syntax}
         adding_exeption_topic_on_publish_response = self.semp_client.http_post(
-            exception_topic_list_endpoint.substitute(msg_vpn_name=msg_vpn_name), payload, False)
+            exception_topic_list_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name)), payload, False)
         if adding_exeption_topic_on_publish_response is not None and \
                 adding_exeption_topic_on_publish_response["meta"]["responseCode"] == 200:
             print("The topic : %s, is added to the exception list successfully", topic_name)
@@ -581,9 +1090,10 @@ class SempUtility:
             raise Exception(f"Failed to add the topic: {topic_name}, to the exception list")
 
     def remove_topics_from_exception_list(self, topic_name, msg_vpn_name):
-        name_encoded = urllib.parse.quote(topic_name, safe='')
+        name_encoded = quote_name(topic_name)
         removing_topics_from_exception_list_response = self.semp_client.http_delete(
-            remove_topics_from_exception_list.substitute(msg_vpn_name=msg_vpn_name, topic_name=name_encoded))
+            remove_topics_from_exception_list.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                         topic_name=name_encoded))
         if removing_topics_from_exception_list_response is not None and \
                 removing_topics_from_exception_list_response["meta"]["responseCode"] != 200:
             print("Failed to delete topic: [%s] from the exception list", topic_name)
@@ -615,7 +1125,7 @@ class SempUtility:
         """
         try:
             return self.semp_client \
-                .http_patch(PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=vpn_name), data)
+                .http_patch(PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=quote_name(vpn_name)), data)
         except Exception as err:
             print(f'Unable to update MESSAGE VPN details: "{vpn_name}"\nException: {err}')
 
@@ -657,11 +1167,13 @@ class SempUtility:
         """
         create_client_user_payload = {"clientUsername": username}
         message_vpn_response = self.semp_client.http_post(
-            create_msg_vpn_user_endpoint.substitute(msg_vpn_name=message_vpn),
+            create_msg_vpn_user_endpoint.substitute(msg_vpn_name=quote_name(message_vpn)),
             create_client_user_payload)
         new_user_name = message_vpn_response['data']['clientUsername']
         if new_user_name != username:
             raise Exception(f"Unable to create new user: {username}")
+        if self.teardown is not None:
+            self.teardown.record_client_username(username, message_vpn)
 
     def __message_vpn_client_profile(self, msg_vpn_name, client_profile="default"):
         """method to update client profile
@@ -678,8 +1190,8 @@ class SempUtility:
                                   "clientProfileName": client_profile}
 
         client_profile_response = self.semp_client.http_patch(
-            update_msg_vpn_endpoint.substitute(msg_vpn_name=msg_vpn_name,
-                                               client_profile_name=client_profile),
+            update_msg_vpn_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                               client_profile_name=quote_name(client_profile)),
             client_profile_payload)
         data_response = client_profile_response['data']
         new_message_vpn_name = data_response['msgVpnName']
@@ -704,7 +1216,8 @@ class SempUtility:
             {"password": client_password, "clientUsername": client_user_name, "enabled": True,
              "msgVpnName": msg_vpn_name}
         client_user_details_response = self.semp_client.http_patch(
-            patch_client_user_name_endpoint.substitute(msg_vpn_name=msg_vpn_name, client_profile_name=client_profile),
+            patch_client_user_name_endpoint.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                       client_profile_name=quote_name(client_profile)),
             client_user_details_payload)
         data_response = client_user_details_response['data']
         new_message_vpn_name = data_response['msgVpnName']
@@ -724,7 +1237,7 @@ class SempUtility:
         """
         enable_message_vpn_payload = {'enabled': True}
         client_user_details_response = self.semp_client.http_patch(
-            PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=msg_vpn_name),
+            PATCH_MESSAGE_VPN_ENDPOINT.substitute(msg_vpn_name=quote_name(msg_vpn_name)),
             enable_message_vpn_payload)
 
         data_response = client_user_details_response['data']
@@ -738,6 +1251,10 @@ class SempUtility:
         cert_payload = self.__prepare_ca_certificate_payload(cert_file_full_path)
         self.semp_client.http_post(certificate_authority_endpoint, cert_payload)
 
-    def get_all_sol_client_list(self, msg_vpn_name):
-        response = self.semp_client.http_get(sol_clients_connected.substitute(msg_vpn_name=msg_vpn_name))
-        return len(response['data'])
+    def iter_sol_clients(self, msg_vpn_name, page_size=DEFAULT_PAGE_COUNT):
+        """method to stream the connected solace clients with their subscription and discard counters"""
+        return self.semp_client.http_get_paged(sol_clients_connected.substitute(msg_vpn_name=quote_name(msg_vpn_name),
+                                                                                count=page_size))
+
+    def get_all_sol_client_list(self, msg_vpn_name, page_size=DEFAULT_PAGE_COUNT):
+        return sum(1 for _ in self.iter_sol_clients(msg_vpn_name, page_size))
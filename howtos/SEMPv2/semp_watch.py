@@ -0,0 +1,134 @@
+"""module for watching a SEMP collection and reporting only the objects that were added, removed or changed"""
+import hashlib
+import json
+import threading
+import time
+
+
+def object_digest(semp_object: dict, ignore_fields=()):
+    """method to hash a SEMP object independent of its attribute order
+    Args:
+        semp_object: object read from SEMP
+        ignore_fields: attributes left out, e.g. fast moving counters that should not count as a change
+
+    Returns:
+        digest bytes
+    """
+    if ignore_fields:
+        semp_object = {key: value for key, value in semp_object.items() if key not in ignore_fields}
+    return hashlib.blake2b(json.dumps(semp_object, sort_keys=True, default=str).encode('utf-8'),
+                           digest_size=16).digest()
+
+
+class SempWatcher:
+    """polls a SEMP collection and calls back for the differences with the previous poll
+
+    Only a digest and the last object are kept per key, so an unchanged poll costs one SEMP read and one hash
+    per object. The interval halves after a poll with changes, down to min_interval, and grows by half after a
+    quiet poll, up to max_interval, so busy resources are followed closely and idle ones are polled rarely.
+    """
+
+    def __init__(self, fetch, key_field: str, interval=5.0, min_interval=None, max_interval=None, on_added=None,
+                 on_removed=None, on_changed=None, ignore_fields=(), emit_initial=True, name='semp-watch'):
+        """
+        Args:
+            fetch: callable returning the current objects of the collection
+            key_field: attribute identifying an object, e.g. queueName
+            interval: seconds between the first polls
+            min_interval: shortest interval, a quarter of interval by default
+            max_interval: longest interval, four times interval by default
+            on_added: callback(key, new_object)
+            on_removed: callback(key, old_object)
+            on_changed: callback(key, old_object, new_object)
+            ignore_fields: attributes that do not count as a change
+            emit_initial: report the objects of the first poll as added
+            name: name of the polling thread
+        """
+        self.fetch = fetch
+        self.key_field = key_field
+        self.interval = interval
+        self.min_interval = min_interval if min_interval is not None else interval / 4
+        self.max_interval = max_interval if max_interval is not None else interval * 4
+        self.on_added = on_added
+        self.on_removed = on_removed
+        self.on_changed = on_changed
+        self.ignore_fields = frozenset(ignore_fields)
+        self.emit_initial = emit_initial
+        self.name = name
+        self.polls = 0
+        self.__known = None
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        """method to poll on a background thread until stop"""
+        if self.__thread is None:
+            self.__stop.clear()
+            self.__thread = threading.Thread(target=self.__run, name=self.name, daemon=True)
+            self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__stop.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def snapshot(self):
+        """method to get the objects of the last poll by key"""
+        return {key: semp_object for key, (_, semp_object) in (self.__known or {}).items()}
+
+    def __run(self):
+        while not self.__stop.is_set():
+            try:
+                changes = self.poll_once()
+                if changes is not None:
+                    self.interval = max(self.min_interval, self.interval / 2) if changes \
+                        else min(self.max_interval, self.interval * 1.5)
+            except Exception as exception:
+                print(f'Unable to poll [{self.name}]. Exception: {exception}')
+            self.__stop.wait(self.interval)
+
+    def poll_once(self):
+        """method to read the collection once and call back for the differences
+        Returns:
+            number of added, removed and changed objects, None for the initial poll when emit_initial is off
+        """
+        current = {}
+        for semp_object in self.fetch():
+            current[semp_object[self.key_field]] = (object_digest(semp_object, self.ignore_fields), semp_object)
+        previous, self.__known = self.__known, current
+        self.polls += 1
+        if previous is None:
+            if not self.emit_initial:
+                return None
+            previous = {}
+
+        changes = 0
+        for key, (digest, semp_object) in current.items():
+            known = previous.get(key)
+            if known is None:
+                changes += 1
+                self.__notify(self.on_added, key, semp_object)
+            elif known[0] != digest:
+                changes += 1
+                self.__notify(self.on_changed, key, known[1], semp_object)
+        for key, (_, semp_object) in previous.items():
+            if key not in current:
+                changes += 1
+                self.__notify(self.on_removed, key, semp_object)
+        return changes
+
+    def __notify(self, callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as exception:
+            print(f'Watch callback failed for [{self.name}] {args[0]}. Exception: {exception}')
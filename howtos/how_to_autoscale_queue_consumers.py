@@ -0,0 +1,318 @@
+"""sampler module on how to scale a pool of persistent receiver processes with the backlog of a queue
+
+A supervisor polls the spooled message count and the ingress and egress rates of a non-exclusive queue over SEMP
+and starts or stops worker processes, each running a PersistentMessageReceiver bound to the queue like
+patterns/guaranteed_receiver.py, so the broker spreads the backlog over the workers. Scaling up happens when the
+backlog per worker crosses a high watermark, scaling down only when it stays under a lower watermark for a few
+polls, and each direction has its own cooldown, so the pool does not flap around a threshold.
+"""
+import math
+import multiprocessing
+import threading
+import time
+
+from solace.messaging.config.retry_strategy import RetryStrategy
+from solace.messaging.config.solace_properties import service_properties
+from solace.messaging.errors.pubsubplus_client_error import PubSubPlusClientError
+from solace.messaging.messaging_service import MessagingService
+from solace.messaging.receiver.message_receiver import MessageHandler, InboundMessage
+from solace.messaging.receiver.persistent_message_receiver import PersistentMessageReceiver
+from solace.messaging.resources.queue import Queue
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_utility import SempUtility
+from howtos.sampler_boot import SamplerBoot
+
+
+class AckingMessageHandler(MessageHandler):
+    """acknowledges every message, replace on_msg_receive with the real processing"""
+
+    def __init__(self, persistent_receiver: PersistentMessageReceiver):
+        self.receiver = persistent_receiver
+        self.received_count = 0
+
+    def on_msg_receive(self, message: InboundMessage):
+        """Extensible function for processing message received"""
+
+    def on_message(self, message: InboundMessage):
+        try:
+            self.on_msg_receive(message)
+            self.received_count += 1
+            self.receiver.ack(message)
+        except Exception as exception:
+            print(f"Error processing message: {exception}")
+
+
+def run_consumer_worker(broker_props: dict, queue_name: str, stop_event):
+    """method run in each worker process, consumes the queue until stop_event is set
+    Args:
+        broker_props: broker properties for MessagingService.builder().from_properties
+        queue_name: durable non-exclusive queue name
+        stop_event: multiprocessing event telling the worker to drain and exit
+    """
+    messaging_service = MessagingService.builder().from_properties(broker_props) \
+        .with_reconnection_retry_strategy(RetryStrategy.parametrized_retry(20, 3000)) \
+        .build()
+    messaging_service.connect()
+    persistent_receiver = None
+    try:
+        persistent_receiver = messaging_service.create_persistent_message_receiver_builder() \
+            .build(Queue.durable_non_exclusive_queue(queue_name))
+        persistent_receiver.start()
+        handler = AckingMessageHandler(persistent_receiver)
+        persistent_receiver.receive_async(handler)
+        print(f'Worker [{multiprocessing.current_process().name}] bound to QUEUE [{queue_name}]')
+        while not stop_event.wait(1):
+            pass
+        print(f'Worker [{multiprocessing.current_process().name}] stopping after {handler.received_count} message(s)')
+    except PubSubPlusClientError as exception:
+        print(f'Worker unable to consume QUEUE [{queue_name}]. Exception: {exception}')
+    finally:
+        if persistent_receiver is not None and persistent_receiver.is_running():
+            persistent_receiver.terminate(grace_period=5000)
+        messaging_service.disconnect()
+
+
+class ScalingPolicy:
+    """decides the worker count from the queue backlog and message rates
+
+    The pool grows when the spooled messages per worker exceed scale_up_backlog, to the worker count whose
+    capacity covers the ingress rate plus draining the backlog within target_drain_seconds. It shrinks by one
+    worker when the backlog per worker stayed under scale_down_backlog for scale_down_stable_polls polls and the
+    remaining workers still cover the ingress rate.
+
+    The capacity of a worker is worker_capacity when given. Otherwise it is measured from the egress rate per worker
+    of the polls where messages were waiting, since only then are the workers busy. With a short backlog the egress
+    rate just follows the ingress rate and says nothing about what the workers could do. Each busy poll moves the
+    estimate by capacity_smoothing towards its rate, so a capacity that drops, e.g. because a downstream system the
+    workers call got slower, lowers the estimate within a few busy polls instead of being hidden by an old peak.
+    Until a capacity is known, scaling down relies on the backlog alone, and a worker removed too early is added
+    back by the next scale up.
+    """
+
+    def __init__(self, min_workers=1, max_workers=8, scale_up_backlog=1000, scale_down_backlog=100,
+                 target_drain_seconds=60.0, scale_up_cooldown=30.0, scale_down_cooldown=300.0,
+                 scale_down_stable_polls=3, max_scale_up_step=2, worker_capacity=None, capacity_smoothing=0.3):
+        """
+        Args:
+            min_workers: lowest worker count
+            max_workers: highest worker count, the queue maxBindCount must allow it
+            scale_up_backlog: spooled messages per worker above which workers are added
+            scale_down_backlog: spooled messages per worker below which a worker may be removed
+            target_drain_seconds: seconds in which added workers should drain the backlog
+            scale_up_cooldown: seconds after any scaling before workers are added again
+            scale_down_cooldown: seconds after any scaling before a worker is removed
+            scale_down_stable_polls: consecutive low backlog polls needed before removing a worker
+            max_scale_up_step: most workers added at once
+            worker_capacity: messages per second one worker can process, measured from the busy polls when None
+            capacity_smoothing: weight of the latest busy poll in the measured capacity, 1.0 keeps only that poll
+        """
+        if not 0 < min_workers <= max_workers:
+            raise Exception(f'Invalid worker bounds min: [{min_workers}] max: [{max_workers}]')
+        if scale_down_backlog >= scale_up_backlog:
+            raise Exception('scale_down_backlog must be lower than scale_up_backlog')
+        if not 0 < capacity_smoothing <= 1:
+            raise Exception(f'Invalid capacity smoothing: [{capacity_smoothing}]')
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.scale_up_backlog = scale_up_backlog
+        self.scale_down_backlog = scale_down_backlog
+        self.target_drain_seconds = target_drain_seconds
+        self.scale_up_cooldown = scale_up_cooldown
+        self.scale_down_cooldown = scale_down_cooldown
+        self.scale_down_stable_polls = scale_down_stable_polls
+        self.max_scale_up_step = max_scale_up_step
+        self.worker_capacity = worker_capacity
+        self.capacity_smoothing = capacity_smoothing
+        self.measured_capacity = None
+        self.__last_scaled_at = None
+        self.__low_polls = 0
+
+    def decide(self, workers: int, backlog: float, rx_rate: float, tx_rate: float, now: float):
+        """method to get the wanted worker count for one poll
+        Args:
+            workers: running workers
+            backlog: spooled messages
+            rx_rate: ingress messages per second
+            tx_rate: egress messages per second, delivered to the running workers
+            now: monotonic seconds of the poll
+
+        Returns:
+            wanted worker count, within min_workers and max_workers
+        """
+        if workers < self.min_workers or workers > self.max_workers:
+            return self.__scaled(min(max(workers, self.min_workers), self.max_workers), now)
+        since_scaled = now - self.__last_scaled_at if self.__last_scaled_at is not None else math.inf
+        capacity = self.__capacity(workers, backlog, tx_rate)
+
+        if backlog > self.scale_up_backlog * workers:
+            self.__low_polls = 0
+            if since_scaled < self.scale_up_cooldown or workers >= self.max_workers:
+                return workers
+            needed = workers + 1
+            if capacity is not None:
+                needed = math.ceil((rx_rate + backlog / self.target_drain_seconds) / capacity)
+            return self.__scaled(min(self.max_workers, workers + self.max_scale_up_step, max(workers + 1, needed)),
+                                 now)
+
+        if backlog >= self.scale_down_backlog * workers:
+            self.__low_polls = 0
+            return workers
+        self.__low_polls += 1
+        if self.__low_polls < self.scale_down_stable_polls or since_scaled < self.scale_down_cooldown or \
+                workers <= self.min_workers:
+            return workers
+        # the remaining workers must keep up with the ingress rate
+        if capacity is not None and rx_rate > capacity * (workers - 1):
+            return workers
+        return self.__scaled(workers - 1, now)
+
+    def __capacity(self, workers, backlog, tx_rate):
+        """method to get the messages per second of one worker, None while unknown"""
+        if self.worker_capacity is not None:
+            return self.worker_capacity
+        if workers and tx_rate > 0 and backlog >= self.scale_down_backlog * workers:
+            rate = tx_rate / workers
+            if self.measured_capacity is None:
+                self.measured_capacity = rate
+            else:
+                self.measured_capacity += self.capacity_smoothing * (rate - self.measured_capacity)
+        return self.measured_capacity
+
+    def __scaled(self, workers, now):
+        self.__last_scaled_at = now
+        self.__low_polls = 0
+        return workers
+
+
+class QueueConsumerAutoscaler:
+    """supervises the pool of consumer worker processes of one non-exclusive queue"""
+
+    def __init__(self, semp_utility: SempUtility, msg_vpn_name: str, queue_name: str, broker_props: dict,
+                 policy: ScalingPolicy = None, poll_interval=10.0, worker_target=run_consumer_worker):
+        """
+        Args:
+            semp_utility: SempUtility used to poll the queue counters
+            msg_vpn_name: message vpn of the queue
+            queue_name: durable non-exclusive queue name
+            broker_props: broker properties handed to every worker
+            policy: scaling policy, the ScalingPolicy defaults when not given
+            poll_interval: seconds between polls
+            worker_target: function run by each worker process with (broker_props, queue_name, stop_event)
+        """
+        self.semp_utility = semp_utility
+        self.msg_vpn_name = msg_vpn_name
+        self.queue_name = queue_name
+        self.broker_props = broker_props
+        self.policy = policy if policy is not None else ScalingPolicy()
+        self.poll_interval = poll_interval
+        self.worker_target = worker_target
+        # spawn keeps the native messaging api state of the supervisor out of the workers
+        self.__context = multiprocessing.get_context('spawn')
+        self.__workers = []
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    @property
+    def worker_count(self):
+        return len(self.__workers)
+
+    def start(self):
+        """method to check the queue, start the minimum workers and poll on a background thread"""
+        queue_stats = self.semp_utility.get_queue_stats(self.msg_vpn_name, self.queue_name)
+        if queue_stats is None:
+            raise Exception(f'Unable to read QUEUE [{self.queue_name}] in MESSAGE VPN [{self.msg_vpn_name}]')
+        if queue_stats.get('accessType') != 'non-exclusive':
+            raise Exception(f'QUEUE [{self.queue_name}] must be non-exclusive to share its messages over workers')
+        self.scale_to(self.policy.min_workers)
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__run, name='queue-consumer-autoscaler', daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        """method to stop polling and stop every worker"""
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        self.scale_to(0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def __run(self):
+        while not self.__stop.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except Exception as exception:
+                print(f'Autoscaler poll failed for QUEUE [{self.queue_name}]. Exception: {exception}')
+
+    def poll_once(self, now=None):
+        """method to read the queue counters once and apply the scaling decision
+        Returns:
+            dict with the polled backlog and rates and the worker count before and after, None when the counters
+            could not be read
+        """
+        now = time.monotonic() if now is None else now
+        self.__reap()
+        queue_stats = self.semp_utility.get_queue_stats(self.msg_vpn_name, self.queue_name)
+        if queue_stats is None:
+            return None
+        backlog = queue_stats.get('spooledMsgCount', 0)
+        rx_rate = queue_stats.get('rxMsgRate', 0)
+        tx_rate = queue_stats.get('txMsgRate', 0)
+        workers = self.worker_count
+        wanted = self.policy.decide(workers, backlog, rx_rate, tx_rate, now)
+        if wanted != workers:
+            print(f'Scaling QUEUE [{self.queue_name}] consumers {workers} -> {wanted}: backlog {backlog}, '
+                  f'rx {rx_rate}/s, tx {tx_rate}/s')
+            self.scale_to(wanted)
+        return {'backlog': backlog, 'rx_rate': rx_rate, 'tx_rate': tx_rate, 'workers': workers, 'wanted': wanted}
+
+    def scale_to(self, count: int):
+        """method to start or stop workers until count are running, the newest workers are stopped first"""
+        while len(self.__workers) < count:
+            stop_event = self.__context.Event()
+            process = self.__context.Process(target=self.worker_target,
+                                             args=(self.broker_props, self.queue_name, stop_event),
+                                             name=f'{self.queue_name}-consumer-{len(self.__workers)}', daemon=True)
+            process.start()
+            self.__workers.append((process, stop_event))
+        stopping = self.__workers[count:]
+        del self.__workers[count:]
+        for _, stop_event in stopping:
+            stop_event.set()
+        for process, _ in stopping:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
+
+    def __reap(self):
+        """method to drop workers that exited on their own, the next decision replaces them"""
+        alive = [(process, stop_event) for process, stop_event in self.__workers if process.is_alive()]
+        if len(alive) != len(self.__workers):
+            print(f'{len(self.__workers) - len(alive)} consumer worker(s) of QUEUE [{self.queue_name}] exited')
+            self.__workers = alive
+
+
+if __name__ == '__main__':
+    boot = SamplerBoot()
+    semp_config = boot.read_semp_configuration()
+    semp_utility = SempUtility(SempClient(semp_base_url=semp_config[SamplerBoot.semp_hostname_key],
+                                          user_name=semp_config[SamplerBoot.semp_username_key],
+                                          password=semp_config[SamplerBoot.semp_password_key]))
+    broker_props = boot.broker_properties()
+    msg_vpn_name = broker_props[service_properties.VPN_NAME]
+    queue_name = 'autoscaled-queue'
+    semp_utility.ensure_queue(queue_name, msg_vpn_name, access_type='non-exclusive')
+    with QueueConsumerAutoscaler(semp_utility, msg_vpn_name, queue_name, broker_props,
+                                 ScalingPolicy(min_workers=1, max_workers=4)):
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print('\nKeyboardInterrupt received')
@@ -0,0 +1,186 @@
+"""module with an AIMD rate controlled wrapper around a back pressured direct publisher
+
+A publisher built with on_back_pressure_reject raises PublisherOverflowError as soon as its buffer is full. The
+samples catch it and give up. AdaptiveRatePublisher treats it as congestion instead: the send rate is cut
+multiplicatively, the message waits for PublisherReadinessListener.ready and is retried, and while publishing goes
+through the rate grows additively again. The rate settles just under what the connection drains, so the buffer
+rarely fills, nothing is lost and the publisher never stalls for long.
+"""
+import threading
+import time
+
+from solace.messaging.errors.pubsubplus_client_error import PublisherOverflowError
+from solace.messaging.publisher.direct_message_publisher import DirectMessagePublisher
+from solace.messaging.publisher.publisher_health_check import PublisherReadinessListener
+
+
+class AimdRateController:
+    """additive increase, multiplicative decrease controller of a send rate in messages per second"""
+
+    def __init__(self, initial_rate=1000.0, min_rate=10.0, max_rate=None, additive_increase=None,
+                 decrease_factor=0.5, increase_interval=0.1, congestion_hold=None):
+        """
+        Args:
+            initial_rate: messages/sec to start with
+            min_rate: lowest rate a decrease goes to
+            max_rate: highest rate an increase goes to, None for no limit
+            additive_increase: messages/sec added per increase_interval without congestion, 5% of initial_rate
+                by default
+            decrease_factor: factor the rate is multiplied with on congestion
+            increase_interval: seconds of congestion free sending per increase
+            congestion_hold: seconds after a decrease during which further congestion signals are part of the same
+                episode and do not decrease again, increase_interval by default
+        """
+        if not 0 < decrease_factor < 1:
+            print(f'Invalid decrease_factor [{decrease_factor}]')
+            raise Exception(f'decrease_factor must be between 0 and 1, not [{decrease_factor}]')
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = self.__bounded(initial_rate)
+        self.additive_increase = additive_increase if additive_increase is not None else initial_rate * 0.05
+        self.decrease_factor = decrease_factor
+        self.increase_interval = increase_interval
+        self.congestion_hold = congestion_hold if congestion_hold is not None else increase_interval
+        self.increases = 0
+        self.decreases = 0
+        self.__last_change = time.monotonic()
+        self.__last_decrease = None
+
+    def __bounded(self, rate):
+        rate = max(self.min_rate, rate)
+        return min(self.max_rate, rate) if self.max_rate is not None else rate
+
+    def on_success(self, now=None):
+        """method to report a message that went through, increases the rate once per increase_interval"""
+        now = now if now is not None else time.monotonic()
+        if now - self.__last_change >= self.increase_interval:
+            self.rate = self.__bounded(self.rate + self.additive_increase)
+            self.__last_change = now
+            self.increases += 1
+
+    def on_congestion(self, now=None):
+        """method to report congestion, decreases the rate once per congestion episode
+        Returns:
+            True when the rate was decreased
+        """
+        now = now if now is not None else time.monotonic()
+        if self.__last_decrease is not None and now - self.__last_decrease < self.congestion_hold:
+            return False
+        self.rate = self.__bounded(self.rate * self.decrease_factor)
+        self.__last_change = self.__last_decrease = now
+        self.decreases += 1
+        return True
+
+
+class _ReadinessListener(PublisherReadinessListener):
+    """sets an event when the publisher can take messages again"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.signals = 0
+
+    def ready(self):
+        self.signals += 1
+        self.event.set()
+
+
+class AdaptiveRatePublisher:
+    """paces a direct publisher built with on_back_pressure_reject with an AimdRateController"""
+
+    def __init__(self, direct_publisher: DirectMessagePublisher, controller: AimdRateController = None,
+                 ready_timeout=1.0, max_attempts=10):
+        """
+        Args:
+            direct_publisher: started direct publisher built with on_back_pressure_reject
+            controller: rate controller, a default AimdRateController when None
+            ready_timeout: longest seconds to wait for the ready signal after an overflow before retrying
+            max_attempts: publish attempts per message before it is counted as dropped
+        """
+        self.direct_publisher = direct_publisher
+        self.controller = controller if controller is not None else AimdRateController()
+        self.ready_timeout = ready_timeout
+        self.max_attempts = max_attempts
+        self.sent = 0
+        self.overflows = 0
+        self.dropped = 0
+        self.stalled_seconds = 0.0
+        self.__readiness = _ReadinessListener()
+        self.__next_send = time.monotonic()
+        self.__lock = threading.Lock()
+        direct_publisher.set_publisher_readiness_listener(self.__readiness)
+
+    @property
+    def rate(self):
+        """current send rate in messages per second"""
+        return self.controller.rate
+
+    def publish(self, message, destination):
+        """method to publish one message at the controlled rate
+        Args:
+            message: str, bytearray or OutboundMessage
+            destination: Topic to publish to
+
+        Returns:
+            True when the message was published, False when it was dropped after max_attempts overflows
+        """
+        with self.__lock:
+            self.__pace()
+            for _ in range(self.max_attempts):
+                try:
+                    self.direct_publisher.publish(message, destination)
+                except PublisherOverflowError:
+                    self.overflows += 1
+                    self.controller.on_congestion()
+                    self.__wait_ready()
+                    continue
+                self.sent += 1
+                self.controller.on_success()
+                return True
+            self.dropped += 1
+            return False
+
+    def publish_many(self, messages, report_interval=None):
+        """method to publish (destination, message) pairs at the controlled rate
+        Args:
+            messages: iterable of (Topic, message) tuples
+            report_interval: seconds between progress lines with the rate and drops, None for no progress
+
+        Returns:
+            stats() after the last message
+        """
+        last_report = time.monotonic()
+        for destination, message in messages:
+            self.publish(message, destination)
+            if report_interval is not None and time.monotonic() - last_report >= report_interval:
+                last_report = time.monotonic()
+                print(f'Sent {self.sent} message(s) at {self.rate:.0f} msgs/sec, {self.overflows} overflow(s), '
+                      f'{self.dropped} dropped')
+        return self.stats()
+
+    def stats(self):
+        """method to get the publishing counters
+        Returns:
+            dict with the current 'rate', the 'sent', 'overflows' and 'dropped' counts, the 'ready_signals'
+            received, the 'increases' and 'decreases' of the rate and the 'stalled_seconds' spent waiting for ready
+        """
+        return {'rate': self.rate, 'sent': self.sent, 'overflows': self.overflows, 'dropped': self.dropped,
+                'ready_signals': self.__readiness.signals, 'increases': self.controller.increases,
+                'decreases': self.controller.decreases, 'stalled_seconds': self.stalled_seconds}
+
+    def __pace(self):
+        now = time.monotonic()
+        if self.__next_send < now:
+            # do not bank unused time, a burst after an idle period is what fills the buffer
+            self.__next_send = now
+        elif self.__next_send - now > 0.001:
+            time.sleep(self.__next_send - now)
+        self.__next_send += 1.0 / self.controller.rate
+
+    def __wait_ready(self):
+        start = time.monotonic()
+        self.__readiness.event.clear()
+        self.direct_publisher.notify_when_ready()
+        self.__readiness.event.wait(self.ready_timeout)
+        self.stalled_seconds += time.monotonic() - start
+        # the rate was cut, restart the pacing from now instead of catching up on the stall
+        self.__next_send = time.monotonic() + 1.0 / self.controller.rate
@@ -0,0 +1,119 @@
+"""module with a shared, bounded cache of Topic and TopicSubscription objects
+
+Publishers in the samples format the topic name and call Topic.of inside the publish loop, and receivers call
+TopicSubscription.of again for expressions they already subscribed to. Both validate and wrap the same strings over
+and over. A DestinationCache hands out one interned object per name, so a repeated destination costs one dict
+lookup instead of validation and a new object. It only pays off when the names repeat, a name that is unique per
+message, such as TOPIC_PREFIX + f'/direct/pub/{count}', always misses and costs a little more than Topic.of.
+"""
+import collections
+import sys
+import threading
+
+from solace.messaging.resources.topic import Topic
+from solace.messaging.resources.topic_subscription import TopicSubscription
+
+
+class DestinationCache:
+    """least recently used cache of topics and topic subscriptions
+
+    Every lookup takes the lock, the recency update of a hit reorders the entries just like an eviction does, so
+    the cache can be shared by publishing and receiving threads. The objects are created outside the lock.
+    """
+
+    def __init__(self, max_size=10000):
+        """
+        Args:
+            max_size: number of topics and of subscriptions kept before the least recently used one is dropped
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.__topics = collections.OrderedDict()
+        self.__subscriptions = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__topics) + len(self.__subscriptions)
+
+    def topic(self, name: str) -> Topic:
+        """method to get the Topic for a topic name
+        Args:
+            name: topic name
+
+        Returns:
+            the cached Topic, created on first use
+        """
+        topic = self.__hit(self.__topics, name)
+        if topic is None:
+            return self.__add(self.__topics, name, Topic.of(sys.intern(name)))
+        return topic
+
+    def subscription(self, expression: str) -> TopicSubscription:
+        """method to get the TopicSubscription for a subscription expression
+        Args:
+            expression: topic subscription expression, wildcards allowed
+
+        Returns:
+            the cached TopicSubscription, created on first use
+        """
+        subscription = self.__hit(self.__subscriptions, expression)
+        if subscription is None:
+            return self.__add(self.__subscriptions, expression, TopicSubscription.of(sys.intern(expression)))
+        return subscription
+
+    def topic_from(self, template: str, *args) -> Topic:
+        """method to get the Topic for a templated topic name
+        The name is formatted on every call and looked up like topic(), one lookup and at most one miss per call.
+        Like topic() it only pays off when the formatted names repeat, e.g. a bounded set of shard ids, and not for
+        a value that is unique per message such as a message counter.
+        Args:
+            template: str.format template of the topic name, e.g. 'solace/samples/python/direct/pub/{}'
+            args: values of the template fields
+
+        Returns:
+            the cached Topic for template.format(*args)
+        """
+        return self.topic(template.format(*args))
+
+    def subscriptions(self, expressions) -> list:
+        """method to get the TopicSubscriptions for a list of expressions, e.g. for add_subscription calls"""
+        return [self.subscription(expression) for expression in expressions]
+
+    def clear(self):
+        with self.__lock:
+            self.__topics.clear()
+            self.__subscriptions.clear()
+
+    def stats(self):
+        """method to get the cache counters
+        Returns:
+            dict with the 'size', 'hits', 'misses', 'evictions' and 'hit_rate' of the cache
+        """
+        with self.__lock:
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {'size': len(self), 'hits': hits, 'misses': misses, 'evictions': evictions,
+                'hit_rate': hits / lookups if lookups else 0.0}
+
+    def __hit(self, entries, key):
+        with self.__lock:
+            value = entries.get(key)
+            if value is not None:
+                entries.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def __add(self, entries, key, value):
+        with self.__lock:
+            self.misses += 1
+            value = entries.setdefault(key, value)
+            while len(entries) > self.max_size:
+                entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+
+# process wide cache, for publishers and receivers that should share their destinations
+SHARED_DESTINATIONS = DestinationCache()
@@ -0,0 +1,88 @@
+"""module with a batch publish helper for the direct message publisher
+
+Publishing message by message the way the samples do, building a fresh message builder, a new Topic.of and an
+OutboundMessage per message, spends most of the time in Python rather than on the wire. publish_many resolves the
+Topic of each destination and one message builder per distinct set of message properties once per call, keeps
+them in plain dicts local to the call, and then only builds and hands each payload to the publisher. No lock is
+taken and no properties dict is sorted or hashed per message.
+"""
+import time
+from typing import Iterable
+
+from solace.messaging.errors.pubsubplus_client_error import PublisherOverflowError
+from solace.messaging.messaging_service import MessagingService
+from solace.messaging.publisher.direct_message_publisher import DirectMessagePublisher
+from solace.messaging.resources.topic import Topic
+
+from howtos.pubsub.destination_cache import DestinationCache
+from howtos.pubsub.message_prototype import _properties_key
+
+
+def publish_many(direct_publisher: DirectMessagePublisher, messaging_service: MessagingService,
+                 messages: Iterable, report_interval=None, destinations: DestinationCache = None):
+    """method to publish many messages on a started direct publisher
+    Args:
+        direct_publisher: started direct message publisher
+        messaging_service: connected messaging service, used for its message builder
+        messages: iterable of (topic, payload) or (topic, payload, properties) tuples. topic is a topic name or a
+            Topic, payload a str or bytearray, properties an optional dict of message properties. Reusing the same
+            properties dict for many messages is the fastest, a dict must not be changed once handed over
+        report_interval: seconds between progress lines with the current msgs/sec, None for no progress
+        destinations: destination cache to share with other publishers, a new one for this call by default. It is
+            asked once per topic name of the call
+
+    Returns:
+        dict with the 'published' and 'failed' counts, the 'elapsed' seconds, the sustained 'msgs_per_sec', the
+        number of 'destinations' in the destination cache and of message 'builders' used
+    """
+    publish = direct_publisher.publish
+    destinations = destinations if destinations is not None else DestinationCache()
+    topics = {}
+    # message builders by properties key, each converts its properties once and is never changed afterwards
+    builders = {}
+    last_properties = build = None
+    published = failed = 0
+    start = last_report = time.perf_counter()
+    reported = 0
+    for item in messages:
+        if len(item) == 2:
+            destination, payload = item
+            properties = None
+        else:
+            destination, payload, properties = item
+        topic = topics.get(destination)
+        if topic is None:
+            topic = destination if isinstance(destination, Topic) else destinations.topic(destination)
+            topics[destination] = topic
+        if not properties:
+            message = payload
+        else:
+            if properties is not last_properties:
+                build = _builder_for(messaging_service, builders, properties)
+                last_properties = properties
+            message = build(payload)
+        try:
+            publish(message, topic)
+            published += 1
+        except PublisherOverflowError:
+            failed += 1
+        if report_interval is not None:
+            now = time.perf_counter()
+            if now - last_report >= report_interval:
+                print(f'Published {published} message(s), {(published - reported) / (now - last_report):.0f} msgs/sec')
+                last_report, reported = now, published
+    elapsed = time.perf_counter() - start
+    return {'published': published, 'failed': failed, 'elapsed': elapsed,
+            'msgs_per_sec': published / elapsed if elapsed else 0.0, 'destinations': len(destinations),
+            'builders': len(builders)}
+
+
+def _builder_for(messaging_service: MessagingService, builders: dict, properties: dict):
+    """method to get the build function of the message builder holding the given properties"""
+    key = _properties_key(properties)
+    build = builders.get(key) if key is not None else None
+    if build is None:
+        build = messaging_service.message_builder().from_properties(properties).build
+        if key is not None:
+            builders[key] = build
+    return build
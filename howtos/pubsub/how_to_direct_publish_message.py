@@ -10,6 +10,8 @@ from solace.messaging.resources.topic import Topic
 from solace.messaging.utils.converter import ObjectToBytes
 from solace.messaging.utils.manageable import Metric
 from howtos.how_to_access_api_metrics import HowToAccessApiMetrics
+from howtos.pubsub.destination_cache import SHARED_DESTINATIONS
+from howtos.pubsub.direct_publish_many import publish_many
 from howtos.sampler_boot import SamplerBoot, SolaceConstants
 
 X = TypeVar('X')
@@ -125,6 +127,22 @@ class HowToDirectPublishMessage:
         finally:
             direct_publish_service.terminate()
 
+    @staticmethod
+    def direct_message_publish_many(messaging_service: MessagingService, topic_names, message, count=1000):
+        """ to publish a batch of messages with shared destinations and message properties"""
+        try:
+            direct_publish_service = messaging_service.create_direct_message_publisher_builder(). \
+                on_back_pressure_wait(buffer_capacity=1000).build()
+            pub_start = direct_publish_service.start_async()
+            pub_start.result()
+            messages = ((topic_names[index % len(topic_names)], f'{message} {index}', constants.CUSTOM_PROPS)
+                        for index in range(count))
+            result = publish_many(direct_publish_service, messaging_service, messages, destinations=SHARED_DESTINATIONS)
+            print(f"Published {result['published']} messages at {result['msgs_per_sec']:.0f} msgs/sec")
+            return result
+        finally:
+            direct_publish_service.terminate()
+
     @staticmethod
     def publish_message_with_unique_service():
         service = MessagingService.builder().from_properties(boot.broker_properties()).build()
@@ -185,13 +203,19 @@ class HowToDirectPublishMessage:
                                                               message_obj=MyData('some value'),
                                                               converter=PopoConverter())
 
+            print("Execute Direct Publish - Batch of messages")
+            HowToDirectPublishMessage() \
+                .direct_message_publish_many(messaging_service,
+                                             [constants.TOPIC_ENDPOINT_1, constants.TOPIC_ENDPOINT_2],
+                                             constants.MESSAGE_TO_SEND)
+
             print("Execute Direct Publish - Concurrent testing")
             tasks = []
             with ThreadPoolExecutor() as executor:
                 for e in range(10):  # make sure you have try-me1 & try-me2 already
-                    destination_name = Topic.of(constants.TOPIC_ENDPOINT_2)
+                    destination_name = SHARED_DESTINATIONS.topic(constants.TOPIC_ENDPOINT_2)
                     if e % 2 == 0:
-                        destination_name = Topic.of(constants.TOPIC_ENDPOINT_1)
+                        destination_name = SHARED_DESTINATIONS.topic(constants.TOPIC_ENDPOINT_1)
 
                     future = executor.submit(HowToDirectPublishMessage().direct_message_publish, messaging_service,
                                              destination_name, constants.MESSAGE_TO_SEND)
@@ -12,6 +12,7 @@ from solace.messaging.publisher.persistent_message_publisher import PersistentMe
 from solace.messaging.resources.topic import Topic
 from solace.messaging.utils.converter import ObjectToBytes
 from solace.messaging.utils.manageable import Metric
+from howtos.pubsub.windowed_persistent_publisher import WindowedPersistentPublisher
 from howtos.sampler_boot import SolaceConstants, SamplerBoot
 
 X = TypeVar('X')
@@ -156,6 +157,20 @@ class HowToPublishPersistentMessage:
         metrics = messaging_service.metrics()
         print(f'Published message count: {metrics.get_value(Metric.PERSISTENT_MESSAGES_SENT)}\n')
 
+    @staticmethod
+    def publish_messages_windowed(message_publisher: PersistentMessagePublisher, destination: Topic, message,
+                                  message_count=100, window_size=32):
+        """method to pipeline persistent messages with a bounded number of unacknowledged messages and a future
+        per message, instead of waiting for each acknowledgement"""
+        windowed_publisher = WindowedPersistentPublisher(message_publisher, window_size=window_size)
+        futures = [windowed_publisher.publish(f'{message} {index}', destination, user_context=index)
+                   for index in range(message_count)]
+        windowed_publisher.flush(timeout=10)
+        failed = [future for future in futures if future.done() and future.exception() is not None]
+        stats = windowed_publisher.stats()
+        print(f"Acknowledged {stats['acknowledged']} of {message_count} message(s), {len(failed)} failed, "
+              f"p99 ack latency {stats['latency'].get('p99', 0) * 1000:.1f} ms\n")
+
     @staticmethod
     def run():
         try:
@@ -200,6 +215,9 @@ class HowToPublishPersistentMessage:
                                                                                  message=message,
                                                                                  time_out=2000)
 
+            HowToPublishPersistentMessage.publish_messages_windowed(message_publisher=publisher, destination=topic,
+                                                                    message=message)
+
         finally:
             publisher.terminate()
             messaging_service.disconnect()
@@ -4,6 +4,7 @@ from typing import TypeVar
 from solace.messaging.errors.pubsubplus_client_error import PublisherOverflowError
 from solace.messaging.messaging_service import MessagingService
 from solace.messaging.resources.topic import Topic
+from howtos.pubsub.adaptive_rate_publisher import AdaptiveRatePublisher, AimdRateController
 from howtos.sampler_boot import SamplerBoot, SolaceConstants, SamplerUtil
 
 X = TypeVar('X')
@@ -108,6 +109,22 @@ class HowToDirectPublishWithBackPressureSampler:
         finally:
             direct_publish_service.terminate()
 
+    @staticmethod
+    def direct_message_publish_on_backpressure_reject_adaptive_rate(messaging_service: MessagingService, destination,
+                                                                    message, buffer_capacity, message_count):
+        """ to publish str or byte array type message at a rate adapted to the back pressure"""
+        try:
+            direct_publish_service = messaging_service.create_direct_message_publisher_builder() \
+                .on_back_pressure_reject(buffer_capacity=buffer_capacity) \
+                .build()
+            direct_publish_service.start()
+            publisher = AdaptiveRatePublisher(direct_publish_service, AimdRateController(initial_rate=1000))
+            stats = publisher.publish_many((destination, message) for _ in range(message_count))
+            print(f"Sent {stats['sent']} message(s), rate now {stats['rate']:.0f} msgs/sec, "
+                  f"{stats['overflows']} overflow(s), {stats['dropped']} dropped")
+        finally:
+            direct_publish_service.terminate()
+
     @staticmethod
     def run():
         """
@@ -149,6 +166,12 @@ class HowToDirectPublishWithBackPressureSampler:
                                                                                          + str("_outbound based"),
                                                                                          buffer_capacity,
                                                                                          message_count)
+
+                print("Execute Direct Publish - String using back pressure reject with an adaptive rate")
+                HowToDirectPublishWithBackPressureSampler() \
+                    .direct_message_publish_on_backpressure_reject_adaptive_rate(service, destination_name,
+                                                                                 constants.MESSAGE_TO_SEND,
+                                                                                 buffer_capacity, message_count)
             else:
                 print("failed to connect service with properties: {boot.broker_properties}")
 
@@ -0,0 +1,156 @@
+"""module with a windowed persistent publisher that returns a future per message
+
+publish_await_acknowledgement waits a full broker round trip per message, and a plain publish with a receipt
+listener that only counts receipts loses which message failed. WindowedPersistentPublisher publishes without
+waiting, passes a token as user context and resolves the future of the message from on_publish_receipt. At most
+window_size messages are unacknowledged at a time, so a slow broker holds the publisher back instead of letting an
+unbounded backlog build up, and the ack latency of every message is recorded.
+"""
+import collections
+import threading
+import time
+from concurrent.futures import Future
+
+from solace.messaging.publisher.persistent_message_publisher import PersistentMessagePublisher, \
+    MessagePublishReceiptListener, PublishReceipt
+from solace.messaging.resources.topic import Topic
+
+
+class PublishAck:
+    """result of an acknowledged message"""
+
+    def __init__(self, receipt: PublishReceipt, user_context, latency):
+        """
+        Args:
+            receipt: publish receipt from the API, its user_context is the internal correlation token
+            user_context: user context given to publish
+            latency: seconds from publish to the receipt
+        """
+        self.receipt = receipt
+        self.user_context = user_context
+        self.latency = latency
+
+
+class _PendingPublish:
+    """correlation token passed as user context with each message"""
+    __slots__ = ('future', 'user_context', 'sent_at')
+
+    def __init__(self, user_context):
+        self.future = Future()
+        self.user_context = user_context
+        self.sent_at = time.perf_counter()
+
+
+class WindowedPersistentPublisher(MessagePublishReceiptListener):
+    """pipelines persistent publishes with a bounded number of unacknowledged messages"""
+
+    def __init__(self, persistent_publisher: PersistentMessagePublisher, window_size=256, latency_sample_size=10000):
+        """
+        Args:
+            persistent_publisher: started persistent publisher. Its publish receipt listener is replaced
+            window_size: largest number of messages published and not yet acknowledged
+            latency_sample_size: number of most recent ack latencies kept for stats()
+        """
+        self.persistent_publisher = persistent_publisher
+        self.window_size = window_size
+        self.published = 0
+        self.acknowledged = 0
+        self.failed = 0
+        self.window_waits = 0
+        self.__in_flight = 0
+        self.__latencies = collections.deque(maxlen=latency_sample_size)
+        self.__window = threading.Condition()
+        persistent_publisher.set_message_publish_receipt_listener(self)
+
+    @property
+    def in_flight(self):
+        """number of messages published and not yet acknowledged"""
+        return self.__in_flight
+
+    def publish(self, message, destination: Topic, user_context=None, additional_message_properties=None,
+                timeout=None) -> Future:
+        """method to publish a persistent message without waiting for its acknowledgement
+        Args:
+            message: str, bytearray or OutboundMessage
+            destination: Topic to publish to
+            user_context: returned in the PublishAck of the message
+            additional_message_properties: properties added to this message only
+            timeout: longest seconds to wait for room in the window, None to wait as long as it takes
+
+        Returns:
+            Future resolved with a PublishAck once the broker acknowledged the message, or with the exception of
+            a failed publish. Callbacks added to it run on the API thread delivering the receipt
+
+        Raises:
+            Exception: when there is no room in the window within timeout
+        """
+        with self.__window:
+            if self.__in_flight >= self.window_size:
+                self.window_waits += 1
+                if not self.__window.wait_for(lambda: self.__in_flight < self.window_size, timeout):
+                    print(f'No room in the publish window of [{self.window_size}] within [{timeout}] seconds')
+                    raise Exception(f'No room in the publish window within [{timeout}] seconds')
+            self.__in_flight += 1
+        pending = _PendingPublish(user_context)
+        try:
+            if additional_message_properties:
+                self.persistent_publisher.publish(message, destination, user_context=pending,
+                                                  additional_message_properties=additional_message_properties)
+            else:
+                self.persistent_publisher.publish(message, destination, user_context=pending)
+        except Exception as exception:
+            self.__complete(failed=True)
+            pending.future.set_exception(exception)
+            return pending.future
+        self.published += 1
+        return pending.future
+
+    def on_publish_receipt(self, publish_receipt: PublishReceipt):
+        pending = publish_receipt.user_context
+        if not isinstance(pending, _PendingPublish):
+            return
+        latency = time.perf_counter() - pending.sent_at
+        failed = publish_receipt.exception is not None or not publish_receipt.is_persisted
+        self.__latencies.append(latency)
+        self.__complete(failed)
+        if failed:
+            pending.future.set_exception(publish_receipt.exception or
+                                         Exception(f'Message not persisted: {publish_receipt}'))
+        else:
+            pending.future.set_result(PublishAck(publish_receipt, pending.user_context, latency))
+
+    def flush(self, timeout=None):
+        """method to wait until every published message is acknowledged
+        Args:
+            timeout: longest seconds to wait, None to wait as long as it takes
+
+        Returns:
+            True when nothing is in flight anymore
+        """
+        with self.__window:
+            return self.__window.wait_for(lambda: self.__in_flight == 0, timeout)
+
+    def stats(self):
+        """method to get the publishing counters and the ack latency of the recent messages
+        Returns:
+            dict with the 'published', 'acknowledged', 'failed' and 'in_flight' counts, the 'window_size', the
+            'window_waits' and the 'latency' dict of 'count', 'mean', 'p50', 'p90', 'p99' and 'max' seconds
+        """
+        latencies = sorted(self.__latencies)
+        latency = {'count': len(latencies)}
+        if latencies:
+            latency.update({'mean': sum(latencies) / len(latencies), 'max': latencies[-1]})
+            for name, percentile in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99)):
+                latency[name] = latencies[min(len(latencies) - 1, int(percentile * len(latencies)))]
+        return {'published': self.published, 'acknowledged': self.acknowledged, 'failed': self.failed,
+                'in_flight': self.__in_flight, 'window_size': self.window_size, 'window_waits': self.window_waits,
+                'latency': latency}
+
+    def __complete(self, failed):
+        with self.__window:
+            self.__in_flight -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.acknowledged += 1
+            self.__window.notify_all()
@@ -0,0 +1,56 @@
+"""tests for the asyncio semp utility against the in-process SEMP stand-in"""
+import asyncio
+import unittest
+
+from howtos.SEMPv2.async_semp_client import AsyncSempClient
+from howtos.SEMPv2.async_semp_utility import AsyncSempUtility
+from howtos.SEMPv2.semp_standin import SempStandInServer
+
+MSG_VPN = 'test-vpn'
+
+
+class AsyncSempUtilityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+
+    def run_with_utility(self, scenario):
+        async def main():
+            async with AsyncSempClient(self.server.base_url, max_concurrency=4) as client:
+                return await scenario(AsyncSempUtility(client))
+        return asyncio.run(main())
+
+    def queue_names(self):
+        return sorted(queue['queueName'] for queue in self.server.store.collection(('msgVpns', MSG_VPN, 'queues')))
+
+    def test_create_queues_forwards_single_request(self):
+        outcomes = self.run_with_utility(lambda utility: utility.create_queues(['q1', 'q2'], MSG_VPN,
+                                                                               single_request=True))
+        self.assertEqual({}, AsyncSempUtility.failures(outcomes))
+        self.assertEqual(['q1', 'q2'], self.queue_names())
+
+    def test_create_queues_forwards_ensure_and_reports_its_outcome(self):
+        async def scenario(utility):
+            first = await utility.create_queues(['q1'], MSG_VPN, ensure=True)
+            second = await utility.create_queues(['q1', 'q2'], MSG_VPN, ensure=True)
+            return first, second
+
+        first, second = self.run_with_utility(scenario)
+        self.assertEqual({'q1': 'created'}, first)
+        # a re-run with the same input must not write anything
+        self.assertEqual({'q1': 'unchanged', 'q2': 'created'}, second)
+
+    def test_close_from_the_event_loop(self):
+        async def main():
+            client = AsyncSempClient(self.server.base_url, max_concurrency=2)
+            await client.http_get('/SEMP/v2/monitor/about')
+            await client.aclose()
+            return True
+
+        self.assertTrue(asyncio.run(main()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""tests for the SEMP GET response cache and its use by SempClient"""
+import threading
+import time
+import unittest
+
+from howtos.SEMPv2.semp_cache import SempResponseCache, resource_path
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_standin import SempStandInServer
+
+MSG_VPN = 'test-vpn'
+QUEUES = f'/SEMP/v2/config/msgVpns/{MSG_VPN}/queues'
+
+
+class ResourcePathTest(unittest.TestCase):
+
+    def test_config_and_monitor_share_the_resource_path(self):
+        self.assertEqual('/msgVpns/vpn/queues/q1', resource_path('/SEMP/v2/config/msgVpns/vpn/queues/q1?select=x'))
+        self.assertEqual('/msgVpns/vpn/queues/q1', resource_path('http://host:8080/SEMP/v2/monitor/msgVpns/vpn/'
+                                                                 'queues/q1'))
+        self.assertEqual('', resource_path('/SEMP/v2/config'))
+
+
+class SempResponseCacheTest(unittest.TestCase):
+
+    def test_hit_returns_a_copy(self):
+        cache = SempResponseCache()
+        cache.put(QUEUES, {'data': [1]})
+        cached = cache.get(QUEUES)
+        cached['data'].append(2)
+        self.assertEqual({'data': [1]}, cache.get(QUEUES))
+        self.assertIsNone(cache.get(QUEUES + '?count=10'))
+        self.assertEqual({'hits': 2, 'misses': 1}, {key: cache.stats()[key] for key in ('hits', 'misses')})
+
+    def test_entries_expire_after_their_endpoint_ttl(self):
+        cache = SempResponseCache(default_ttl=0.02, endpoint_ttls={'/SEMP/v2/monitor': 0,
+                                                                   '/SEMP/v2/config/msgVpns': 60})
+        self.assertEqual(60, cache.ttl_for(QUEUES))
+        cache.put('/SEMP/v2/monitor/about', {'data': {}})
+        cache.put('/SEMP/v2/config/about', {'data': {}})
+        cache.put(QUEUES, {'data': []})
+        self.assertIsNone(cache.get('/SEMP/v2/monitor/about'))
+        time.sleep(0.03)
+        self.assertIsNone(cache.get('/SEMP/v2/config/about'))
+        self.assertIsNotNone(cache.get(QUEUES))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = SempResponseCache(max_entries=2)
+        cache.put('/SEMP/v2/config/a', {'data': 'a'})
+        cache.put('/SEMP/v2/config/b', {'data': 'b'})
+        cache.get('/SEMP/v2/config/a')
+        cache.put('/SEMP/v2/config/c', {'data': 'c'})
+        self.assertIsNone(cache.get('/SEMP/v2/config/b'))
+        self.assertIsNotNone(cache.get('/SEMP/v2/config/a'))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_write_invalidates_the_resource_its_children_and_parents(self):
+        cache = SempResponseCache()
+        queue = f'{QUEUES}/q1'
+        for endpoint in (QUEUES + '?count=10', queue, f'{queue}/subscriptions', f'{QUEUES}/q2',
+                         f'/SEMP/v2/monitor/msgVpns/{MSG_VPN}/queues/q1', '/SEMP/v2/config/msgVpns/other'):
+            cache.put(endpoint, {'data': endpoint})
+        self.assertEqual(4, cache.invalidate(queue))
+        self.assertIsNotNone(cache.get(f'{QUEUES}/q2'))
+        self.assertIsNotNone(cache.get('/SEMP/v2/config/msgVpns/other'))
+        self.assertIsNone(cache.get(f'{queue}/subscriptions'))
+
+    def test_response_read_before_a_write_is_not_cached(self):
+        cache = SempResponseCache()
+        generation = cache.generation
+        cache.invalidate(f'{QUEUES}/q1')
+        cache.put(QUEUES, {'data': 'before the write'}, generation)
+        self.assertIsNone(cache.get(QUEUES))
+        cache.put(QUEUES, {'data': 'after the write'}, cache.generation)
+        self.assertIsNotNone(cache.get(QUEUES))
+
+
+class SempClientCacheTest(unittest.TestCase):
+
+    def test_cached_reads_skip_the_broker_until_a_write(self):
+        server = SempStandInServer().start()
+        self.addCleanup(server.stop)
+        server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN, 'enabled': False})
+        client = SempClient(server.base_url, response_cache=SempResponseCache(default_ttl=60))
+        self.addCleanup(client.close)
+        endpoint = f'/SEMP/v2/config/msgVpns/{MSG_VPN}'
+
+        self.assertFalse(client.http_get(endpoint)['data']['enabled'])
+        self.assertFalse(client.http_get(endpoint)['data']['enabled'])
+        self.assertEqual({'GET': 1}, server.request_counts())
+        client.http_patch(endpoint, {'enabled': True})
+        self.assertTrue(client.http_get(endpoint)['data']['enabled'])
+        self.assertEqual(2, server.request_counts()['GET'])
+
+    def test_read_during_a_write_is_not_served_after_it(self):
+        server = SempStandInServer().start()
+        self.addCleanup(server.stop)
+        server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN, 'enabled': False})
+        client = SempClient(server.base_url, response_cache=SempResponseCache(default_ttl=60))
+        self.addCleanup(client.close)
+        endpoint = f'/SEMP/v2/config/msgVpns/{MSG_VPN}'
+        send = client.session.request
+        concurrent_reads = []
+
+        def request(method, url, **kwargs):
+            if method == 'PATCH':
+                # another thread reads the old state after the write was invalidated and before it is applied
+                reader = threading.Thread(target=lambda: concurrent_reads.append(client.http_get(endpoint)))
+                reader.start()
+                reader.join()
+            return send(method, url, **kwargs)
+
+        client.session.request = request
+        client.http_patch(endpoint, {'enabled': True})
+        self.assertFalse(concurrent_reads[0]['data']['enabled'])
+        self.assertTrue(client.http_get(endpoint)['data']['enabled'])
+
+
+if __name__ == '__main__':
+    unittest.main()
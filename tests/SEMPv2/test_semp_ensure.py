@@ -0,0 +1,125 @@
+"""tests for the idempotent ensure provisioning against the in-process SEMP stand-in"""
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_state import SempStateCache, diff_fields
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test-vpn'
+
+
+class DiffFieldsTest(unittest.TestCase):
+
+    def test_only_known_differing_attributes_are_returned(self):
+        desired = {'egressEnabled': True, 'password': 'secret', 'threshold': {'setPercent': 80, 'clearPercent': 60}}
+        current = {'egressEnabled': False, 'threshold': {'setPercent': 80, 'clearPercent': 60, 'setValue': 0}}
+        self.assertEqual({'egressEnabled': True}, diff_fields(desired, current))
+        current['threshold']['setPercent'] = 90
+        self.assertIn('threshold', diff_fields(desired, current))
+
+
+class EnsureQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+        client = SempClient(self.server.base_url)
+        self.addCleanup(client.close)
+        self.semp_utility = SempUtility(client, state_cache=SempStateCache())
+
+    def queue(self, name):
+        return self.server.store.get(('msgVpns', MSG_VPN, 'queues', name))
+
+    def subscriptions(self, name):
+        return sorted(subscription['subscriptionTopic'] for subscription in
+                      self.server.store.collection(('msgVpns', MSG_VPN, 'queues', name, 'subscriptions')))
+
+    def requests_for(self, action):
+        self.server.reset_request_counts()
+        result = action()
+        return result, self.server.request_counts()
+
+    def test_create_then_unchanged_with_one_read(self):
+        self.assertEqual('created', self.semp_utility.ensure_queue('q1', MSG_VPN, topics=['a/b']))
+        outcome, requests = self.requests_for(lambda: self.semp_utility.ensure_queue('q1', MSG_VPN, topics=['a/b']))
+        self.assertEqual('unchanged', outcome)
+        # the queue config and its subscriptions are read, nothing is written
+        self.assertEqual({'GET': 2}, requests)
+
+    def test_names_needing_quotes_are_read_back(self):
+        self.server.store.create(('msgVpns', 'test/vpn'), {'msgVpnName': 'test/vpn'})
+        self.assertEqual('created', self.semp_utility.ensure_queue('orders/eu', 'test/vpn', topics=['a/b']))
+        self.assertEqual('unchanged', self.semp_utility.ensure_queue('orders/eu', 'test/vpn', topics=['a/b']))
+
+    def test_queue_deleted_on_the_broker_is_created_again(self):
+        self.semp_utility.ensure_queue('q1', MSG_VPN, topics=['a/b'])
+        self.server.store.delete(('msgVpns', MSG_VPN, 'queues', 'q1'))
+        self.assertEqual('created', self.semp_utility.ensure_queue('q1', MSG_VPN, topics=['a/b']))
+        self.assertEqual(['a/b'], self.subscriptions('q1'))
+
+    def test_drift_on_the_broker_is_patched(self):
+        self.semp_utility.ensure_queue('q1', MSG_VPN)
+        self.server.store.update(('msgVpns', MSG_VPN, 'queues', 'q1'), {'egressEnabled': False})
+        outcome, requests = self.requests_for(lambda: self.semp_utility.ensure_queue('q1', MSG_VPN))
+        self.assertEqual('updated', outcome)
+        self.assertEqual({'GET': 1, 'PATCH': 1}, requests)
+        self.assertTrue(self.queue('q1')['egressEnabled'])
+
+    def test_subscription_removed_on_the_broker_is_added_again(self):
+        self.semp_utility.ensure_queue('q1', MSG_VPN, topics=['a/b', 'c/d'])
+        self.server.store.delete(('msgVpns', MSG_VPN, 'queues', 'q1', 'subscriptions', 'c/d'))
+        self.assertEqual('updated', self.semp_utility.ensure_queue('q1', MSG_VPN, topics=['a/b', 'c/d']))
+        self.assertEqual(['a/b', 'c/d'], self.subscriptions('q1'))
+
+    def test_queue_unknown_to_the_cache_is_not_recreated(self):
+        self.server.store.create(('msgVpns', MSG_VPN, 'queues', 'q1'), {'queueName': 'q1', 'egressEnabled': False})
+        self.server.store.create(('msgVpns', MSG_VPN, 'queues', 'q1', 'subscriptions', 'keep'),
+                                 {'subscriptionTopic': 'keep'})
+        self.assertEqual('updated', self.semp_utility.ensure_queue('q1', MSG_VPN))
+        self.assertEqual(['keep'], self.subscriptions('q1'))
+
+    def test_bulk_ensure_reads_the_queues_with_one_list(self):
+        specs = [{'name': f'q{index}', 'topics': [f't/{index}']} for index in range(5)]
+        first = self.semp_utility.create_queues_bulk(specs, MSG_VPN, ensure=True)
+        self.assertEqual(5, first['succeeded'])
+        self.server.store.delete(('msgVpns', MSG_VPN, 'queues', 'q3'))
+
+        second, requests = self.requests_for(
+            lambda: self.semp_utility.create_queues_bulk(specs, MSG_VPN, ensure=True))
+        states = {name: result['state'] for name, result in second['results'].items()}
+        self.assertEqual({'q0': 'unchanged', 'q1': 'unchanged', 'q2': 'unchanged', 'q3': 'created',
+                          'q4': 'unchanged'}, states)
+        # one queue list and one subscription list per existing queue, then q3 is POSTed and its topic attached
+        # with the subscription reads of add_topics_to_queue_bulk before and after
+        self.assertEqual(1 + 4 + 2, requests['GET'])
+        self.assertEqual(2, requests['POST'])
+        self.assertEqual(['t/3'], self.subscriptions('q3'))
+
+    def test_subscription_attached_by_another_client_counts_as_present(self):
+        self.server.store.create(('msgVpns', MSG_VPN, 'queues', 'q1'), {'queueName': 'q1'})
+        client = self.semp_utility.semp_client
+        send = client.session.request
+
+        def request(method, url, **kwargs):
+            if method == 'POST' and kwargs.get('data') == '{"subscriptionTopic": "b"}':
+                # another client attaches the topic after the subscriptions were read
+                self.server.store.create(('msgVpns', MSG_VPN, 'queues', 'q1', 'subscriptions', 'b'),
+                                         {'subscriptionTopic': 'b'})
+            return send(method, url, **kwargs)
+
+        client.session.request = request
+        result = self.semp_utility.add_topics_to_queue_bulk(['a', 'b'], 'q1', MSG_VPN)
+        self.assertEqual((1, 1, {}, []), (result['added'], result['already_present'], result['failed'],
+                                          result['missing']))
+
+    def test_bulk_refuses_a_queue_name_given_twice(self):
+        specs = [{'name': 'q1'}, {'name': 'q2'}, {'name': 'q1', 'topics': ['a/b']}]
+        with self.assertRaises(Exception):
+            self.semp_utility.create_queues_bulk(specs, MSG_VPN)
+        self.assertEqual({}, self.server.request_counts())
+
+
+if __name__ == '__main__':
+    unittest.main()
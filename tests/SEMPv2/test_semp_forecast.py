@@ -0,0 +1,92 @@
+"""tests for the queue spool fill and drain forecast"""
+import unittest
+
+from howtos.SEMPv2.semp_forecast import SpoolForecaster, BYTES_PER_MB, DEFAULT_MAX_MSG_SPOOL_USAGE_MB, \
+    _linear_slopes
+from howtos.SEMPv2.semp_stats import SempStatsStore, KIND_QUEUE
+
+MSG_VPN = 'test-vpn'
+
+
+class LinearSlopesTest(unittest.TestCase):
+
+    def test_slope_of_each_series(self):
+        rising = [(1000.0 + ts, 5.0 + 2.0 * ts) for ts in range(10)]
+        falling = [(2000.0 + 10 * ts, 100.0 - 3.0 * 10 * ts) for ts in range(5)]
+        noisy = [(0.0, 0.0), (1.0, 2.0), (2.0, 2.0), (3.0, 4.0)]
+        slopes = _linear_slopes([rising, falling, noisy])
+        self.assertAlmostEqual(2.0, slopes[0])
+        self.assertAlmostEqual(-3.0, slopes[1])
+        self.assertAlmostEqual(1.2, slopes[2])
+
+    def test_degenerate_series_have_no_slope(self):
+        self.assertEqual([0.0, 0.0, 0.0], _linear_slopes([[], [(1.0, 5.0)], [(1.0, 5.0), (1.0, 7.0)]]))
+
+
+class SpoolForecasterTest(unittest.TestCase):
+
+    def test_filling_queue_is_flagged_with_its_time_to_full(self):
+        forecaster = SpoolForecaster(window=5, warning_horizon=3600)
+        limit = 100 * BYTES_PER_MB
+        for ts in range(10):
+            forecaster.observe('filling', float(ts), ts * BYTES_PER_MB, 100, rx_msg_rate=10.0, tx_msg_rate=ts)
+            forecaster.observe('steady', float(ts), BYTES_PER_MB)
+
+        filling, steady = forecaster.forecast()
+        self.assertEqual('filling', filling['queue'])
+        self.assertAlmostEqual(BYTES_PER_MB, filling['fill_rate_bytes_per_sec'])
+        self.assertAlmostEqual((limit - 9 * BYTES_PER_MB) / BYTES_PER_MB, filling['seconds_to_full'])
+        # only the last window samples count
+        self.assertAlmostEqual(7.0, filling['egress_rate'])
+        self.assertTrue(filling['warning'])
+
+        self.assertEqual(DEFAULT_MAX_MSG_SPOOL_USAGE_MB * BYTES_PER_MB, steady['limit_bytes'])
+        self.assertIsNone(steady['seconds_to_full'])
+        self.assertFalse(steady['warning'])
+        self.assertEqual(['filling'], [forecast['queue'] for forecast in forecaster.warnings()])
+
+    def test_draining_queue_reports_its_time_to_drain(self):
+        forecaster = SpoolForecaster(usage_warning_ratio=0.5)
+        for ts in range(4):
+            forecaster.observe('draining', ts * 10.0, (900 - ts * 100) * BYTES_PER_MB, 1000)
+        forecast, = forecaster.forecast()
+        self.assertAlmostEqual(60.0, forecast['seconds_to_drain'])
+        self.assertIsNone(forecast['seconds_to_full'])
+        # above the usage ratio, so flagged although it drains
+        self.assertTrue(forecast['warning'])
+
+    def test_drain_time_comes_from_the_backlog_and_the_net_egress_rate(self):
+        forecaster = SpoolForecaster()
+        for ts in range(4):
+            # the byte count stays flat while 50 msgs/sec more leave than arrive
+            forecaster.observe('draining', ts * 10.0, BYTES_PER_MB, rx_msg_rate=100.0, tx_msg_rate=150.0,
+                               spooled_msg_count=3000)
+            forecaster.observe('growing', ts * 10.0, BYTES_PER_MB, rx_msg_rate=150.0, tx_msg_rate=100.0,
+                               spooled_msg_count=3000)
+            forecaster.observe('empty', ts * 10.0, 0, rx_msg_rate=10.0, tx_msg_rate=10.0, spooled_msg_count=0)
+        forecasts = {forecast['queue']: forecast for forecast in forecaster.forecast()}
+        self.assertAlmostEqual(60.0, forecasts['draining']['seconds_to_drain'])
+        self.assertEqual(3000, forecasts['draining']['spooled_msg_count'])
+        self.assertIsNone(forecasts['growing']['seconds_to_drain'])
+        self.assertEqual(0.0, forecasts['empty']['seconds_to_drain'])
+
+    def test_load_history_reads_the_store_rollups(self):
+        store = SempStatsStore(':memory:')
+        self.addCleanup(store.close)
+        base = 1700000000 // 3600 * 3600
+        store.add_samples((base + minute * 60, KIND_QUEUE, MSG_VPN, 'q1', metric, value)
+                          for minute in range(30)
+                          for metric, value in (('msgSpoolUsage', minute * 1000.0), ('maxMsgSpoolUsage', 10.0),
+                                                ('spooledMsgCount', 600.0), ('txMsgRate', 5.0)))
+
+        forecaster = SpoolForecaster(window=10)
+        forecaster.load_history(store, MSG_VPN, since=base)
+        forecast, = forecaster.forecast()
+        self.assertEqual(29000.0, forecast['usage_bytes'])
+        self.assertEqual(10 * BYTES_PER_MB, forecast['limit_bytes'])
+        self.assertAlmostEqual(1000.0 / 60, forecast['fill_rate_bytes_per_sec'])
+        self.assertAlmostEqual(120.0, forecast['seconds_to_drain'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""tests for the batched client inventory against the in-process SEMP stand-in"""
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient, SempRequestError
+from howtos.SEMPv2.semp_inventory import fetch_client_inventory
+from howtos.SEMPv2.semp_resilience import SempCircuitOpenError
+from howtos.SEMPv2.semp_standin import SempStandInServer
+
+MSG_VPN = 'test-vpn'
+
+
+class _FailingConnectionReads:
+    """SempClient wrapper raising the given exception when the connections of a client are read"""
+
+    def __init__(self, semp_client, exception):
+        self.semp_client = semp_client
+        self.exception = exception
+
+    def http_get_paged(self, endpoint):
+        if '/connections' in endpoint:
+            raise self.exception
+        return self.semp_client.http_get_paged(endpoint)
+
+
+class ClientInventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+        for name, rate in (('c1', 10), ('c2', 30)):
+            self.server.store.put(('msgVpns', MSG_VPN, 'clients', name), {'clientName': name, 'rxMsgRate': rate})
+        self.server.store.put(('msgVpns', MSG_VPN, 'clients', 'c1', 'connections', '10.0.0.1:5000'),
+                              {'clientAddress': '10.0.0.1:5000', 'tcpState': 'established',
+                               'rxQueueByteCount': 5, 'smoothedRoundTripTime': 300})
+        self.semp_client = SempClient(self.server.base_url)
+        self.addCleanup(self.semp_client.close)
+
+    def test_clients_and_their_connections_are_read(self):
+        inventory = fetch_client_inventory(self.semp_client, MSG_VPN, concurrency=2)
+        self.assertEqual(['c2', 'c1'], inventory.sort_by('rxMsgRate', reverse=True).column('clientName'))
+        c1 = inventory.filter('clientName', lambda name: name == 'c1').row(0)
+        self.assertEqual((1, 'established', 300), (c1['connectionCount'], c1['tcpState'],
+                                                   c1['smoothedRoundTripTime']))
+
+    def test_failed_connection_reads_leave_the_connection_columns_empty(self):
+        failing = _FailingConnectionReads(self.semp_client, SempRequestError('GET', 'connections', 400))
+        inventory = fetch_client_inventory(failing, MSG_VPN)
+        self.assertEqual([None, None], inventory.column('connectionCount'))
+
+    def test_open_circuit_and_programming_errors_propagate(self):
+        for exception in (SempCircuitOpenError('circuit is open'), KeyError('clientName')):
+            with self.assertRaises(type(exception)):
+                fetch_client_inventory(_FailingConnectionReads(self.semp_client, exception), MSG_VPN)
+
+
+if __name__ == '__main__':
+    unittest.main()
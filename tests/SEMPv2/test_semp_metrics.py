@@ -0,0 +1,63 @@
+"""tests for the semp call metrics and the endpoint template resolution"""
+import unittest
+from urllib.parse import quote
+
+from howtos.SEMPv2 import semp_endpoint
+from howtos.SEMPv2.semp_metrics import EndpointTemplateResolver, SempMetrics, UNMATCHED_ENDPOINT
+
+
+class EndpointTemplateResolverTest(unittest.TestCase):
+
+    def test_resolves_to_the_endpoint_name(self):
+        resolver = EndpointTemplateResolver()
+        self.assertEqual('GET_QUEUE_CONFIG_LIST',
+                         resolver.resolve('GET', '/SEMP/v2/config/msgVpns/vpn/queues?count=100'))
+        self.assertEqual('get_queue_config_endpoint',
+                         resolver.resolve('GET', 'http://broker:8080/SEMP/v2/config/msgVpns/vpn/queues/q1'))
+        self.assertEqual(UNMATCHED_ENDPOINT, resolver.resolve('GET', '/not/semp'))
+
+    def test_only_matched_endpoints_without_cursor_are_cached(self):
+        resolver = EndpointTemplateResolver()
+        for cursor in range(20):
+            self.assertEqual('GET_QUEUE_CONFIG_LIST', resolver.resolve(
+                'GET', f'/SEMP/v2/config/msgVpns/vpn/queues?count=100&cursor={cursor}'))
+            resolver.resolve('GET', f'/unknown/{cursor}')
+        self.assertEqual(0, len(resolver))
+        resolver.resolve('GET', '/SEMP/v2/config/msgVpns/vpn/queues?count=100')
+        resolver.resolve('GET', '/SEMP/v2/config/msgVpns/vpn/queues?count=100')
+        self.assertEqual(1, len(resolver))
+
+    def test_cursor_pages_of_lists_sharing_a_path_keep_their_template(self):
+        resolver = EndpointTemplateResolver()
+        details = semp_endpoint.GET_MSG_VPN_CLIENT_DETAILS_ENDPOINT.substitute(msg_vpn_name='vpn', count=100)
+        inventory = semp_endpoint.GET_CLIENT_INVENTORY_LIST.substitute(msg_vpn_name='vpn', count=100)
+        for endpoint, name in ((details, 'GET_MSG_VPN_CLIENT_DETAILS_ENDPOINT'),
+                               (inventory, 'GET_CLIENT_INVENTORY_LIST')):
+            path, query = endpoint.split('?')
+            self.assertEqual(name, resolver.resolve('GET', f'{endpoint}&cursor=abc'))
+            # the broker may put the cursor first and encode the select list
+            self.assertEqual(name, resolver.resolve('GET', f'{path}?cursor=abc&{quote(query, safe="=&")}'))
+        self.assertEqual('GET_MSG_VPN_CLIENT_DETAILS_ENDPOINT',
+                         resolver.resolve('GET', '/SEMP/v2/monitor/msgVpns/vpn/clients?where=clientName==app*'))
+
+
+class SempMetricsTest(unittest.TestCase):
+
+    def test_snapshot_groups_calls_by_template(self):
+        metrics = SempMetrics(slow_call_threshold=None)
+        for queue in ('q1', 'q2', 'q3'):
+            metrics.record('GET', f'/SEMP/v2/config/msgVpns/vpn/queues/{queue}', 200, 0.01, 0, 100)
+        metrics.record('GET', '/SEMP/v2/config/msgVpns/vpn/queues/q4', 400, 0.02)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(['GET get_queue_config_endpoint'], list(snapshot))
+        stats = snapshot['GET get_queue_config_endpoint']
+        self.assertEqual(4, stats['count'])
+        self.assertEqual(1, stats['errors'])
+        self.assertEqual({'200': 3, '400': 1}, stats['status'])
+        self.assertEqual(300, stats['bytes_received'])
+        self.assertLessEqual(stats['p50'], stats['p99'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""tests for the manifest reconciler against the in-process SEMP stand-in"""
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_reconciler import SempReconciler
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test-vpn'
+MANIFEST = {'msgVpns': [{'msgVpnName': MSG_VPN, 'enabled': True,
+                         'queues': [{'queueName': 'orders', 'subscriptions': ['orders/>', 'orders/eu/>']}],
+                         'clientUsernames': [{'clientUsername': 'app', 'enabled': True}]}]}
+
+
+class SempReconcilerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        client = SempClient(self.server.base_url)
+        self.addCleanup(client.close)
+        send = client.session.request
+        self.writes = []
+
+        def request(method, url, **kwargs):
+            if method != 'GET':
+                self.writes.append((method, url.split('/SEMP/v2/config', 1)[1].split('?')[0]))
+            return send(method, url, **kwargs)
+
+        client.session.request = request
+        # one call at a time, so the injected failure hits the first change of a stage
+        self.reconciler = SempReconciler(SempUtility(client), concurrency=1)
+
+    def test_parents_are_created_before_their_children(self):
+        result = self.reconciler.reconcile(MANIFEST)['result']
+        self.assertEqual((5, 0, 0), (result['applied'], result['failed'], result['skipped']), result['errors'])
+        self.assertEqual([('POST', '/msgVpns'), ('POST', f'/msgVpns/{MSG_VPN}/queues'),
+                          ('POST', f'/msgVpns/{MSG_VPN}/clientUsernames'),
+                          ('POST', f'/msgVpns/{MSG_VPN}/queues/orders/subscriptions'),
+                          ('POST', f'/msgVpns/{MSG_VPN}/queues/orders/subscriptions')], self.writes)
+        self.assertEqual([], self.reconciler.plan(MANIFEST))
+
+    def test_children_of_a_failed_vpn_are_skipped(self):
+        changes = self.reconciler.plan(MANIFEST)
+        self.server.inject_failures(1, 400)
+        result = self.reconciler.apply(changes)
+        self.assertEqual((0, 1, 4), (result['applied'], result['failed'], result['skipped']))
+        self.assertEqual([('POST', '/msgVpns')], self.writes)
+        self.assertEqual(['skipped, msgVpn test-vpn was not applied'] * 2,
+                         [error['error'] for error in result['errors'][1:3]])
+
+    def test_only_the_subscriptions_of_a_failed_queue_are_skipped(self):
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN, 'enabled': True})
+        changes = self.reconciler.plan(MANIFEST)
+        self.server.inject_failures(1, 400)
+        result = self.reconciler.apply(changes)
+        self.assertEqual((1, 1, 2), (result['applied'], result['failed'], result['skipped']))
+        self.assertIsNotNone(self.server.store.get(('msgVpns', MSG_VPN, 'clientUsernames', 'app')))
+        self.assertEqual({'subscription queue test-vpn/orders orders/>', 'subscription queue test-vpn/orders '
+                                                                         'orders/eu/>'},
+                         {error['object'] for error in result['errors'] if error['error'].startswith('skipped')})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""tests for the semp retry policy, token bucket and circuit breaker, and how the client surfaces failures"""
+import time
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient, SempRequestError
+from howtos.SEMPv2.semp_resilience import RetryPolicy, TokenBucket, CircuitBreaker, SempCircuitOpenError
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test-vpn'
+
+
+class RetryPolicyTest(unittest.TestCase):
+
+    def test_post_is_only_retried_when_it_was_not_processed(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable_status('GET', 500))
+        self.assertTrue(policy.is_retryable_status('DELETE', 502))
+        self.assertTrue(policy.is_retryable_status('POST', 503))
+        self.assertTrue(policy.is_retryable_status('POST', 429))
+        self.assertFalse(policy.is_retryable_status('POST', 500))
+        self.assertFalse(policy.is_retryable_status('GET', 400))
+        self.assertFalse(policy.is_retryable_status('DELETE', 404))
+
+    def test_backoff_is_bounded_and_honours_retry_after(self):
+        policy = RetryPolicy(base_delay=0.1, max_delay=1.0)
+        for attempt in range(10):
+            self.assertTrue(0 <= policy.backoff(attempt) <= min(1.0, 0.1 * 2 ** attempt))
+        self.assertEqual(0.5, policy.backoff(0, retry_after=0.5))
+        self.assertEqual(1.0, policy.backoff(0, retry_after=30))
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_burst_is_free_and_the_rest_is_paced(self):
+        bucket = TokenBucket(rate=50, burst=5)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+        for _ in range(5):
+            bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+
+    def test_rate_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_opens_after_threshold_and_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.state)
+        breaker.record_failure()
+        self.assertEqual(CircuitBreaker.OPEN, breaker.state)
+        with self.assertRaises(SempCircuitOpenError):
+            breaker.before_call()
+
+        time.sleep(0.06)
+        self.assertEqual(CircuitBreaker.HALF_OPEN, breaker.state)
+        breaker.before_call()
+        with self.assertRaises(SempCircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.state)
+
+    def test_failed_trial_opens_again(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(CircuitBreaker.OPEN, breaker.state)
+
+
+class SempClientFailureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+
+    def client(self, **kwargs):
+        client = SempClient(self.server.base_url, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_retries_server_errors_until_they_clear(self):
+        client = self.client(retry_policy=RetryPolicy(max_retries=3, base_delay=0.001))
+        self.server.inject_failures(2)
+        response = client.http_get(f'/SEMP/v2/config/msgVpns/{MSG_VPN}')
+        self.assertEqual(MSG_VPN, response['data']['msgVpnName'])
+        self.assertEqual(3, self.server.request_counts()['GET'])
+
+    def test_permanent_error_raises_with_status_and_body(self):
+        client = self.client(retry_policy=RetryPolicy(max_retries=3, base_delay=0.001))
+        with self.assertRaises(SempRequestError) as context:
+            client.http_get(f'/SEMP/v2/config/msgVpns/{MSG_VPN}/queues/missing')
+        self.assertEqual(400, context.exception.status_code)
+        self.assertEqual('NOT_FOUND', context.exception.semp_status)
+        self.assertEqual(1, self.server.request_counts()['GET'])
+
+    def test_failed_post_is_returned_when_asked_for(self):
+        client = self.client()
+        endpoint = '/SEMP/v2/config/msgVpns'
+        response = client.http_post(endpoint, {'msgVpnName': MSG_VPN}, False)
+        self.assertEqual('ALREADY_EXISTS', response['meta']['error']['status'])
+        with self.assertRaises(SempRequestError):
+            client.http_post(endpoint, {'msgVpnName': MSG_VPN})
+
+    def test_open_circuit_propagates(self):
+        client = self.client(circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+        self.server.inject_failures(2)
+        for _ in range(2):
+            with self.assertRaises(SempRequestError) as context:
+                client.http_patch(f'/SEMP/v2/config/msgVpns/{MSG_VPN}', {'enabled': True})
+            self.assertEqual(503, context.exception.status_code)
+        with self.assertRaises(SempCircuitOpenError):
+            client.http_delete(f'/SEMP/v2/config/msgVpns/{MSG_VPN}')
+        self.assertEqual(2, sum(self.server.request_counts().values()))
+
+    def test_connection_error_raises_request_error(self):
+        client = SempClient('http://127.0.0.1:9', connect_timeout=0.5)
+        self.addCleanup(client.close)
+        with self.assertRaises(SempRequestError) as context:
+            client.http_get('/SEMP/v2/monitor/about')
+        self.assertIsNone(context.exception.status_code)
+
+    def test_utility_reads_missing_objects_as_none_and_other_failures_as_errors(self):
+        semp_utility = SempUtility(self.client())
+        self.assertIsNone(semp_utility.get_message_vpn_config('missing'))
+        self.assertIsNone(semp_utility.get_queue_stats(MSG_VPN, 'missing'))
+        self.server.inject_failures(1, status=500)
+        with self.assertRaises(SempRequestError):
+            semp_utility.get_message_vpn_config(MSG_VPN)
+
+
+if __name__ == '__main__':
+    unittest.main()
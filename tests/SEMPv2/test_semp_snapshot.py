@@ -0,0 +1,44 @@
+"""tests for the message vpn snapshot export and import against the in-process SEMP stand-in"""
+import unittest
+
+from howtos.SEMPv2 import semp_snapshot
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test vpn'
+TARGET_MSG_VPN = 'copy vpn'
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+        self.server.store.create(('msgVpns', MSG_VPN, 'queues', 'orders/eu'), {'queueName': 'orders/eu'})
+        self.server.store.create(('msgVpns', MSG_VPN, 'queues', 'orders/eu', 'subscriptions', 'orders/eu/>'),
+                                 {'subscriptionTopic': 'orders/eu/>'})
+        for username in ('app', 'monitor'):
+            self.server.store.create(('msgVpns', MSG_VPN, 'clientUsernames', username), {'clientUsername': username})
+        client = SempClient(self.server.base_url)
+        self.addCleanup(client.close)
+        self.semp_client = client
+
+    def test_names_are_quoted_and_passwords_are_taken_as_argument(self):
+        snapshot = semp_snapshot.export_message_vpn(SempUtility(self.semp_client), MSG_VPN)
+        self.assertEqual([['orders/eu/>']], [queue['subscriptions'] for queue in snapshot['queues']])
+
+        result = semp_snapshot.import_message_vpn(self.semp_client, snapshot, TARGET_MSG_VPN,
+                                                  client_username_passwords={'app': 'secret'})
+        self.assertEqual(0, result['failed'], result['errors'])
+        self.assertEqual(['default', 'monitor'], result['without_password'])
+        usernames = ('msgVpns', TARGET_MSG_VPN, 'clientUsernames')
+        self.assertEqual('secret', self.server.store.get(usernames + ('app',)).get('password'))
+        self.assertIsNone(self.server.store.get(usernames + ('monitor',)).get('password'))
+        self.assertIsNotNone(self.server.store.get(('msgVpns', TARGET_MSG_VPN, 'queues', 'orders/eu', 'subscriptions',
+                                                    'orders/eu/>')))
+
+
+if __name__ == '__main__':
+    unittest.main()
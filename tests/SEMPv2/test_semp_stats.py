@@ -0,0 +1,84 @@
+"""tests for the SEMP statistics store rollups and the collector against the in-process SEMP stand-in"""
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_stats import SempStatsStore, SempStatsCollector, KIND_QUEUE, KIND_MSG_VPN
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test-vpn'
+# start of an hour, so the 1m and 1h buckets of the samples are known
+BASE_TS = 1700000000 // 3600 * 3600
+
+
+class SempStatsStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SempStatsStore(':memory:')
+        self.addCleanup(self.store.close)
+
+    def add(self, offset, value, metric='msgSpoolUsage', object_name='q1'):
+        self.store.add_samples([(BASE_TS + offset, KIND_QUEUE, MSG_VPN, object_name, metric, value)])
+
+    def test_rollups_keep_avg_min_max_and_last(self):
+        # out of order on purpose, last is the value with the latest timestamp, not the latest insert
+        for offset, value in ((10, 4.0), (50, 2.0), (30, 6.0), (70, 10.0)):
+            self.add(offset, value)
+
+        until = BASE_TS + 3600
+        self.assertEqual([(BASE_TS + 10, 4.0), (BASE_TS + 30, 6.0), (BASE_TS + 50, 2.0), (BASE_TS + 70, 10.0)],
+                         self.store.query(MSG_VPN, 'q1', 'msgSpoolUsage', BASE_TS, until))
+        self.assertEqual([(BASE_TS, 4.0, 2.0, 6.0, 2.0), (BASE_TS + 60, 10.0, 10.0, 10.0, 10.0)],
+                         self.store.query(MSG_VPN, 'q1', 'msgSpoolUsage', BASE_TS, until, resolution='1m'))
+        self.assertEqual([(BASE_TS, 5.5, 2.0, 10.0, 10.0)],
+                         self.store.query(MSG_VPN, 'q1', 'msgSpoolUsage', BASE_TS, until, resolution='1h'))
+
+    def test_series_are_kept_apart(self):
+        self.add(0, 1.0)
+        self.add(0, 2.0, metric='bindCount')
+        self.add(0, 3.0, object_name='q2')
+        self.assertEqual([(BASE_TS, 2.0)], self.store.query(MSG_VPN, 'q1', 'bindCount', BASE_TS, BASE_TS + 1))
+        self.assertEqual(['q1', 'q2'], self.store.objects(MSG_VPN))
+
+    def test_prune_applies_the_retention_per_resolution(self):
+        store = SempStatsStore(':memory:', retention={'raw': 60, '1m': 600})
+        self.addCleanup(store.close)
+        store.add_samples([(BASE_TS, KIND_QUEUE, MSG_VPN, 'q1', 'msgSpoolUsage', 1.0)])
+        store.prune(now=BASE_TS + 300)
+        until = BASE_TS + 3600
+        self.assertEqual([], store.query(MSG_VPN, 'q1', 'msgSpoolUsage', 0, until))
+        self.assertEqual(1, len(store.query(MSG_VPN, 'q1', 'msgSpoolUsage', 0, until, resolution='1m')))
+        store.prune(now=BASE_TS + 900)
+        self.assertEqual([], store.query(MSG_VPN, 'q1', 'msgSpoolUsage', 0, until, resolution='1m'))
+        self.assertEqual(1, len(store.query(MSG_VPN, 'q1', 'msgSpoolUsage', 0, until, resolution='1h')))
+
+    def test_unknown_resolution_is_refused(self):
+        with self.assertRaises(ValueError):
+            self.store.query(MSG_VPN, 'q1', 'msgSpoolUsage', resolution='1d')
+
+
+class SempStatsCollectorTest(unittest.TestCase):
+
+    def test_collect_once_samples_the_numeric_metrics(self):
+        server = SempStandInServer().start()
+        self.addCleanup(server.stop)
+        server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN, 'msgSpoolMsgCount': 7,
+                                                   'msgVpnConnections': 2})
+        server.store.create(('msgVpns', 'other-vpn'), {'msgVpnName': 'other-vpn', 'msgSpoolMsgCount': 1})
+        server.store.create(('msgVpns', MSG_VPN, 'queues', 'q1'), {'queueName': 'q1', 'msgSpoolUsage': 1024,
+                                                                   'bindCount': 1, 'accessType': 'exclusive'})
+        client = SempClient(server.base_url)
+        self.addCleanup(client.close)
+        store = SempStatsStore(':memory:')
+        self.addCleanup(store.close)
+
+        collector = SempStatsCollector(SempUtility(client), store, [MSG_VPN])
+        self.assertEqual(4, collector.collect_once(now=BASE_TS))
+        self.assertEqual([(BASE_TS, 1024.0)], store.query(MSG_VPN, 'q1', 'msgSpoolUsage', 0, BASE_TS))
+        self.assertEqual([(BASE_TS, 7.0)], store.query(MSG_VPN, '', 'msgSpoolMsgCount', 0, BASE_TS))
+        self.assertEqual([''], store.objects(MSG_VPN, kind=KIND_MSG_VPN))
+        self.assertEqual([], store.objects('other-vpn', kind=KIND_MSG_VPN))
+
+
+if __name__ == '__main__':
+    unittest.main()
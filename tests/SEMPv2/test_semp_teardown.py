@@ -0,0 +1,93 @@
+"""tests for the teardown of recorded broker objects against the in-process SEMP stand-in"""
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_resilience import RetryPolicy
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_teardown import SempTeardown
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test-vpn'
+
+
+class SempTeardownTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+        for name in ('q1', 'q2'):
+            self.server.store.create(('msgVpns', MSG_VPN, 'queues', name), {'queueName': name})
+        client = SempClient(self.server.base_url)
+        self.addCleanup(client.close)
+        self.client = client
+
+    def teardown_for(self, cascade=False, max_retries=2):
+        teardown = SempTeardown(self.client, retry_policy=RetryPolicy(max_retries=max_retries, base_delay=0.001),
+                                cascade=cascade)
+        teardown.record_message_vpn(MSG_VPN)
+        teardown.record_queue('q1', MSG_VPN)
+        teardown.record_queue('q2', MSG_VPN)
+        return teardown
+
+    def test_deletes_children_before_the_message_vpn(self):
+        teardown = self.teardown_for()
+        teardown.record_queue('gone', MSG_VPN)
+        result = teardown.teardown()
+        self.assertEqual((3, 1, 0), (result['deleted'], result['not_found'], result['failed']))
+        self.assertEqual([], teardown.pending())
+        self.assertEqual([], self.server.store.collection(('msgVpns',)))
+
+    def test_server_errors_are_retried(self):
+        teardown = self.teardown_for()
+        self.server.inject_failures(2, status=503)
+        result = teardown.teardown()
+        self.assertEqual(3, result['deleted'])
+        self.assertEqual(5, self.server.request_counts()['DELETE'])
+
+    def test_permanent_errors_are_not_retried(self):
+        teardown = SempTeardown(self.client, retry_policy=RetryPolicy(max_retries=3, base_delay=0.001))
+        teardown.record_queue('q1', MSG_VPN)
+        self.server.inject_failures(1, status=400)
+        result = teardown.teardown()
+        self.assertEqual(1, result['failed'])
+        self.assertEqual(1, self.server.request_counts()['DELETE'])
+        self.assertEqual([('queue', MSG_VPN, 'q1')], teardown.pending())
+
+    def test_cascade_keeps_children_recorded_until_the_message_vpn_is_deleted(self):
+        teardown = self.teardown_for(cascade=True, max_retries=1)
+        self.server.inject_failures(2, status=503)
+        result = teardown.teardown()
+        self.assertEqual(1, result['failed'])
+        self.assertEqual(3, len(teardown.pending()))
+        self.assertEqual(2, len(self.server.store.collection(('msgVpns', MSG_VPN, 'queues'))))
+
+        self.server.reset_request_counts()
+        result = teardown.teardown()
+        self.assertEqual(1, result['deleted'])
+        self.assertEqual({'DELETE': 1}, self.server.request_counts())
+        self.assertEqual([], teardown.pending())
+
+    def test_only_objects_this_run_created_are_recorded(self):
+        self.server.store.create(('msgVpns', MSG_VPN, 'clientUsernames', 'existing'), {'clientUsername': 'existing'})
+        teardown = SempTeardown(self.client, retry_policy=RetryPolicy(max_retries=0))
+        semp_utility = SempUtility(self.client, teardown=teardown)
+        with self.assertRaises(Exception):
+            semp_utility.create_message_vpn(MSG_VPN)
+        semp_utility.create_queue('q1', MSG_VPN, delete_if_exists=False)
+        semp_utility.create_queue('q2', MSG_VPN, delete_if_exists=False, single_request=True)
+        semp_utility.map_user_to_message_vpn(MSG_VPN, 'existing', 'secret')
+        self.assertEqual([], teardown.pending())
+
+        semp_utility.create_queue('created', MSG_VPN, single_request=True)
+        semp_utility.map_user_to_message_vpn(MSG_VPN, 'new-user', 'secret')
+        result = teardown.teardown()
+        self.assertEqual(2, result['deleted'])
+        self.assertEqual(['q1', 'q2'], sorted(queue['queueName'] for queue in
+                                              self.server.store.collection(('msgVpns', MSG_VPN, 'queues'))))
+        self.assertIsNotNone(self.server.store.get(('msgVpns', MSG_VPN, 'clientUsernames', 'existing')))
+        self.assertIsNotNone(self.server.store.get(('msgVpns', MSG_VPN)))
+
+
+if __name__ == '__main__':
+    unittest.main()
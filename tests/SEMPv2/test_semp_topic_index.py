@@ -0,0 +1,79 @@
+"""tests for the topic to queue routing index and its subscription trie"""
+import os
+import tempfile
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_topic_index import TopicRoutingIndex
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test-vpn'
+
+
+class TopicRoutingIndexTest(unittest.TestCase):
+
+    def index(self, **subscriptions_by_queue):
+        return TopicRoutingIndex(MSG_VPN, subscriptions_by_queue)
+
+    def test_exact_and_single_level_wildcards(self):
+        index = self.index(exact=['orders/eu/new'], star=['orders/*/new'], prefix=['orders/e*/new'])
+        self.assertEqual({'exact', 'star', 'prefix'}, index.queues_for('orders/eu/new'))
+        self.assertEqual({'star'}, index.queues_for('orders/us/new'))
+        self.assertEqual({'star', 'prefix'}, index.queues_for('orders/east/new'))
+        self.assertEqual(set(), index.queues_for('orders/eu'))
+        self.assertEqual(set(), index.queues_for('orders/eu/new/late'))
+
+    def test_multi_level_wildcard_needs_at_least_one_more_level(self):
+        index = self.index(all=['orders/>'], nested=['orders/*/>'])
+        self.assertEqual(set(), index.queues_for('orders'))
+        self.assertEqual({'all'}, index.queues_for('orders/eu'))
+        self.assertEqual({'all', 'nested'}, index.queues_for('orders/eu/new/late'))
+
+    def test_wildcards_within_a_level_are_literal(self):
+        index = self.index(literal=['orders/a*b', 'orders/>/new'])
+        self.assertEqual(set(), index.queues_for('orders/axb'))
+        self.assertEqual({'literal'}, index.queues_for('orders/a*b'))
+        self.assertEqual({'literal'}, index.queues_for('orders/>/new'))
+        self.assertEqual(set(), index.queues_for('orders/eu/new'))
+
+    def test_subscription_exceptions_remove_the_queue(self):
+        index = self.index(eu=['orders/>', '!orders/us/>'], us=['orders/us/*'])
+        self.assertEqual({'eu'}, index.queues_for('orders/eu/new'))
+        self.assertEqual({'us'}, index.queues_for('orders/us/new'))
+
+    def test_unmatched_topics_and_unsubscribed_queues(self):
+        index = self.index(orders=['orders/>'], idle=[])
+        self.assertEqual(['audit/log'], index.unmatched_topics(['orders/new', 'audit/log']))
+        self.assertEqual(['idle'], index.unsubscribed_queues())
+
+    def test_save_and_load_round_trip(self):
+        index = self.index(orders=['orders/>', '!orders/test/>'])
+        file_full_path = os.path.join(tempfile.mkdtemp(), 'index.json.gz')
+        self.addCleanup(os.remove, file_full_path)
+        index.save(file_full_path)
+        loaded = TopicRoutingIndex.load(file_full_path)
+        self.assertEqual((MSG_VPN, index.crawled_at), (loaded.msg_vpn_name, loaded.crawled_at))
+        self.assertEqual({'orders'}, loaded.queues_for('orders/new'))
+        self.assertEqual(set(), loaded.queues_for('orders/test/new'))
+
+    def test_crawl_reads_every_queue_subscription(self):
+        server = SempStandInServer().start()
+        self.addCleanup(server.stop)
+        server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+        for name, subscriptions in (('q1', ['a/>']), ('q2', ['a/b', 'c/*']), ('q3', [])):
+            server.store.create(('msgVpns', MSG_VPN, 'queues', name), {'queueName': name})
+            for subscription in subscriptions:
+                server.store.create(('msgVpns', MSG_VPN, 'queues', name, 'subscriptions', subscription),
+                                    {'subscriptionTopic': subscription})
+        client = SempClient(server.base_url)
+        self.addCleanup(client.close)
+
+        index = TopicRoutingIndex.crawl(SempUtility(client), MSG_VPN, concurrency=2)
+        self.assertEqual({'q1', 'q2'}, index.queues_for('a/b'))
+        self.assertEqual({'q2'}, index.queues_for('c/d'))
+        self.assertEqual(['q3'], index.unsubscribed_queues())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""tests for the change detection watch of SEMP monitor resources against the in-process SEMP stand-in"""
+import unittest
+
+from howtos.SEMPv2.semp_client import SempClient
+from howtos.SEMPv2.semp_standin import SempStandInServer
+from howtos.SEMPv2.semp_utility import SempUtility
+
+MSG_VPN = 'test-vpn'
+
+
+class WatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SempStandInServer().start()
+        self.addCleanup(self.server.stop)
+        self.server.store.create(('msgVpns', MSG_VPN), {'msgVpnName': MSG_VPN})
+        for name in ('q1', 'q2'):
+            self.queue(name, create=True, egressEnabled=True, spooledMsgCount=0, rxMsgRate=0, txMsgRate=0)
+        client = SempClient(self.server.base_url)
+        self.addCleanup(client.close)
+        self.semp_utility = SempUtility(client)
+        self.changed = []
+
+    def queue(self, name, create=False, **attributes):
+        path = ('msgVpns', MSG_VPN, 'queues', name)
+        if create:
+            self.server.store.create(path, dict(attributes, queueName=name))
+        else:
+            self.server.store.update(path, attributes)
+
+    def watcher(self, **kwargs):
+        return self.semp_utility.watch('queues', vpn_name=MSG_VPN, start=False,
+                                       on_changed=lambda key, old, new: self.changed.append(key), **kwargs)
+
+    def test_counters_and_rates_do_not_count_as_a_change(self):
+        watcher = self.watcher()
+        self.assertEqual(2, watcher.poll_once())
+        self.queue('q1', spooledMsgCount=120, rxMsgRate=40, txMsgRate=35)
+        self.queue('q2', spooledMsgCount=7)
+        self.assertEqual(0, watcher.poll_once())
+        self.assertEqual([], self.changed)
+
+        self.queue('q2', egressEnabled=False)
+        self.assertEqual(1, watcher.poll_once())
+        self.assertEqual(['q2'], self.changed)
+
+    def test_an_empty_ignore_list_reports_every_change(self):
+        watcher = self.watcher(ignore_fields=())
+        watcher.poll_once()
+        self.queue('q1', rxMsgRate=40)
+        self.assertEqual(1, watcher.poll_once())
+        self.assertEqual(['q1'], self.changed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""tests for the AIMD rate controller and the rate controlled direct publisher, driven by a fake publisher"""
+import time
+import unittest
+
+from solace.messaging.errors.pubsubplus_client_error import PublisherOverflowError
+
+from howtos.pubsub.adaptive_rate_publisher import AimdRateController, AdaptiveRatePublisher
+
+
+class _OverflowingPublisher:
+    """direct publisher stand-in rejecting the first overflows publish calls and signalling ready when asked"""
+
+    def __init__(self, overflows=0):
+        self.overflows = overflows
+        self.published = []
+        self.listener = None
+        self.notify_requests = 0
+
+    def set_publisher_readiness_listener(self, listener):
+        self.listener = listener
+
+    def notify_when_ready(self):
+        self.notify_requests += 1
+        self.listener.ready()
+
+    def publish(self, message, destination):
+        if self.overflows > 0:
+            self.overflows -= 1
+            raise PublisherOverflowError('publisher buffer is full')
+        self.published.append((destination, message))
+
+
+class AimdRateControllerTest(unittest.TestCase):
+
+    def test_rate_increases_once_per_interval(self):
+        controller = AimdRateController(initial_rate=100, additive_increase=10, increase_interval=1.0)
+        # the interval counts from the construction of the controller
+        start = time.monotonic() + 10.0
+        controller.on_success(now=start)
+        controller.on_success(now=start + 0.5)
+        self.assertEqual((110, 1), (controller.rate, controller.increases))
+        controller.on_success(now=start + 1.0)
+        self.assertEqual((120, 2), (controller.rate, controller.increases))
+
+    def test_congestion_decreases_once_per_episode(self):
+        controller = AimdRateController(initial_rate=1000, decrease_factor=0.5, congestion_hold=1.0)
+        self.assertTrue(controller.on_congestion(now=10.0))
+        self.assertFalse(controller.on_congestion(now=10.5))
+        self.assertEqual(500, controller.rate)
+        self.assertTrue(controller.on_congestion(now=11.0))
+        self.assertEqual((250, 2), (controller.rate, controller.decreases))
+
+    def test_rate_stays_within_bounds(self):
+        controller = AimdRateController(initial_rate=100, min_rate=40, max_rate=110, additive_increase=50,
+                                        congestion_hold=0)
+        for now in (1.0, 2.0, 3.0):
+            controller.on_congestion(now=now)
+        self.assertEqual(40, controller.rate)
+        for now in (10.0, 20.0, 30.0):
+            controller.on_success(now=now)
+        self.assertEqual(110, controller.rate)
+        self.assertEqual(110, AimdRateController(initial_rate=500, max_rate=110).rate)
+
+    def test_invalid_decrease_factor_is_refused(self):
+        for decrease_factor in (0, 1, 1.5):
+            with self.assertRaises(Exception):
+                AimdRateController(decrease_factor=decrease_factor)
+
+
+class AdaptiveRatePublisherTest(unittest.TestCase):
+
+    def test_overflow_waits_for_ready_and_retries(self):
+        publisher = _OverflowingPublisher(overflows=2)
+        adaptive = AdaptiveRatePublisher(publisher, AimdRateController(initial_rate=10000, increase_interval=60,
+                                                                       congestion_hold=0))
+        self.assertTrue(adaptive.publish('body', 'topic'))
+        self.assertEqual([('topic', 'body')], publisher.published)
+        self.assertEqual(2, publisher.notify_requests)
+        stats = adaptive.stats()
+        self.assertEqual((1, 2, 0, 2, 2), (stats['sent'], stats['overflows'], stats['dropped'],
+                                           stats['ready_signals'], stats['decreases']))
+        self.assertEqual(2500, adaptive.rate)
+
+    def test_message_is_dropped_after_max_attempts(self):
+        publisher = _OverflowingPublisher(overflows=5)
+        adaptive = AdaptiveRatePublisher(publisher, AimdRateController(initial_rate=10000), max_attempts=3)
+        self.assertFalse(adaptive.publish('body', 'topic'))
+        self.assertEqual([], publisher.published)
+        self.assertEqual((0, 3, 1), (adaptive.sent, adaptive.overflows, adaptive.dropped))
+
+    def test_publish_many_sends_every_message(self):
+        publisher = _OverflowingPublisher(overflows=1)
+        adaptive = AdaptiveRatePublisher(publisher, AimdRateController(initial_rate=10000))
+        stats = adaptive.publish_many((('topic', index) for index in range(20)))
+        self.assertEqual(20, stats['sent'])
+        self.assertEqual(list(range(20)), [message for _, message in publisher.published])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""tests for the shared cache of topics and topic subscriptions"""
+import threading
+import unittest
+
+from howtos.pubsub.destination_cache import DestinationCache
+
+
+class DestinationCacheTest(unittest.TestCase):
+
+    def test_repeated_names_return_the_same_object(self):
+        cache = DestinationCache()
+        topic = cache.topic('solace/samples/a')
+        self.assertIs(topic, cache.topic('solace/samples/a'))
+        self.assertEqual('solace/samples/a', topic.get_name())
+        subscription = cache.subscription('solace/samples/>')
+        self.assertIs(subscription, cache.subscription('solace/samples/>'))
+        self.assertEqual([subscription], cache.subscriptions(['solace/samples/>']))
+        self.assertEqual({'size': 2, 'hits': 3, 'misses': 2, 'evictions': 0, 'hit_rate': 0.6}, cache.stats())
+
+    def test_templated_topics_share_the_plain_topic(self):
+        cache = DestinationCache()
+        topic = cache.topic_from('solace/samples/{}/{}', 'pub', 1)
+        self.assertEqual('solace/samples/pub/1', topic.get_name())
+        self.assertIs(topic, cache.topic_from('solace/samples/{}/{}', 'pub', 1))
+        self.assertIs(topic, cache.topic('solace/samples/pub/1'))
+        self.assertIsNot(topic, cache.topic_from('solace/samples/{}/{}', 'pub', 2))
+        self.assertEqual({'size': 2, 'hits': 2, 'misses': 2}, {key: cache.stats()[key] for key in
+                                                               ('size', 'hits', 'misses')})
+
+    def test_unique_names_count_one_miss_per_lookup(self):
+        cache = DestinationCache(max_size=4)
+        for count in range(10):
+            cache.topic_from('solace/samples/direct/pub/{}', count)
+        stats = cache.stats()
+        self.assertEqual((4, 0, 10, 6), (stats['size'], stats['hits'], stats['misses'], stats['evictions']))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = DestinationCache(max_size=2)
+        first = cache.topic('a')
+        cache.topic('b')
+        cache.topic('a')
+        cache.topic('c')
+        self.assertEqual(1, cache.stats()['evictions'])
+        self.assertIs(first, cache.topic('a'))
+        hits = cache.stats()['hits']
+        cache.topic('b')
+        self.assertEqual(hits, cache.stats()['hits'])
+
+    def test_counters_are_exact_with_concurrent_lookups(self):
+        cache = DestinationCache(max_size=8)
+        names = [f'solace/samples/{index}' for index in range(16)]
+
+        def lookups():
+            for _ in range(200):
+                for name in names:
+                    cache.topic(name)
+
+        threads = [threading.Thread(target=lookups) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.stats()
+        self.assertEqual(4 * 200 * len(names), stats['hits'] + stats['misses'])
+        # two threads missing the same name both count a miss, only one of them inserts it
+        self.assertLessEqual(stats['evictions'], stats['misses'] - 8)
+        self.assertEqual(8, stats['size'])
+
+    def test_clear_empties_every_kind(self):
+        cache = DestinationCache()
+        cache.topic('a')
+        cache.subscription('a/>')
+        cache.topic_from('{}', 'b')
+        cache.clear()
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""tests for the direct publish batch helper, driven by a fake publisher and a messaging service that is never
+connected"""
+import unittest
+
+from solace.messaging.config.solace_properties import service_properties, transport_layer_properties, \
+    authentication_properties
+from solace.messaging.errors.pubsubplus_client_error import PublisherOverflowError
+from solace.messaging.messaging_service import MessagingService
+from solace.messaging.resources.topic import Topic
+
+from howtos.pubsub.destination_cache import DestinationCache
+from howtos.pubsub.direct_publish_many import publish_many
+
+BROKER_PROPERTIES = {transport_layer_properties.HOST: 'tcp://localhost:55555', service_properties.VPN_NAME: 'default',
+                     authentication_properties.SCHEME_BASIC_USER_NAME: 'default',
+                     authentication_properties.SCHEME_BASIC_PASSWORD: 'default'}
+
+
+class _RecordingPublisher:
+    """direct publisher stand-in rejecting the publish calls whose number is in overflow_at"""
+
+    def __init__(self, overflow_at=()):
+        self.overflow_at = set(overflow_at)
+        self.calls = 0
+        self.published = []
+
+    def publish(self, message, destination):
+        self.calls += 1
+        if self.calls in self.overflow_at:
+            raise PublisherOverflowError('publisher buffer is full')
+        self.published.append((destination, message))
+
+
+class PublishManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.messaging_service = MessagingService.builder().from_properties(BROKER_PROPERTIES).build()
+
+    def test_plain_and_property_messages(self):
+        publisher = _RecordingPublisher()
+        properties = {'application': 'samples'}
+        topic = Topic.of('solace/samples/c')
+        messages = [('solace/samples/a', 'first'), ('solace/samples/a', 'second', properties),
+                    ('solace/samples/b', 'third', None), (topic, 'fourth', {'application': 'samples'}),
+                    ('solace/samples/b', 'fifth', {'application': 'other'})]
+        result = publish_many(publisher, self.messaging_service, messages)
+
+        self.assertEqual((5, 0, 2, 2), (result['published'], result['failed'], result['destinations'],
+                                        result['builders']))
+        destinations = [destination for destination, _ in publisher.published]
+        self.assertIs(destinations[0], destinations[1])
+        self.assertEqual('solace/samples/b', destinations[2].get_name())
+        self.assertIs(topic, destinations[3])
+        sent = [message for _, message in publisher.published]
+        self.assertEqual(['first', 'third'], [sent[0], sent[2]])
+        built = [sent[1], sent[3], sent[4]]
+        self.assertEqual(['second', 'fourth', 'fifth'], [message.get_payload_as_string() for message in built])
+        self.assertEqual(['samples', 'samples', 'other'], [message.get_property('application') for message in built])
+
+    def test_overflows_are_counted_as_failed(self):
+        publisher = _RecordingPublisher(overflow_at=(2, 3))
+        result = publish_many(publisher, self.messaging_service, (('solace/samples/a', index) for index in range(5)))
+        self.assertEqual((3, 2), (result['published'], result['failed']))
+        self.assertEqual([0, 3, 4], [message for _, message in publisher.published])
+
+    def test_shared_destination_cache_is_asked_once_per_topic_name(self):
+        destinations = DestinationCache()
+        publish_many(_RecordingPublisher(), self.messaging_service,
+                     (('solace/samples/a', index) for index in range(10)), destinations=destinations)
+        self.assertEqual({'size': 1, 'hits': 0, 'misses': 1}, {key: destinations.stats()[key] for key in
+                                                               ('size', 'hits', 'misses')})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""tests for the outbound message prototypes, built with a messaging service that is never connected"""
+import unittest
+
+from solace.messaging.config.solace_properties import service_properties, transport_layer_properties, \
+    authentication_properties
+from solace.messaging.messaging_service import MessagingService
+
+from howtos.pubsub.message_prototype import OutboundMessagePrototype, MessagePrototypeCache
+
+BROKER_PROPERTIES = {transport_layer_properties.HOST: 'tcp://localhost:55555', service_properties.VPN_NAME: 'default',
+                     authentication_properties.SCHEME_BASIC_USER_NAME: 'default',
+                     authentication_properties.SCHEME_BASIC_PASSWORD: 'default'}
+
+
+def _messaging_service():
+    return MessagingService.builder().from_properties(BROKER_PROPERTIES).build()
+
+
+class OutboundMessagePrototypeTest(unittest.TestCase):
+
+    def test_per_message_fields_stay_on_their_message(self):
+        prototype = OutboundMessagePrototype(_messaging_service(), {'application': 'samples'}, priority=3)
+        stamped = prototype.stamp('first', application_message_id='id-1', correlation_id='corr-1',
+                                  sequence_number=7, properties={'attempt': 1})
+        plain = prototype.stamp('second')
+
+        self.assertEqual('id-1', stamped.get_application_message_id())
+        self.assertEqual('corr-1', stamped.get_correlation_id())
+        self.assertEqual(7, stamped.get_sequence_number())
+        self.assertEqual({'application': 'samples', 'attempt': 1}, stamped.get_properties())
+        self.assertEqual(3, stamped.get_priority())
+
+        self.assertIsNone(plain.get_application_message_id())
+        self.assertIsNone(plain.get_correlation_id())
+        self.assertEqual({'application': 'samples'}, plain.get_properties())
+        self.assertEqual(3, plain.get_priority())
+        self.assertEqual('second', plain.get_payload_as_string())
+
+
+class MessagePrototypeCacheTest(unittest.TestCase):
+
+    def test_prototypes_are_shared_per_static_fields(self):
+        cache = MessagePrototypeCache(_messaging_service(), max_size=2)
+        first = cache.get({'language': 'Python', 'application': 'samples'})
+        self.assertIs(first, cache.get({'application': 'samples', 'language': 'Python'}))
+        self.assertIsNot(first, cache.get({'application': 'samples'}, priority=1))
+        cache.get({'application': 'other'})
+        self.assertEqual(2, len(cache))
+        self.assertEqual({'size': 2, 'hits': 1, 'misses': 3, 'hit_rate': 0.25}, cache.stats())
+
+    def test_unhashable_properties_get_an_uncached_prototype(self):
+        cache = MessagePrototypeCache(_messaging_service())
+        prototype = cache.get({'tags': ['a', 'b']})
+        self.assertEqual(['a', 'b'], list(prototype.stamp('body').get_property('tags')))
+        self.assertEqual({'size': 0, 'hits': 0, 'misses': 1, 'hit_rate': 0.0}, cache.stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
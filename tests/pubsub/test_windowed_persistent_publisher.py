@@ -0,0 +1,97 @@
+"""tests for the windowed persistent publisher, driven by a fake publisher whose receipts the test delivers"""
+import threading
+import unittest
+
+from solace.messaging.publisher.persistent_message_publisher import PublishReceipt
+
+from howtos.pubsub.windowed_persistent_publisher import WindowedPersistentPublisher
+
+
+class _HeldReceiptsPublisher:
+    """persistent publisher stand-in keeping every publish until the test acknowledges it"""
+
+    def __init__(self):
+        self.listener = None
+        self.held = []
+        self.properties = []
+
+    def set_message_publish_receipt_listener(self, listener):
+        self.listener = listener
+
+    def publish(self, message, destination, user_context=None, additional_message_properties=None):
+        if message == 'rejected':
+            raise Exception('publisher is not ready')
+        self.held.append((message, user_context))
+        self.properties.append(additional_message_properties)
+
+    def acknowledge(self, count=None, exception=None):
+        """method to deliver the receipts of the oldest held messages"""
+        count = len(self.held) if count is None else count
+        released, self.held = self.held[:count], self.held[count:]
+        for message, user_context in released:
+            self.listener.on_publish_receipt(PublishReceipt(message, exception, 0, exception is None, user_context))
+
+
+class WindowedPersistentPublisherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.publisher = _HeldReceiptsPublisher()
+        self.windowed = WindowedPersistentPublisher(self.publisher, window_size=2)
+
+    def test_futures_resolve_with_the_user_context(self):
+        first = self.windowed.publish('first', 'topic', user_context='order-1')
+        second = self.windowed.publish('second', 'topic', additional_message_properties={'attempt': 1})
+        self.assertFalse(first.done())
+        self.assertEqual(2, self.windowed.in_flight)
+        self.assertEqual([None, {'attempt': 1}], self.publisher.properties)
+
+        self.publisher.acknowledge()
+        self.assertEqual('order-1', first.result(0).user_context)
+        self.assertIsNone(second.result(0).user_context)
+        self.assertGreaterEqual(first.result(0).latency, 0)
+        self.assertTrue(self.windowed.flush(0))
+
+    def test_full_window_blocks_until_a_receipt(self):
+        self.windowed.publish('first', 'topic')
+        self.windowed.publish('second', 'topic')
+        with self.assertRaises(Exception):
+            self.windowed.publish('third', 'topic', timeout=0.01)
+
+        timer = threading.Timer(0.05, self.publisher.acknowledge, args=(1,))
+        timer.start()
+        self.addCleanup(timer.cancel)
+        third = self.windowed.publish('third', 'topic', timeout=5)
+        self.assertEqual(['second', 'third'], [message for message, _ in self.publisher.held])
+        self.assertEqual(2, self.windowed.window_waits)
+        self.assertFalse(self.windowed.flush(0.01))
+        self.publisher.acknowledge()
+        self.assertTrue(third.done())
+        self.assertTrue(self.windowed.flush(0))
+
+    def test_failures_resolve_their_future_with_the_exception(self):
+        rejected = self.windowed.publish('rejected', 'topic')
+        self.assertEqual('publisher is not ready', str(rejected.exception(0)))
+        nacked = self.windowed.publish('nacked', 'topic')
+        self.publisher.acknowledge(exception=Exception('queue is full'))
+        self.assertEqual('queue is full', str(nacked.exception(0)))
+
+        stats = self.windowed.stats()
+        self.assertEqual((1, 0, 2, 0), (stats['published'], stats['acknowledged'], stats['failed'],
+                                        stats['in_flight']))
+
+    def test_stats_report_the_ack_latency(self):
+        self.assertEqual({'count': 0}, self.windowed.stats()['latency'])
+        for message in ('first', 'second'):
+            self.windowed.publish(message, 'topic')
+        self.publisher.acknowledge()
+        stats = self.windowed.stats()
+        self.assertEqual((2, 2, 2), (stats['published'], stats['acknowledged'], stats['latency']['count']))
+        self.assertLessEqual(stats['latency']['p50'], stats['latency']['max'])
+
+    def test_receipts_of_other_publishes_are_ignored(self):
+        self.windowed.on_publish_receipt(PublishReceipt('other', None, 0, True, 'foreign context'))
+        self.assertEqual((0, 0), (self.windowed.acknowledged, self.windowed.failed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+"""tests for the backlog driven scaling decisions of the queue consumer autoscaler"""
+import unittest
+
+from howtos.how_to_autoscale_queue_consumers import ScalingPolicy
+
+
+class ScalingPolicyTest(unittest.TestCase):
+
+    def policy(self, **kwargs):
+        settings = dict(min_workers=1, max_workers=8, scale_up_backlog=1000, scale_down_backlog=100,
+                        target_drain_seconds=60.0, scale_up_cooldown=30.0, scale_down_cooldown=300.0,
+                        scale_down_stable_polls=3, max_scale_up_step=4)
+        settings.update(kwargs)
+        return ScalingPolicy(**settings)
+
+    @staticmethod
+    def poll(policy, workers, polls, backlog, rx_rate, tx_rate, start=0.0, interval=10.0):
+        """method to run polls, applying each decision, returns the worker count after every poll"""
+        counts = []
+        for index in range(polls):
+            workers = policy.decide(workers, backlog, rx_rate, tx_rate, start + index * interval)
+            counts.append(workers)
+        return counts
+
+    def test_scale_up_sizes_the_pool_from_the_busy_egress_rate(self):
+        policy = self.policy()
+        # 2 busy workers deliver 100 msgs/sec each, 300 msgs/sec come in and 12000 wait: 300 + 12000 / 60 = 500
+        self.assertEqual(5, policy.decide(2, 12000, 300, 200, 0.0))
+        self.assertEqual(100, policy.measured_capacity)
+        # within the scale up cooldown nothing changes
+        self.assertEqual(5, policy.decide(5, 12000, 300, 500, 10.0))
+
+    def test_scale_up_step_and_max_workers_bound_the_growth(self):
+        policy = self.policy(max_scale_up_step=2, max_workers=3)
+        self.assertEqual(3, policy.decide(1, 100000, 1000, 10, 0.0))
+        self.assertEqual(3, policy.decide(3, 100000, 1000, 30, 100.0))
+
+    def test_steady_state_keeps_the_pool(self):
+        policy = self.policy()
+        self.assertEqual([4] * 10, self.poll(policy, 4, 10, backlog=1000, rx_rate=500, tx_rate=500))
+
+    def test_light_traffic_scales_down_one_worker_per_cooldown(self):
+        for rx_rate in (1, 100):
+            policy = self.policy()
+            counts = self.poll(policy, 4, 3, backlog=0, rx_rate=rx_rate, tx_rate=rx_rate)
+            self.assertEqual([4, 4, 3], counts, f'rx {rx_rate}')
+            self.assertEqual(3, policy.decide(3, 0, rx_rate, rx_rate, 100.0))
+            self.assertEqual(2, self.poll(policy, 3, 3, 0, rx_rate, rx_rate, start=400.0)[-1])
+
+    def test_scale_down_keeps_enough_capacity_for_the_ingress_rate(self):
+        policy = self.policy(worker_capacity=30)
+        self.assertEqual([4, 4, 4], self.poll(policy, 4, 3, backlog=0, rx_rate=100, tx_rate=100))
+        policy = self.policy(worker_capacity=50)
+        self.assertEqual([4, 4, 3], self.poll(policy, 4, 3, backlog=0, rx_rate=100, tx_rate=100))
+
+    def test_measured_capacity_guards_the_scale_down(self):
+        policy = self.policy()
+        # busy polls: 150 msgs/sec per worker while a backlog was waiting
+        self.assertEqual(4, policy.decide(4, 500, 600, 600, 0.0))
+        self.assertEqual(150, policy.measured_capacity)
+        # the backlog is gone, 600 msgs/sec still come in and 3 workers of 150 cannot take them
+        self.assertEqual([4, 4, 4], self.poll(policy, 4, 3, backlog=0, rx_rate=600, tx_rate=600, start=10.0))
+        # once the ingress rate drops to what 3 workers can take, the stable polls already seen allow the scale down
+        self.assertEqual(3, policy.decide(4, 0, 400, 400, 40.0))
+
+    def test_measured_capacity_follows_a_slower_worker(self):
+        policy = self.policy(capacity_smoothing=0.5)
+        policy.decide(4, 500, 800, 800, 0.0)
+        self.assertEqual(200, policy.measured_capacity)
+        # the workers got slower, 100 msgs/sec each while the backlog keeps waiting
+        rates = []
+        for index in range(1, 4):
+            policy.decide(4, 500, 400, 400, index * 10.0)
+            rates.append(policy.measured_capacity)
+        self.assertEqual([150, 125, 112.5], rates)
+        # 400 msgs/sec are more than 3 workers of the lowered capacity take, the old peak of 200 would allow it
+        self.assertEqual([4, 4, 4], self.poll(policy, 4, 3, backlog=0, rx_rate=400, tx_rate=400, start=400.0))
+
+    def test_a_backlog_interrupts_the_stable_polls(self):
+        policy = self.policy()
+        self.assertEqual(4, policy.decide(4, 0, 10, 10, 0.0))
+        self.assertEqual(4, policy.decide(4, 0, 10, 10, 10.0))
+        self.assertEqual(4, policy.decide(4, 500, 10, 400, 20.0))
+        self.assertEqual([4, 4, 3], self.poll(policy, 4, 3, backlog=0, rx_rate=10, tx_rate=10, start=30.0))
+
+    def test_worker_count_is_brought_within_bounds(self):
+        policy = self.policy(min_workers=2, max_workers=4)
+        self.assertEqual(2, policy.decide(0, 0, 0, 0, 0.0))
+        self.assertEqual(4, policy.decide(6, 0, 0, 0, 10.0))
+
+    def test_invalid_settings_are_refused(self):
+        with self.assertRaises(Exception):
+            self.policy(min_workers=0)
+        with self.assertRaises(Exception):
+            self.policy(scale_down_backlog=1000)
+        with self.assertRaises(Exception):
+            self.policy(capacity_smoothing=0)
+
+
+if __name__ == '__main__':
+    unittest.main()